@@ -0,0 +1,361 @@
+"""
+Reproducible benchmark suite of pyFTLE.
+
+Two kinds of cases are measured on synthetic double-gyre data (see
+`src.synthetic`):
+
+- `kernel` cases build the interpolators of a few snapshots in memory and advance
+  the seed particles with them, for every interpolator x integrator x grid size x
+  number of particles, measuring the interpolator build time, the latency of each
+  integration step, the throughput (particle-steps per second) and the peak memory
+  allocated (traced by `tracemalloc`, in a separate untimed pass).
+- `pipeline` cases run the whole program (`src/main.py`) on a dataset written to a
+  temporary directory, for every grid size x number of particles x number of
+  processes, reading the throughput and latency from its `telemetry.json` and
+  polling the peak RSS of the program and all its workers.
+
+Results are written as JSON. Given the results of a previous run as `--baseline`,
+the throughput of each case is compared to it and the exit status is 1 if any
+case regressed by more than `--tolerance`.
+
+Usage:
+    python -m benchmarks.run_benchmarks --output results.json [--quick]
+    python -m benchmarks.run_benchmarks --output new.json --baseline results.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import scipy
+from scipy.spatial import Delaunay, cKDTree
+
+from src.integrate import get_integrator
+from src.interpolate import build_interpolator, build_structured_grid
+from src.memory import deep_nbytes, process_tree_rss
+from src.particles import NeighboringParticles
+from src.synthetic import (
+    DOMAIN,
+    double_gyre_velocity,
+    neighboring_seed_particles,
+    write_double_gyre_dataset,
+)
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INTERPOLATORS = ["cubic", "linear", "nearest", "grid", "grid_cubic"]
+INTEGRATORS = ["euler", "ab2", "rk4"]
+TIMESTEP = 0.05
+
+
+def _grid(nx: int, ny: int) -> tuple[np.ndarray, np.ndarray]:
+    (x_min, x_max), (y_min, y_max) = DOMAIN
+    return np.meshgrid(np.linspace(x_min, x_max, nx), np.linspace(y_min, y_max, ny))
+
+
+def _seed_particles(num_particles: int) -> NeighboringParticles:
+    seeds = neighboring_seed_particles(num_particles)
+    positions = np.concatenate([seeds[k] for k in ("left", "right", "top", "bottom")])
+    return NeighboringParticles(positions=positions)
+
+
+def _build_snapshot_interpolators(interpolator, x, y, num_snapshots):
+    """Builds the interpolators of the snapshots, sharing the grid geometry."""
+    if interpolator.startswith("grid"):
+        geometry = build_structured_grid(x, y)
+    else:
+        points = np.column_stack((x.ravel(), y.ravel()))
+        geometry = cKDTree(points) if interpolator == "nearest" else Delaunay(points)
+
+    u, v = double_gyre_velocity(
+        x, y, TIMESTEP * np.arange(num_snapshots)[:, None, None]
+    )
+    interpolators = []
+    for k in range(num_snapshots):
+        if interpolator.startswith("grid"):
+            velocities = (u[k], v[k])
+        else:
+            velocities = np.column_stack((u[k].ravel(), v[k].ravel()))
+        interpolators.append(build_interpolator(geometry, velocities, interpolator))
+    return interpolators
+
+
+def run_kernel_case(
+    interpolator: str,
+    integrator: str,
+    nx: int,
+    ny: int,
+    num_particles: int,
+    num_steps: int,
+) -> dict:
+    """Measures the build and integration of `num_steps` snapshots in memory."""
+    x, y = _grid(nx, ny)
+
+    start = time.perf_counter()
+    interpolators = _build_snapshot_interpolators(interpolator, x, y, num_steps)
+    build_seconds = (time.perf_counter() - start) / num_steps
+
+    particles = _seed_particles(num_particles)
+    stepper = get_integrator(integrator)
+    latencies = []
+    for snapshot_interpolator in interpolators:
+        start = time.perf_counter()
+        stepper.integrate(TIMESTEP, particles, snapshot_interpolator)
+        latencies.append(time.perf_counter() - start)
+
+    # Memory is traced in a separate pass, since tracing slows down allocations
+    tracemalloc.start()
+    try:
+        traced = _build_snapshot_interpolators(interpolator, x, y, 1)
+        get_integrator(integrator).integrate(
+            TIMESTEP, _seed_particles(num_particles), traced[0]
+        )
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    num_positions = particles.positions.shape[0]
+    return {
+        "name": f"kernel/{interpolator}/{integrator}/{nx}x{ny}/{num_particles}",
+        "kind": "kernel",
+        "interpolator": interpolator,
+        "integrator": integrator,
+        "grid": [nx, ny],
+        "num_particles": num_particles,
+        "num_steps": num_steps,
+        "throughput": num_positions * num_steps / sum(latencies),
+        "latency_per_step": {
+            "median": float(np.median(latencies)),
+            "p95": float(np.percentile(latencies, 95)),
+        },
+        "build_seconds_per_snapshot": build_seconds,
+        "interpolator_bytes": deep_nbytes(interpolators[0]),
+        "peak_memory_bytes": peak_bytes,
+    }
+
+
+def run_pipeline_case(
+    interpolator: str,
+    integrator: str,
+    nx: int,
+    ny: int,
+    num_particles: int,
+    num_processes: int,
+    num_steps: int,
+    num_windows: int,
+) -> dict:
+    """Runs the whole program on a synthetic dataset of `num_windows` windows."""
+    with tempfile.TemporaryDirectory() as work_dir:
+        list_files = write_double_gyre_dataset(
+            os.path.join(work_dir, "inputs"),
+            nx,
+            ny,
+            nt=num_steps + num_windows,
+            timestep=TIMESTEP,
+            num_particles=num_particles,
+        )
+        command = [
+            sys.executable,
+            os.path.join(ROOT_DIR, "src", "main.py"),
+            "--experiment_name=benchmark",
+            f"--list_velocity_files={list_files['velocity']}",
+            f"--list_grid_files={list_files['grid']}",
+            f"--list_particle_files={list_files['particle']}",
+            f"--snapshot_timestep={TIMESTEP}",
+            f"--flow_map_period={num_steps * TIMESTEP}",
+            f"--integrator={integrator}",
+            f"--interpolator={interpolator}",
+            f"--num_processes={num_processes}",
+        ]
+        environment = {**os.environ, "PYTHONPATH": ROOT_DIR}
+
+        # Progress bars go to a file, since a full pipe would block the program
+        log_path = os.path.join(work_dir, "log.txt")
+        peak_rss_bytes = 0
+        with open(log_path, "w") as log:
+            process = subprocess.Popen(
+                command, cwd=work_dir, env=environment, stdout=log, stderr=log
+            )
+            while process.poll() is None:
+                peak_rss_bytes = max(peak_rss_bytes, process_tree_rss(process.pid))
+                time.sleep(0.05)
+        if process.returncode != 0:
+            with open(log_path) as log:
+                raise RuntimeError(f"Benchmark run failed:\n{log.read()[-2000:]}")
+
+        telemetry_path = os.path.join(
+            work_dir, "outputs", "benchmark", "telemetry.json"
+        )
+        with open(telemetry_path) as f:
+            telemetry = json.load(f)
+
+    stages = telemetry["stages"]
+    step_seconds = stages["integrate"]["seconds"] + stages["interpolate"]["seconds"]
+    return {
+        "name": (
+            f"pipeline/{interpolator}/{integrator}/{nx}x{ny}/{num_particles}"
+            f"/np{num_processes}"
+        ),
+        "kind": "pipeline",
+        "interpolator": interpolator,
+        "integrator": integrator,
+        "grid": [nx, ny],
+        "num_particles": num_particles,
+        "num_processes": num_processes,
+        "num_steps": num_steps,
+        "num_windows": num_windows,
+        "wall_time": telemetry["wall_time"],
+        "throughput": telemetry["particle_steps_per_second"],
+        # Mean over the steps of all windows (summed over the workers)
+        "latency_per_step": {"mean": step_seconds / stages["integrate"]["calls"]},
+        "stages": {stage: counters["seconds"] for stage, counters in stages.items()},
+        "peak_memory_bytes": peak_rss_bytes,
+    }
+
+
+def compare_to_baseline(
+    results: list[dict], baseline: list[dict], tolerance: float
+) -> list[dict]:
+    """
+    Compares the throughput of the cases run in both the results and the baseline.
+
+    Args:
+        results (list[dict]): Current results.
+        baseline (list[dict]): Results of a previous run.
+        tolerance (float): Largest relative drop in throughput that is not a
+            regression (e.g. 0.1 for 10%).
+
+    Returns:
+        list[dict]: For each common case, its `name`, the `baseline` and `current`
+            throughput, their `ratio` and whether it `regressed`.
+    """
+    baseline_throughput = {case["name"]: case["throughput"] for case in baseline}
+    comparison = []
+    for case in results:
+        if case["name"] not in baseline_throughput:
+            continue
+        ratio = case["throughput"] / baseline_throughput[case["name"]]
+        comparison.append(
+            {
+                "name": case["name"],
+                "baseline": baseline_throughput[case["name"]],
+                "current": case["throughput"],
+                "ratio": ratio,
+                "regressed": ratio < 1 - tolerance,
+            }
+        )
+    return comparison
+
+
+def _grid_size(value: str) -> tuple[int, int]:
+    nx, ny = value.lower().split("x")
+    return int(nx), int(ny)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Runs the benchmark suite.")
+    parser.add_argument("--output", type=str, default="benchmark_results.json")
+    parser.add_argument("--baseline", type=str, default=None)
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    parser.add_argument(
+        "--quick", action="store_true", help="Small cases, e.g. for CI."
+    )
+    parser.add_argument("--interpolators", nargs="+", default=INTERPOLATORS)
+    parser.add_argument("--integrators", nargs="+", default=INTEGRATORS)
+    parser.add_argument(
+        "--grid_sizes", nargs="+", type=_grid_size, default=[(100, 50), (400, 200)]
+    )
+    parser.add_argument("--num_particles", nargs="+", type=int, default=[1000, 10000])
+    parser.add_argument("--num_processes", nargs="+", type=int, default=[1, 2, 4])
+    parser.add_argument("--num_steps", type=int, default=20)
+    parser.add_argument("--num_windows", type=int, default=16)
+    parser.add_argument("--pipeline_interpolator", type=str, default="cubic")
+    parser.add_argument("--pipeline_integrator", type=str, default="rk4")
+    parser.add_argument(
+        "--skip_pipeline", action="store_true", help="Only run the kernel cases."
+    )
+    args = parser.parse_args(argv)
+
+    if args.quick:
+        args.grid_sizes = [(50, 25)]
+        args.num_particles = [100]
+        args.num_processes = [1, 2]
+        args.num_steps = 10
+        args.num_windows = 4
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    results = []
+    for nx, ny in args.grid_sizes:
+        for num_particles in args.num_particles:
+            for interpolator in args.interpolators:
+                for integrator in args.integrators:
+                    results.append(
+                        run_kernel_case(
+                            interpolator,
+                            integrator,
+                            nx,
+                            ny,
+                            num_particles,
+                            args.num_steps,
+                        )
+                    )
+                    print(f"{results[-1]['name']}: {results[-1]['throughput']:.4g}")
+
+            if args.skip_pipeline:
+                continue
+            for num_processes in args.num_processes:
+                results.append(
+                    run_pipeline_case(
+                        args.pipeline_interpolator,
+                        args.pipeline_integrator,
+                        nx,
+                        ny,
+                        num_particles,
+                        num_processes,
+                        args.num_steps,
+                        args.num_windows,
+                    )
+                )
+                print(f"{results[-1]['name']}: {results[-1]['throughput']:.4g}")
+
+    report = {
+        "metadata": {
+            "date": datetime.datetime.now().isoformat(timespec="seconds"),
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "cpu_count": os.cpu_count(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "scipy": scipy.__version__,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Benchmark results saved to: {args.output}")
+
+    if args.baseline is None:
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)["results"]
+    comparison = compare_to_baseline(results, baseline, args.tolerance)
+    for case in comparison:
+        flag = "REGRESSED" if case["regressed"] else ""
+        print(f"{case['name']:<50} {case['ratio']:6.2f}x {flag}")
+    return 1 if any(case["regressed"] for case in comparison) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
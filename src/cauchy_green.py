@@ -16,7 +16,7 @@ def compute_flow_map_jacobian(particles: NeighboringParticles) -> ArrayFloat32Nx
     - jacobian (ArrayFloat32Nx2x2): The flow map Jacobian.
     """
     num_particles = len(particles)
-    jacobian = np.empty((num_particles, 2, 2))
+    jacobian = np.empty((num_particles, 2, 2), dtype=particles.positions.dtype)
 
     jacobian[:, 0, 0] = (
         particles.delta_right_left[:, 0] / particles.initial_delta_right_left[:, 0]
@@ -0,0 +1,168 @@
+import hashlib
+import json
+import os
+from typing import Callable
+
+import numpy as np
+
+from src.integrate import IntegratorStrategy
+from src.particles import NeighboringParticles
+
+
+def file_fingerprint(file_path: str) -> tuple[int, int]:
+    """Returns the (size, modification time) of a file, which identify its content."""
+    stat = os.stat(file_path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def window_digest(
+    input_files: list[str],
+    fingerprint: Callable[[str], tuple[int, int]] = file_fingerprint,
+) -> str:
+    """
+    Returns a digest of the input files of a window (their paths, in order, and
+    fingerprints), which changes whenever any of them is replaced or modified.
+
+    Args:
+        input_files (list[str]): Snapshot, grid and particle files of the window.
+        fingerprint (Callable[[str], tuple[int, int]]): Function returning the
+            fingerprint of a file (e.g. a cached `file_fingerprint`, when the
+            digests of many overlapping windows are computed).
+
+    Returns:
+        str: Hexadecimal digest.
+    """
+    files = [(path, *fingerprint(path)) for path in input_files]
+    return hashlib.sha1(json.dumps(files).encode()).hexdigest()
+
+
+def _atomic_write(path: str, write) -> None:
+    """Writes a file through a temporary one, so that it is never left half-written."""
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "wb") as f:
+        write(f)
+    os.replace(temporary_path, path)
+
+
+class JobManifest:
+    """
+    Record of the windows completed by a job, so that a restarted job skips them.
+
+    Each completed window is stored with the digest of its input files (see
+    `window_digest`), so it is only skipped if none of them changed. Windows made
+    possible by snapshots appended to the input lists have no record, and are thus
+    the only ones computed by the next run. The whole record is discarded if not
+    resuming, or if the job parameters differ from the recorded ones.
+
+    Parameters
+    ----------
+    path : str
+        Path to the manifest (JSON) file.
+    parameters : dict
+        Parameters of the job that affect its results.
+    resume : bool
+        Whether to load the windows recorded by a previous run of the job.
+    """
+
+    def __init__(self, path: str, parameters: dict, resume: bool = True):
+        self.path = path
+        self.parameters = parameters
+        self.completed = {}  # window index -> digest of its input files
+        self.reset = True  # Whether the recorded windows were discarded
+
+        if resume and os.path.exists(path):
+            with open(path) as f:
+                manifest = json.load(f)
+            # Compare through JSON, since it turns tuples into lists
+            if manifest["parameters"] == json.loads(json.dumps(parameters)):
+                self.completed = {int(i): d for i, d in manifest["completed"].items()}
+                self.reset = False
+
+    def is_completed(self, index: int, digest: str) -> bool:
+        """Returns whether the window was completed with the same input files."""
+        return self.completed.get(index) == digest
+
+    def mark_completed(self, index: int, digest: str) -> None:
+        self.completed[index] = digest
+
+    def save(self) -> None:
+        manifest = {"parameters": self.parameters, "completed": self.completed}
+        _atomic_write(self.path, lambda f: f.write(json.dumps(manifest).encode()))
+
+
+class ParticleCheckpoint:
+    """
+    Periodic checkpoint of the in-flight state of a window (particle positions and
+    integrator history), so that a restarted job resumes the window from its last
+    checkpoint instead of from its first snapshot.
+
+    Parameters
+    ----------
+    path : str
+        Path to the checkpoint (`.npz`) file.
+    digest : str
+        Digest of the input files of the window (see `window_digest`). Checkpoints
+        with a different digest are ignored.
+    interval : int
+        Number of steps between checkpoints.
+    """
+
+    def __init__(self, path: str, digest: str, interval: int):
+        self.path = path
+        self.digest = digest
+        self.interval = interval
+
+    def restore(
+        self, particles: NeighboringParticles, integrator: IntegratorStrategy
+    ) -> int:
+        """
+        Restores the state of the window, if checkpointed.
+
+        Args:
+            particles (NeighboringParticles): Seed particles of the window, whose
+                positions are overwritten (their initial spacing is kept).
+            integrator (IntegratorStrategy): Integrator whose history is restored.
+
+        Returns:
+            int: Number of steps already taken (0 if there is no checkpoint).
+        """
+        if not os.path.exists(self.path):
+            return 0
+
+        with np.load(self.path) as checkpoint:
+            if str(checkpoint["digest"]) != self.digest:
+                return 0
+            particles.positions[...] = checkpoint["positions"]
+            for name in checkpoint.files:
+                if name.startswith("integrator_"):
+                    setattr(
+                        integrator, name.removeprefix("integrator_"), checkpoint[name]
+                    )
+            return int(checkpoint["step"])
+
+    def save(
+        self, step: int, particles: NeighboringParticles, integrator: IntegratorStrategy
+    ) -> None:
+        """Checkpoints the window state, if `step` is a multiple of `interval`."""
+        if step % self.interval != 0:
+            return
+
+        integrator_state = {
+            f"integrator_{name}": value
+            for name, value in vars(integrator).items()
+            if isinstance(value, np.ndarray)
+        }
+        _atomic_write(
+            self.path,
+            lambda f: np.savez(
+                f,
+                step=step,
+                digest=self.digest,
+                positions=particles.positions,
+                **integrator_state,
+            ),
+        )
+
+    def remove(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
@@ -1,12 +1,100 @@
+from collections import OrderedDict
+
 import numpy as np
+from numpy.typing import DTypeLike
 from scipy.io import loadmat
 
 from src.caching import cache_last_n_files
 from src.my_types import ArrayFloat32MxN, ArrayFloat32Nx2
 from src.particles import NeighboringParticles
+from src.shared_store import SharedSnapshotStore
+
+
+class MatFileCache:
+    """
+    Per-process cache of the variables decoded from the last MATLAB files read,
+    shared by the velocity and coordinate readers.
+
+    Only the requested variables are decoded (other fields stored in the files,
+    such as pressure or vorticity, are skipped). When different readers request
+    variables from the same file (e.g. a snapshot file that also stores its grid),
+    those variables are remembered as companions, so that from then on they are
+    all decoded in a single parse of each file.
+
+    Parameters
+    ----------
+    num_cached_files : int
+        Number of files whose decoded variables are kept.
+    """
+
+    def __init__(self, num_cached_files: int = 2):
+        self.num_cached_files = num_cached_files
+        self.files = OrderedDict()  # file path -> {variable name: array}
+        self.companions = {}  # variable name -> variables read from the same files
+
+    def read(self, file_path: str, variable_names: tuple[str, ...]) -> list:
+        """
+        Returns the given variables of a MATLAB file, parsing the file only if
+        some of them are not cached. Arrays are read-only, since they are shared.
+
+        Args:
+            file_path (str): Path to the MATLAB file.
+            variable_names (tuple[str, ...]): Names of the variables to be read.
+
+        Returns:
+            list: The arrays of the variables, in the given order.
+        """
+        variables = self.files.setdefault(file_path, {})
+        self.files.move_to_end(file_path)
+
+        missing = set(variable_names) - variables.keys()
+        if missing:
+            if variables:
+                joint = missing | variables.keys()
+                for name in joint:
+                    self.companions[name] = self.companions.get(name, set()) | joint
+            missing = missing.union(*(self.companions.get(n, ()) for n in missing))
+            data = loadmat(file_path, variable_names=sorted(missing - variables.keys()))
+            for name, array in data.items():
+                if not name.startswith("__"):  # Skip the file header
+                    array.flags.writeable = False
+                    variables[name] = array
+
+            if len(self.files) > self.num_cached_files:
+                self.files.popitem(last=False)
+
+        try:
+            return [variables[name] for name in variable_names]
+        except KeyError as error:
+            raise KeyError(f"Variable {error} not found in {file_path}.") from None
+
+
+mat_file_cache = MatFileCache()
 
 
 class VelocityDataReader:
+    """
+    Reads velocity data (the `variable_names` fields of x and y), converted to `dtype`
+    (e.g. np.float32 to halve the memory footprint of the snapshots). Files are
+    decoded through `mat_cache` (see `MatFileCache`), shared by default by all
+    readers.
+
+    If a `store` is given, the decoded arrays are read only once per node and
+    shared (read-only) by all the workers (see `SharedSnapshotStore`).
+    """
+
+    def __init__(
+        self,
+        dtype: DTypeLike = np.float64,
+        store: SharedSnapshotStore | None = None,
+        variable_names: tuple[str, str] = ("velocity_x", "velocity_y"),
+        mat_cache: MatFileCache | None = None,
+    ):
+        self.dtype = dtype
+        self.store = store
+        self.variable_names = variable_names
+        self.mat_cache = mat_file_cache if mat_cache is None else mat_cache
+
     def read_raw(self, file_path: str) -> tuple[ArrayFloat32MxN, ArrayFloat32MxN]:
         """
         Reads velocity data from a MATLAB file and returns it as a tuple of numpy
@@ -18,10 +106,20 @@ class VelocityDataReader:
         Returns:
             tuple[ArrayFloat32MxN, ArrayFloat32MxN]: Tuple of arrays of shape [M, N].
         """
-        data = loadmat(file_path)
-        velocity_x = data["velocity_x"]
-        velocity_y = data["velocity_y"]
-        return velocity_x, velocity_y
+        if self.store is not None:
+            stacked = self.store.get(
+                (file_path, "velocity_raw", np.dtype(self.dtype).str),
+                lambda: np.stack(self._read_raw(file_path)),
+            )
+            return stacked[0], stacked[1]
+        return self._read_raw(file_path)
+
+    def _read_raw(self, file_path: str) -> tuple[ArrayFloat32MxN, ArrayFloat32MxN]:
+        velocity_x, velocity_y = self.mat_cache.read(file_path, self.variable_names)
+        return (
+            velocity_x.astype(self.dtype, copy=False),
+            velocity_y.astype(self.dtype, copy=False),
+        )
 
     def read_flatten(self, file_path: str) -> ArrayFloat32Nx2:
         """
@@ -34,13 +132,43 @@ class VelocityDataReader:
         Returns:
             ArrayFloat32Nx2: Array of shape [n_points, 2].
         """
-        data = loadmat(file_path)
-        velocity_x = data["velocity_x"].flatten()
-        velocity_y = data["velocity_y"].flatten()
-        return np.column_stack((velocity_x, velocity_y))
+        if self.store is not None:
+            return self.store.get(
+                (file_path, "velocity_flatten", np.dtype(self.dtype).str),
+                lambda: self._read_flatten(file_path),
+            )
+        return self._read_flatten(file_path)
+
+    def _read_flatten(self, file_path: str) -> ArrayFloat32Nx2:
+        velocity_x, velocity_y = self.mat_cache.read(file_path, self.variable_names)
+        # Single copy (and conversion) into the interleaved [n_points, 2] layout
+        velocity = np.stack((velocity_x, velocity_y), axis=-1, dtype=self.dtype)
+        return velocity.reshape(-1, 2)
 
 
 class CoordinateDataReader:
+    """
+    Reads coordinate data (the `variable_names` fields of x and y), converted to `dtype`
+    (e.g. np.float32 to halve the memory footprint of the snapshots). Files are
+    decoded through `mat_cache` (see `MatFileCache`), shared by default by all
+    readers.
+
+    If a `store` is given, the decoded arrays are read only once per node and
+    shared (read-only) by all the workers (see `SharedSnapshotStore`).
+    """
+
+    def __init__(
+        self,
+        dtype: DTypeLike = np.float64,
+        store: SharedSnapshotStore | None = None,
+        variable_names: tuple[str, str] = ("coordinate_x", "coordinate_y"),
+        mat_cache: MatFileCache | None = None,
+    ):
+        self.dtype = dtype
+        self.store = store
+        self.variable_names = variable_names
+        self.mat_cache = mat_file_cache if mat_cache is None else mat_cache
+
     def read_raw(self, file_path: str) -> tuple[ArrayFloat32MxN, ArrayFloat32MxN]:
         """
         Reads coordinate data from a MATLAB file and returns it as a tuple of numpy
@@ -52,10 +180,20 @@ class CoordinateDataReader:
         Returns:
             tuple[ArrayFloat32MxN, ArrayFloat32MxN]: Tuple of arrays of shape [M, N].
         """
-        data = loadmat(file_path)
-        coordinate_x = data["coordinate_x"]
-        coordinate_y = data["coordinate_y"]
-        return coordinate_x, coordinate_y
+        if self.store is not None:
+            stacked = self.store.get(
+                (file_path, "coordinate_raw", np.dtype(self.dtype).str),
+                lambda: np.stack(self._read_raw(file_path)),
+            )
+            return stacked[0], stacked[1]
+        return self._read_raw(file_path)
+
+    def _read_raw(self, file_path: str) -> tuple[ArrayFloat32MxN, ArrayFloat32MxN]:
+        coordinate_x, coordinate_y = self.mat_cache.read(file_path, self.variable_names)
+        return (
+            coordinate_x.astype(self.dtype, copy=False),
+            coordinate_y.astype(self.dtype, copy=False),
+        )
 
     def read_flatten(self, file_path: str) -> ArrayFloat32Nx2:
         """
@@ -68,10 +206,18 @@ class CoordinateDataReader:
         Returns:
             np.ndarray: Array of shape [n_points, 2].
         """
-        data = loadmat(file_path)
-        coordinate_x = data["coordinate_x"].flatten()
-        coordinate_y = data["coordinate_y"].flatten()
-        return np.column_stack((coordinate_x, coordinate_y))
+        if self.store is not None:
+            return self.store.get(
+                (file_path, "coordinate_flatten", np.dtype(self.dtype).str),
+                lambda: self._read_flatten(file_path),
+            )
+        return self._read_flatten(file_path)
+
+    def _read_flatten(self, file_path: str) -> ArrayFloat32Nx2:
+        coordinate_x, coordinate_y = self.mat_cache.read(file_path, self.variable_names)
+        # Single copy (and conversion) into the interleaved [n_points, 2] layout
+        coordinate = np.stack((coordinate_x, coordinate_y), axis=-1, dtype=self.dtype)
+        return coordinate.reshape(-1, 2)
 
 
 @cache_last_n_files(num_cached_files=2)
@@ -1,8 +1,6 @@
 import os
 from pathlib import Path
 
-import pandas as pd
-
 
 def find_files_with_pattern(root_dir: str, pattern: str) -> list[str]:
     """
@@ -37,19 +35,19 @@ def write_list_to_txt(file_list: list[str], output_file: str):
             f.write(file_path + "\n")
 
 
-def get_files_list(file_path: str) -> pd.DataFrame:
+def get_files_list(file_path: str) -> list[str]:
     """
-    Reads a file containing a list of paths to velocity, grid or particle files,
-    then returns its content as a Pandas DataFrame.
+    Reads a file containing a list (columnwise) of paths to velocity, grid or
+    particle files, skipping blank lines.
 
     Args:
         file_path (str): Path to the file that holds the list.
 
     Returns:
-        pd.DataFrame: DataFrame containing list of files.
+        list[str]: List of files.
     """
     if os.path.exists(file_path):
-        data = pd.read_csv(file_path, header=None)
-        return data.iloc[:, 0].tolist()
+        with open(file_path) as f:
+            return [line.strip() for line in f if line.strip()]
     else:
         raise FileNotFoundError(f"File not found at {file_path}")
@@ -0,0 +1,192 @@
+import os
+from collections import OrderedDict
+
+import numpy as np
+from numpy.typing import DTypeLike
+from scipy.spatial import cKDTree
+
+from src.checkpoint import window_digest
+from src.integrate import get_integrator
+from src.interpolate import (
+    InterpolationStrategy,
+    InterpolatorFactory,
+    UniformGrid,
+    build_interpolator,
+)
+from src.particles import NeighboringParticles, ParticleBatch
+from src.telemetry import telemetry
+
+
+class FlowMapStore:
+    """
+    Short flow maps between consecutive snapshots, computed only once and shared by
+    all the sliding windows that overlap them.
+
+    The short map of snapshot `k` advances the nodes of the snapshot grid by one
+    integration step with the velocity of snapshot `k`. It is stored as the
+    displacement of each node, so that it can be evaluated anywhere in the domain
+    by interpolation (with the same strategy used for the velocity field).
+
+    Maps are kept in an in-memory LRU cache of interpolators and, optionally,
+    saved to disk as `flow_map{k:04d}.npz` so that other workers (and later runs)
+    can reuse them. Each map is stored with the digest of its snapshot and grid
+    files (see `window_digest`), so a map computed from other (or modified) inputs
+    at the same index, e.g. after a snapshot file is overwritten, is computed again
+    instead of being reused.
+
+    Parameters
+    ----------
+    interpolator_factory : InterpolatorFactory
+        Factory used to build the velocity interpolator of each snapshot.
+    integrator_name : str
+        Name of the time-stepping method (see `get_integrator`). Since every short
+        map is a single step, multistep methods (AB2) reduce to their first step.
+    strategy : str
+        Interpolation strategy for both velocity and displacement fields.
+    h : float
+        Timestep between consecutive snapshots.
+    cache_dir : str, optional
+        Directory where the short maps are saved. If None, maps are only kept in
+        memory.
+    num_cached_maps : int
+        Number of short-map interpolators kept in memory.
+    dtype : DTypeLike
+        Floating-point precision of the stored displacements (the grid nodes are
+        always advanced in double precision).
+    """
+
+    def __init__(
+        self,
+        interpolator_factory: InterpolatorFactory,
+        integrator_name: str,
+        strategy: str,
+        h: float,
+        cache_dir: str | None = None,
+        num_cached_maps: int = 2,
+        dtype: DTypeLike = np.float64,
+    ):
+        self.interpolator_factory = interpolator_factory
+        self.integrator_name = integrator_name
+        self.strategy = strategy
+        self.h = h
+        self.cache_dir = cache_dir
+        self.num_cached_maps = num_cached_maps
+        self.dtype = dtype
+        self.cache = OrderedDict()
+
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    def get(self, k: int, snapshot_file: str, grid_file: str) -> InterpolationStrategy:
+        """
+        Returns an interpolator of the displacement of the short map of snapshot `k`.
+
+        Args:
+            k (int): Index of the snapshot where the short map starts.
+            snapshot_file (str): Path to the velocity data file of snapshot `k`.
+            grid_file (str): Path to the coordinate data file of snapshot `k`.
+
+        Returns:
+            InterpolationStrategy: Interpolator of the node displacements.
+        """
+        digest = window_digest([snapshot_file, grid_file])
+        if k in self.cache and self.cache[k][0] == digest:
+            self.cache.move_to_end(k)
+            return self.cache[k][1]
+
+        geometry, nodes = self._read_grid(grid_file)
+        displacement = self._load(k, digest)
+        if displacement is None:
+            displacement = self._compute(nodes, snapshot_file, grid_file)
+            self._save(k, digest, displacement)
+
+        if self.strategy.startswith("grid"):
+            grid_shape = geometry.shape[::-1] if geometry.transposed else geometry.shape
+            displacement = (
+                displacement[:, 0].reshape(grid_shape),
+                displacement[:, 1].reshape(grid_shape),
+            )
+        interpolator = build_interpolator(geometry, displacement, self.strategy)
+
+        self.cache[k] = (digest, interpolator)
+        self.cache.move_to_end(k)
+        if len(self.cache) > self.num_cached_maps:
+            self.cache.popitem(last=False)
+
+        return interpolator
+
+    def _read_grid(self, grid_file: str):
+        """
+        Returns the geometry of the grid (shared with the velocity interpolators,
+        see `InterpolatorFactory.get_geometry`) and its nodes, of shape [n_nodes, 2].
+        """
+        geometry = self.interpolator_factory.get_geometry(grid_file, self.strategy)
+        if isinstance(geometry, UniformGrid):
+            nodes = geometry.nodes
+        else:
+            nodes = geometry.data if isinstance(geometry, cKDTree) else geometry.points
+        return geometry, nodes
+
+    def _compute(self, nodes, snapshot_file: str, grid_file: str) -> np.ndarray:
+        """
+        Advances the grid nodes by one step and returns their displacement.
+
+        Nodes whose step leaves the domain (NaN positions) would spoil the
+        interpolation of the whole map, so they fall back to the Euler
+        displacement, which only needs the velocity at the node itself.
+        """
+        batch = ParticleBatch(np.array(nodes, dtype=np.float64))
+        interpolator = self.interpolator_factory.create_interpolator(
+            snapshot_file, grid_file, self.strategy
+        )
+        with telemetry.measure("integrate", len(batch.positions)):
+            integrator = get_integrator(self.integrator_name)
+            integrator.integrate(self.h, batch, interpolator)
+
+        displacement = batch.positions - nodes
+        outside = ~np.isfinite(displacement).all(axis=1)
+        if np.any(outside):
+            displacement[outside] = self.h * interpolator.interpolate(nodes[outside])
+
+        return displacement.astype(self.dtype, copy=False)
+
+    def _path(self, k: int) -> str:
+        return os.path.join(self.cache_dir, f"flow_map{k:04d}.npz")
+
+    def _load(self, k: int, digest: str) -> np.ndarray | None:
+        """Returns the saved map `k`, unless missing or computed from other inputs."""
+        if self.cache_dir is None or not os.path.exists(self._path(k)):
+            return None
+        with np.load(self._path(k)) as data:
+            if str(data["digest"]) != digest:
+                return None
+            return data["displacement"]
+
+    def _save(self, k: int, digest: str, displacement: np.ndarray) -> None:
+        if self.cache_dir is None:
+            return
+        # Write to a temporary file first, so that concurrent workers never read a
+        # partially written map (or a map with the digest of another one)
+        os.makedirs(self.cache_dir, exist_ok=True)  # Removed when a job is reset
+        tmp_path = f"{self._path(k)}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, displacement=displacement, digest=np.array(digest))
+        os.replace(tmp_path, self._path(k))
+
+
+def compose_flow_maps(
+    particles: NeighboringParticles, flow_maps: list[InterpolationStrategy]
+) -> None:
+    """
+    Advances the particles by composing a sequence of short flow maps, i.e.,
+    x <- x + d_k(x) for each displacement interpolator d_k, in order.
+    WARNING: This function performs in-place mutations of the particle positions.
+
+    Args:
+        particles (NeighboringParticles): Particles to be advanced.
+        flow_maps (list[InterpolationStrategy]): Displacement interpolators of the
+            consecutive short maps.
+    """
+    for flow_map in flow_maps:
+        particles.positions += flow_map.interpolate(
+            particles.positions, particles.simplex_hint
+        )
@@ -1,14 +1,99 @@
 import numpy as np
 
-from src.my_types import ArrayFloat32Nx2x2
+from src.my_types import ArrayFloat32N, ArrayFloat32Nx2x2
+from src.particles import NeighboringParticles
 
 
 def compute_ftle(flow_map_jacobian: ArrayFloat32Nx2x2, map_period: float):
-    # compute the Cauchy-Green deformation tensor
-    cauchy_green_tensor = np.einsum(
-        "...ji,...jk->...ik", flow_map_jacobian, flow_map_jacobian
+    return _ftle_from_jacobian_entries(
+        flow_map_jacobian[:, 0, 0],
+        flow_map_jacobian[:, 0, 1],
+        flow_map_jacobian[:, 1, 0],
+        flow_map_jacobian[:, 1, 1],
+        map_period,
+        out=np.empty(flow_map_jacobian.shape[0], dtype=flow_map_jacobian.dtype),
     )
 
-    max_eigvals = np.linalg.eigvals(cauchy_green_tensor).max(axis=1)
 
-    return 1 / map_period * np.log(np.sqrt(max_eigvals))
+def compute_ftle_from_particles(
+    particles: NeighboringParticles,
+    map_period: float,
+    out: ArrayFloat32N | None = None,
+    block_size: int = 65536,
+) -> ArrayFloat32N:
+    """
+    Computes the FTLE field directly from the neighboring particles, fusing the
+    finite-difference flow map Jacobian, the Cauchy-Green deformation tensor and its
+    largest eigenvalue (in closed form) into a single pass.
+
+    Particles are processed in blocks of `block_size`, so that the temporaries stay
+    small (and in cache) regardless of the number of particles.
+
+    Args:
+        particles (NeighboringParticles): The positions at forward or backward time.
+        map_period (float): Integration period of the flow map.
+        out (ArrayFloat32N, optional): Array of shape [N] where the FTLE field is
+            written (e.g. a row of a preallocated output). A new array with the
+            precision of the particles is allocated if not given.
+        block_size (int): Number of particles processed at once.
+
+    Returns:
+        ArrayFloat32N: The FTLE field, of shape [N].
+    """
+    num_particles = len(particles)
+    if out is None:
+        out = np.empty(num_particles, dtype=particles.positions.dtype)
+
+    positions = particles.positions
+    left, right, top, bottom = (
+        positions[k * num_particles : (k + 1) * num_particles] for k in range(4)
+    )
+    initial_right_left = particles.initial_delta_right_left[:, 0]
+    initial_top_bottom = particles.initial_delta_top_bottom[:, 1]
+
+    for start in range(0, num_particles, block_size):
+        block = slice(start, min(start + block_size, num_particles))
+
+        delta_right_left = right[block] - left[block]
+        delta_right_left /= initial_right_left[block, None]
+        delta_top_bottom = top[block] - bottom[block]
+        delta_top_bottom /= initial_top_bottom[block, None]
+
+        _ftle_from_jacobian_entries(
+            delta_right_left[:, 0],
+            delta_top_bottom[:, 0],
+            delta_right_left[:, 1],
+            delta_top_bottom[:, 1],
+            map_period,
+            out=out[block],
+        )
+
+    return out
+
+
+def _ftle_from_jacobian_entries(a, b, c, d, map_period: float, out):
+    """
+    Computes the FTLE from the entries of the flow map Jacobian [[a, b], [c, d]],
+    writing it into `out`.
+
+    The largest eigenvalue of the (symmetric) Cauchy-Green tensor [[p, q], [q, r]]
+    is evaluated as (p + r) / 2 + hypot((p - r) / 2, q), which, unlike the usual
+    tr / 2 + sqrt(tr^2 / 4 - det), involves no cancellation when both eigenvalues
+    are close (degenerate stretching) and never takes the square root of a
+    negative round-off.
+    """
+    p = a * a + c * c
+    r = b * b + d * d
+    q = a * b + c * d
+
+    half_difference = p - r
+    half_difference *= 0.5
+    max_eigenvalue = np.hypot(half_difference, q, out=half_difference)
+    p += r
+    p *= 0.5
+    max_eigenvalue += p
+
+    # 1 / T * log(sqrt(max_eigenvalue))
+    np.log(max_eigenvalue, out=out)
+    out *= 0.5 / map_period
+    return out
@@ -0,0 +1,217 @@
+import json
+import os
+import queue
+import threading
+from typing import Callable, Protocol
+
+import numpy as np
+from numpy.lib.format import open_memmap
+from numpy.typing import DTypeLike
+from scipy.io import savemat
+
+from src.my_types import ArrayFloat32N
+from src.refinement import QuadtreeFTLE
+from src.telemetry import telemetry
+
+
+class FTLEWriter(Protocol):
+    def write(self, index: int, ftle_field: ArrayFloat32N) -> None:
+        """Saves the FTLE field of the window `index`."""
+        ...
+
+    def close(self) -> None:
+        """Flushes the pending writes."""
+        ...
+
+
+class MatFTLEWriter:
+    """
+    Writes the FTLE field of each window to its own `ftle{index:04d}.mat` file,
+    along with the cells of its quadtree, if refined (see `QuadtreeFTLE`).
+    """
+
+    def __init__(self, output_dir: str, dtype: DTypeLike | None = None):
+        if dtype is not None and np.dtype(dtype) == np.float16:
+            # `savemat` would silently store them as doubles
+            raise ValueError("MATLAB files do not support `float16` fields.")
+        self.output_dir = output_dir
+        self.dtype = dtype
+        os.makedirs(output_dir, exist_ok=True)
+
+    def write(self, index: int, ftle_field: ArrayFloat32N | QuadtreeFTLE) -> None:
+        if isinstance(ftle_field, QuadtreeFTLE):
+            data = ftle_field.to_dict()  # The cells of the tree, see `QuadtreeFTLE`
+        else:
+            data = {"ftle": ftle_field}
+        if self.dtype is not None:
+            data["ftle"] = data["ftle"].astype(self.dtype, copy=False)
+        filename = os.path.join(self.output_dir, f"ftle{index:04d}.mat")
+        savemat(filename, data)
+
+    def close(self) -> None:
+        pass
+
+
+class StackedFTLEWriter:
+    """
+    Writes the FTLE fields of all windows into a single preallocated, memory-mapped
+    array `ftle.npy` of shape [num_windows, num_particles], where row `index` holds
+    the window `index`. The store also holds `ftle_completed.npy`, flagging the rows
+    already written, and an `ftle_index.json` describing the windows, so that
+    downstream tools read one file instead of one per window.
+
+    The store is created once with `create`, before the workers (possibly in other
+    processes) open it to write their disjoint rows.
+
+    Parameters
+    ----------
+    output_dir : str
+        Directory of the store.
+    """
+
+    DATA_FILE = "ftle.npy"
+    COMPLETED_FILE = "ftle_completed.npy"
+    INDEX_FILE = "ftle_index.json"
+
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        self.ftle = np.load(os.path.join(output_dir, self.DATA_FILE), mmap_mode="r+")
+        self.completed = np.load(
+            os.path.join(output_dir, self.COMPLETED_FILE), mmap_mode="r+"
+        )
+
+    @classmethod
+    def create(
+        cls,
+        output_dir: str,
+        num_particles: int,
+        window_files: list[str],
+        map_period: float,
+        dtype: DTypeLike = np.float64,
+        keep_existing: bool = False,
+    ) -> None:
+        """
+        Preallocates the store of the FTLE fields of all windows.
+
+        Args:
+            output_dir (str): Directory of the store.
+            num_particles (int): Number of particles (FTLE values) of each window.
+            window_files (list[str]): First snapshot file of each window.
+            map_period (float): Integration period of the flow maps.
+            dtype (DTypeLike): Precision of the stored FTLE fields (e.g. float16 to
+                quarter the size of the store).
+            keep_existing (bool): Whether to keep the windows of an existing store
+                with the same number of particles and precision (e.g. to resume a
+                job, or to append the windows of new snapshots).
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        data_path = os.path.join(output_dir, cls.DATA_FILE)
+        completed_path = os.path.join(output_dir, cls.COMPLETED_FILE)
+        shape = (len(window_files), num_particles)
+
+        existing_shape = None
+        if keep_existing and os.path.exists(data_path):
+            existing = np.load(data_path, mmap_mode="r")
+            if existing.shape[1] == num_particles and existing.dtype == dtype:
+                existing_shape = existing.shape
+            del existing
+
+        if existing_shape is None:
+            open_memmap(data_path, "w+", dtype, shape).flush()
+            open_memmap(completed_path, "w+", np.bool_, shape[:1]).flush()
+        elif existing_shape != shape:
+            # Resize, keeping the windows that fit in the new store
+            num_kept = min(existing_shape[0], shape[0])
+            for path, new_shape, new_dtype in [
+                (data_path, shape, dtype),
+                (completed_path, shape[:1], np.bool_),
+            ]:
+                old = np.load(path, mmap_mode="r")
+                new = open_memmap(f"{path}.tmp", "w+", new_dtype, new_shape)
+                new[:num_kept] = old[:num_kept]
+                new.flush()
+                del old, new
+                os.replace(f"{path}.tmp", path)
+
+        index = {
+            "shape": shape,
+            "dtype": np.dtype(dtype).name,
+            "map_period": map_period,
+            "window_files": window_files,
+        }
+        with open(os.path.join(output_dir, cls.INDEX_FILE), "w") as f:
+            json.dump(index, f, indent=2)
+
+    def write(self, index: int, ftle_field: ArrayFloat32N) -> None:
+        self.ftle[index] = ftle_field
+        self.completed[index] = True
+
+    def close(self) -> None:
+        self.ftle.flush()
+        self.completed.flush()
+
+
+class AsyncFTLEWriter:
+    """
+    Hands the FTLE fields over to a dedicated writer thread, so that the compute
+    worker does not stall on I/O. At most `max_pending` fields wait to be written;
+    further writes block until there is room. Errors raised by the underlying
+    writer are re-raised by the next `write` or by `close`.
+
+    Parameters
+    ----------
+    writer : FTLEWriter
+        Writer that actually saves the fields.
+    max_pending : int
+        Maximum number of fields waiting to be written.
+    on_written : Callable[[int], None], optional
+        Function called (from the writer thread) with the index of each window
+        once its field is saved.
+    """
+
+    def __init__(
+        self,
+        writer: FTLEWriter,
+        max_pending: int = 4,
+        on_written: Callable[[int], None] | None = None,
+    ):
+        self.writer = writer
+        self.on_written = on_written
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.error = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, index: int, ftle_field: ArrayFloat32N) -> None:
+        self._raise_error()
+        self.pending.put((index, ftle_field))
+
+    def close(self) -> None:
+        self.pending.put(None)
+        self.thread.join()
+        self._raise_error()
+
+    def _raise_error(self) -> None:
+        if self.error is not None:
+            raise self.error
+
+    def _run(self) -> None:
+        while (item := self.pending.get()) is not None:
+            if self.error is None:  # Drop the remaining fields after an error
+                try:
+                    with telemetry.measure("write", 1):
+                        self.writer.write(*item)
+                    if self.on_written is not None:
+                        self.on_written(item[0])
+                except Exception as error:
+                    self.error = error
+        try:
+            self.writer.close()
+        except Exception as error:
+            self.error = self.error or error
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 
 import configargparse
 
@@ -6,24 +6,60 @@ import configargparse
 @dataclass
 class MyProgramArgs:
     """
-    This is a helper to provide typehints of the arguments.
-    All possible arguments must be declared in this dataclass.
+    Configuration of a run, parsed from the command line and config file (see
+    `parse_args`), or built directly to run the computation from Python (see
+    `src.main.run`). All possible arguments must be declared in this dataclass.
     """
 
-    config_filepath: any
-
     # logger parameters
     experiment_name: str
 
     # input parameters
-    list_velocity_files: str
-    list_grid_files: str
     list_particle_files: str
     snapshot_timestep: float
     flow_map_period: float
-    integrator: str
-    interpolator: str
-    num_processes: int
+    list_velocity_files: str | None = None
+    list_grid_files: str | None = None
+    integration_timestep: float | None = None
+    integrator: str = "euler"
+    interpolator: str = "cubic"
+    num_processes: int = 1
+    execution_mode: str = "window"
+    precision: str = "float64"
+    snapshot_store: str | None = None
+    output_format: str = "mat"
+    resume: bool = False
+    checkpoint_interval: int | None = None
+    output_precision: str | None = None
+    shared_memory_size: float | None = None
+    prefetch_depth: int = 0
+    prefetch_memory: float | None = None
+    trace: bool = False
+    profile_window: int | None = None
+    replay_window: int | None = None
+    track_memory: bool = False
+    velocity_field: str = "files"
+    velocity_field_parameters: dict = field(default_factory=dict)
+    num_snapshots: int | None = None
+    watch: bool = False
+    watch_directory: str | None = None
+    watch_pattern: str = ".mat"
+    poll_interval: float = 1.0
+    watch_timeout: float | None = None
+    refinement_levels: int = 0
+    refinement_fraction: float = 0.1
+    config_filepath: str | None = None
+
+
+def key_value_pairs(text: str) -> dict[str, float]:
+    """Parses comma-separated `name=value` pairs (e.g. `epsilon=0.1,omega=0.6`)."""
+    pairs = {}
+    for pair in filter(None, text.split(",")):
+        name, separator, value = pair.partition("=")
+        if not separator:
+            raise ValueError(f"Expected `name=value`, got `{pair}`.")
+        pairs[name.strip()] = float(value)
+    return pairs
 
 
 parser = configargparse.ArgumentParser()
@@ -51,18 +87,20 @@ parser.add_argument(
 parser.add_argument(
     "--list_velocity_files",
     type=str,
-    required=True,
+    default=None,
     help="Text file containing a list (columnwise) of paths to velocity files. "
     "The user must guarantee that there exist a proper implementation of the "
-    "reader for the desired velocity file format.",
+    "reader for the desired velocity file format. Required unless an analytic "
+    "`velocity_field` is selected.",
 )
 parser.add_argument(
     "--list_grid_files",
     type=str,
-    required=True,
+    default=None,
     help="Text file containing a list (columnwise) of paths to grid files. "
     "The user must guarantee that there exist a proper implementation of the "
-    "reader for the desired grid file format.",
+    "reader for the desired grid file format. Required unless an analytic "
+    "`velocity_field` is selected.",
 )
 parser.add_argument(
     "--list_particle_files",
@@ -81,6 +119,17 @@ parser.add_argument(
     help="Timestep between snapshots. If positive, the forward-time FTLE field "
     "is computed. If negative, then the backward-time FTLE is computed.",
 )
+parser.add_argument(
+    "--integration_timestep",
+    type=float,
+    default=None,
+    help="Magnitude of the timestep used to integrate the particles. If given, the "
+    "velocity is linearly interpolated in time between consecutive snapshots, so "
+    "that integration steps may be smaller or larger than the `snapshot_timestep` "
+    "(e.g. to list only every n-th snapshot and still converge). The step is "
+    "adjusted to span the flow map period with an integer number of steps. Only "
+    "supported by the `window` execution mode. default=None (one step per snapshot)",
+)
 parser.add_argument(
     "--flow_map_period",
     type=float,
@@ -92,16 +141,44 @@ parser.add_argument(
     "--integrator",
     type=str,
     choices=["rk4", "euler", "ab2"],
+    default="euler",
     help="Select the time-stepping method to integrate the particles in time. "
     "default='euler'",
 )
 parser.add_argument(
     "--interpolator",
     type=str,
-    choices=["cubic", "linear", "nearest", "grid"],
+    choices=["cubic", "linear", "nearest", "grid", "grid_cubic"],
+    default="cubic",
     help="Select interpolator strategy to evaluate the particle velocity at "
     "their current location. default='cubic'",
 )
+parser.add_argument(
+    "--velocity_field",
+    type=str,
+    choices=["files", "double_gyre"],
+    default="files",
+    help="Source of the velocity field. `files` interpolates the snapshots listed "
+    "in `list_velocity_files`. Analytic fields (`double_gyre`) are evaluated "
+    "directly at the particle positions, at the exact time of each integration "
+    "stage, without reading any file (the `interpolator` is ignored). Snapshots are "
+    "then only the `num_snapshots` times spaced by `snapshot_timestep` from t=0. "
+    "Not supported by the `composition` execution mode. default='files'",
+)
+parser.add_argument(
+    "--velocity_field_parameters",
+    type=key_value_pairs,
+    default={},
+    help="Comma-separated `name=value` parameters of the analytic velocity field "
+    "(e.g. `amplitude=0.1,epsilon=0.25,omega=0.628` for `double_gyre`). "
+    "default='' (default parameters of the field)",
+)
+parser.add_argument(
+    "--num_snapshots",
+    type=int,
+    default=None,
+    help="Number of snapshots of an analytic `velocity_field`. default=None",
+)
 parser.add_argument(
     "--num_processes",
     type=int,
@@ -109,6 +186,203 @@ parser.add_argument(
     help="Number of workers in the multiprocessing pool. Each worker will compute "
     "the FTLE field of a given snapshot. default=1 (no parallelization)",
 )
+parser.add_argument(
+    "--execution_mode",
+    type=str,
+    choices=["window", "sweep", "composition"],
+    default="window",
+    help="Select how the sliding windows are computed. `window` integrates each "
+    "window from scratch, reading every snapshot once per window it belongs to. "
+    "`sweep` advances all windows of a contiguous block together in a single pass "
+    "over the snapshots, reading each snapshot only once per worker. "
+    "`composition` computes the short flow map between each pair of consecutive "
+    "snapshots only once (cached under the experiment output directory) and "
+    "obtains each window by composing them. default='window'",
+)
+parser.add_argument(
+    "--precision",
+    type=str,
+    choices=["float64", "float32"],
+    default="float64",
+    help="Floating-point precision of the velocity snapshots, particle positions and "
+    "FTLE output. `float32` halves the memory of the snapshot data held by each "
+    "worker, so that more processes fit in the same node. Grid coordinates are always "
+    "read in float64, and triangulation-based interpolators evaluate in float64. "
+    "default='float64'",
+)
+parser.add_argument(
+    "--output_format",
+    type=str,
+    choices=["mat", "stacked"],
+    default="mat",
+    help="Format of the FTLE output. `mat` writes one `ftle{index:04d}.mat` file per "
+    "window. `stacked` writes all windows into a single memory-mapped `ftle.npy` "
+    "array of shape [num_windows, num_particles], with an `ftle_index.json` "
+    "describing the windows. Writes happen on a dedicated thread. default='mat'",
+)
+parser.add_argument(
+    "--output_precision",
+    type=str,
+    choices=["float16", "float32", "float64"],
+    default=None,
+    help="Precision of the saved FTLE fields (`float16` requires the `stacked` "
+    "output format). default=None (same as `precision`)",
+)
+parser.add_argument(
+    "--resume",
+    action="store_true",
+    help="Resume a previous run of the experiment, skipping the windows it "
+    "completed (recorded in `manifest.json`, along with the run parameters and the "
+    "fingerprints of the input files). Only windows that are new (e.g. made "
+    "possible by snapshots appended to the input lists) or whose input files "
+    "changed are computed. Ignored if the run parameters changed.",
+)
+parser.add_argument(
+    "--checkpoint_interval",
+    type=int,
+    default=None,
+    help="Number of integration steps between checkpoints of the in-flight particle "
+    "state of each window (`window` execution mode), so that a resumed run "
+    "restarts unfinished windows from their last checkpoint. default=None "
+    "(disabled)",
+)
+parser.add_argument(
+    "--snapshot_store",
+    type=str,
+    default=None,
+    help="Directory of a memory-mapped snapshot store (see `python -m "
+    "src.memmap_store`). If given, velocities and coordinates are read from the "
+    "store as zero-copy views instead of parsing the MATLAB files, which are only "
+    "used as keys. default=None (read the MATLAB files)",
+)
+parser.add_argument(
+    "--shared_memory_size",
+    type=float,
+    default=None,
+    help="If given, the decoded snapshots are read only once per node and shared by "
+    "all the workers through shared memory, instead of being read and held by each "
+    "worker. Snapshots in use are always kept; this is the size (in MB) of the "
+    "unused ones kept as a cache for other workers. default=None (disabled)",
+)
+parser.add_argument(
+    "--prefetch_depth",
+    type=int,
+    default=0,
+    help="Number of snapshots read, decoded and turned into interpolators ahead of "
+    "use by a background thread of each worker, overlapping I/O with integration "
+    "(`window` and `sweep` execution modes). default=0 (disabled)",
+)
+parser.add_argument(
+    "--prefetch_memory",
+    type=float,
+    default=None,
+    help="Maximum memory (in MB) held by the interpolators built ahead by each "
+    "worker. At least one snapshot is always prefetched. default=None (unbounded)",
+)
+parser.add_argument(
+    "--trace",
+    action="store_true",
+    help="Records the start and end of each window and stage of every worker in "
+    "`outputs/<experiment_name>/trace.json` (Chrome trace-event format, viewable "
+    "in chrome://tracing or ui.perfetto.dev). default=False",
+)
+parser.add_argument(
+    "--profile_window",
+    type=int,
+    default=None,
+    help="Index of a window to be profiled with cProfile (in the `sweep` execution "
+    "mode, the whole block holding it), saving the stats to "
+    "`outputs/<experiment_name>/profile<index>.prof`. default=None (disabled)",
+)
+parser.add_argument(
+    "--replay_window",
+    type=int,
+    default=None,
+    help="Index of a single window to be computed in the current process, without "
+    "a pool nor job manifest (e.g. to debug or profile it). default=None (compute "
+    "all windows)",
+)
+parser.add_argument(
+    "--track_memory",
+    action="store_true",
+    help="Records the peak memory (RSS, and allocations traced by tracemalloc) of "
+    "each stage and worker, and the estimated bytes held by the caches of each "
+    "worker, in `telemetry.json`. Tracing allocations slows down the run. "
+    "default=False",
+)
+
+
+parser.add_argument(
+    "--watch",
+    action="store_true",
+    help="Online mode for running simulations: follows the velocity files as they "
+    "are written (listed in the growing `list_velocity_files`, or found in the "
+    "`watch_directory`) and saves the backward-time FTLE of the newest window "
+    "whenever a new snapshot is complete. Each snapshot only adds one integration "
+    "step of the grid nodes (its short flow map), composed with the maps of the "
+    "previous snapshots of the window. Requires a negative `snapshot_timestep`, a "
+    "single (fixed) grid file and the `mat` output format. default=False",
+)
+parser.add_argument(
+    "--watch_directory",
+    type=str,
+    default=None,
+    help="Directory searched (recursively) for the velocity files in the `watch` "
+    "mode, instead of `list_velocity_files`. default=None",
+)
+parser.add_argument(
+    "--watch_pattern",
+    type=str,
+    default=".mat",
+    help="Pattern matched by the names of the velocity files in the "
+    "`watch_directory`, which are taken in name order. default='.mat'",
+)
+parser.add_argument(
+    "--poll_interval",
+    type=float,
+    default=1.0,
+    help="Time (in seconds) between checks for new snapshots in the `watch` mode. "
+    "A snapshot is read once its size and modification time did not change "
+    "between two checks. default=1.0",
+)
+parser.add_argument(
+    "--watch_timeout",
+    type=float,
+    default=None,
+    help="Time (in seconds) without new snapshots after which the `watch` mode "
+    "stops. default=None (until interrupted)",
+)
 
 
-args = MyProgramArgs(**vars(parser.parse_args()))
+parser.add_argument(
+    "--refinement_levels",
+    type=int,
+    default=0,
+    help="Number of levels of adaptive seed refinement. The cells of the seed "
+    "particles (on a lattice) with the highest FTLE or FTLE gradient are split "
+    "into 4 children, whose FTLE is then computed, level after level, so the "
+    "ridges are resolved at a fraction of the particles of a dense seeding. The "
+    "cells of the resulting quadtree are saved along with the FTLE (requires the "
+    "`mat` output format and the `window` or `composition` execution mode). "
+    "default=0 (uniform seeding)",
+)
+parser.add_argument(
+    "--refinement_fraction",
+    type=float,
+    default=0.1,
+    help="Fraction of the coarse seed particles with the highest FTLE (and, "
+    "separately, FTLE gradient) that sets the refinement thresholds. default=0.1",
+)
+
+
+def parse_args(argv: list[str] | None = None) -> MyProgramArgs:
+    """
+    Parses the command-line arguments (and config file, if given) of a run.
+
+    Args:
+        argv (list[str], optional): Arguments to parse. Defaults to `sys.argv[1:]`.
+
+    Returns:
+        MyProgramArgs: Configuration of the run.
+    """
+    return MyProgramArgs(**vars(parser.parse_args(argv)))
@@ -1,7 +1,30 @@
 from typing import Protocol
 
-from src.interpolate import InterpolationStrategy
+import numpy as np
+
+from src.interpolate import (
+    InterpolationStrategy,
+    TimeDependentInterpolationStrategy,
+)
+from src.my_types import ArrayFloat32Nx2, ArrayIntN
 from src.particles import NeighboringParticles
+from src.telemetry import telemetry
+
+
+def evaluate_velocity(
+    interpolator: InterpolationStrategy | TimeDependentInterpolationStrategy,
+    t: float,
+    points: ArrayFloat32Nx2,
+    simplex_hint: ArrayIntN | None,
+) -> ArrayFloat32Nx2:
+    """
+    Evaluates the velocity at the given points. Snapshot interpolators are frozen in
+    time, whereas time-dependent interpolators are evaluated at time `t`.
+    """
+    with telemetry.measure("interpolate", len(points)):
+        if isinstance(interpolator, TimeDependentInterpolationStrategy):
+            return interpolator.interpolate_at(t, points, simplex_hint)
+        return interpolator.interpolate(points, simplex_hint)
 
 
 class IntegratorStrategy(Protocol):
@@ -10,6 +33,7 @@ class IntegratorStrategy(Protocol):
         h: float,
         particles: NeighboringParticles,
         interpolator: InterpolationStrategy,
+        t: float = 0.0,
     ) -> None:
         """
         Perform a single integration step (Euler, Runge-Kutta, Adams-Bashforth 2).
@@ -18,10 +42,15 @@ class IntegratorStrategy(Protocol):
         Args:
             h (float): Step size for integration.
             particles (NeighboringParticles): Dataclass instance containing the
-                coordinates of the particles at the current step.
+                coordinates of the particles at the current step (and the simplex
+                hint used to warm-start the interpolation).
             interpolator (InterpolationStrategy):
                 An instance of an interpolation strategy that computes the velocity
-                given the position values.
+                given the position values. Time-dependent strategies (see
+                `TimeDependentInterpolationStrategy`) are evaluated at the times of
+                the intermediate stages.
+            t (float): Time at the beginning of the step. Only used by
+                time-dependent interpolation strategies.
         """
         ...
 
@@ -41,6 +70,9 @@ class AdamsBashforth2Integrator:
     - n+2 → Future timestep, to be be stored in `particles` after integration
     - n+1 → Current timestep, obtained from `particles`
     - n   → Previous timestep, obtained from `particles_previous`
+
+    Rows of `previous_velocity` filled with NaN have no history yet (e.g. particles
+    that joined a batch at the current step) and fall back to the Euler method.
     """
 
     def __init__(self):
@@ -51,16 +83,24 @@ class AdamsBashforth2Integrator:
         h: float,
         particles: NeighboringParticles,
         interpolator: InterpolationStrategy,
+        t: float = 0.0,
     ) -> None:
-        current_velocity = interpolator.interpolate(particles.positions)
+        current_velocity = evaluate_velocity(
+            interpolator, t, particles.positions, particles.simplex_hint
+        )
 
         if self.previous_velocity is None:
             # First step: fallback to Euler method
             particles.positions += h * current_velocity
         else:
             # Adams-Bashforth 2-step method
+            previous_velocity = np.where(
+                np.isnan(self.previous_velocity),
+                current_velocity,
+                self.previous_velocity,
+            )
             particles.positions += h * (
-                1.5 * current_velocity - 0.5 * self.previous_velocity
+                1.5 * current_velocity - 0.5 * previous_velocity
             )
 
         # Store current velocity for the next step
@@ -82,8 +122,11 @@ class EulerIntegrator:
         h: float,
         particles: NeighboringParticles,
         interpolator: InterpolationStrategy,
+        t: float = 0.0,
     ) -> None:
-        particles.positions += h * interpolator.interpolate(particles.positions)
+        particles.positions += h * evaluate_velocity(
+            interpolator, t, particles.positions, particles.simplex_hint
+        )
 
 
 class RungeKutta4Integrator:
@@ -101,12 +144,15 @@ class RungeKutta4Integrator:
         h: float,
         particles: NeighboringParticles,
         interpolator: InterpolationStrategy,
+        t: float = 0.0,
     ) -> None:
-        # Compute the four slopes (k1, k2, k3, k4)
-        k1 = interpolator.interpolate(particles.positions)
-        k2 = interpolator.interpolate(particles.positions + 0.5 * h * k1)
-        k3 = interpolator.interpolate(particles.positions + 0.5 * h * k2)
-        k4 = interpolator.interpolate(particles.positions + h * k3)
+        # Compute the four slopes (k1, k2, k3, k4). The simplex hint is shared by
+        # all stages, since the stage points are close to each other
+        x, hint = particles.positions, particles.simplex_hint
+        k1 = evaluate_velocity(interpolator, t, x, hint)
+        k2 = evaluate_velocity(interpolator, t + 0.5 * h, x + 0.5 * h * k1, hint)
+        k3 = evaluate_velocity(interpolator, t + 0.5 * h, x + 0.5 * h * k2, hint)
+        k4 = evaluate_velocity(interpolator, t + h, x + h * k3, hint)
 
         # Update the solution in-place using the weighted average of the slopes
         particles.positions += (h / 6) * (k1 + 2 * k2 + 2 * k3 + k4)
@@ -1,13 +1,11 @@
 # ruff: noqa: N806
-from typing import Protocol
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Protocol, runtime_checkable
 
 import numpy as np
-from scipy.interpolate import (
-    CloughTocher2DInterpolator,
-    LinearNDInterpolator,
-    NearestNDInterpolator,
-    RegularGridInterpolator,
-)
+from scipy.spatial import Delaunay, cKDTree
 
 from src.caching import cache_last_n_files
 from src.file_readers import CoordinateDataReader, VelocityDataReader
@@ -15,18 +13,291 @@ from src.my_types import (
     ArrayFloat32MxN,
     ArrayFloat32N,
     ArrayFloat32Nx2,
+    ArrayIntN,
 )
+from src.telemetry import telemetry
 
 
 class InterpolationStrategy(Protocol):
     def interpolate(
         self,
         new_points: ArrayFloat32Nx2,
+        simplex_hint: ArrayIntN | None = None,
     ) -> ArrayFloat32Nx2:
-        """Implements the interpolation strategy."""
+        """
+        Implements the interpolation strategy.
+
+        Args:
+            new_points (ArrayFloat32Nx2): Points where the velocity is evaluated.
+            simplex_hint (ArrayIntN, optional): Last known simplex of each point
+                (-1 if unknown), used by triangulation-based strategies to
+                warm-start the point location (or last known cell, for curvilinear
+                grids). It is updated in place with the simplices (cells)
+                containing `new_points`. Other strategies ignore it.
+        """
         ...
 
 
+@runtime_checkable
+class TimeDependentInterpolationStrategy(Protocol):
+    def interpolate_at(
+        self,
+        t: float,
+        new_points: ArrayFloat32Nx2,
+        simplex_hint: ArrayIntN | None = None,
+    ) -> ArrayFloat32Nx2:
+        """
+        Implements the interpolation strategy of a time-dependent velocity field,
+        evaluated at time `t` (see `InterpolationStrategy.interpolate`).
+        """
+        ...
+
+
+# Geometry (triangulation or grid) on which each hint array was last updated, by
+# id of the array, so that the hints of another geometry are not followed
+_hint_geometries: dict[int, tuple[weakref.ref, weakref.ref]] = {}
+
+
+def _drop_stale_hints(hint: ArrayIntN, geometry: object, num_cells: int) -> ArrayIntN:
+    """
+    Returns a copy of the hint where the hints that do not belong to the geometry
+    are unknown (-1): all of them if the array was last updated on another geometry
+    (e.g. the grid of another snapshot), and those beyond its number of cells
+    (e.g. of an array of unknown origin).
+    """
+    cells = hint.copy()
+    entry = _hint_geometries.get(id(hint))
+    if entry is None or entry[0]() is not hint:
+        weakref.finalize(hint, _hint_geometries.pop, id(hint), None)
+        _hint_geometries[id(hint)] = (weakref.ref(hint), weakref.ref(geometry))
+    elif entry[1]() is not geometry:
+        cells[:] = -1
+        _hint_geometries[id(hint)] = (entry[0], weakref.ref(geometry))
+    cells[cells >= num_cells] = -1
+    return cells
+
+
+def locate_simplices(
+    triangulation: Delaunay,
+    points: ArrayFloat32Nx2,
+    simplex_hint: ArrayIntN,
+    max_walk_steps: int = 16,
+) -> ArrayIntN:
+    """
+    Finds the simplices containing the points, starting the search from the last
+    known simplex of each point.
+
+    Since particles move less than one cell per step, a short (vectorized)
+    visibility walk from the previous simplex usually finds the new one in a few
+    steps: at each step, points move to the neighbor opposite to their most negative
+    barycentric coordinate. Points without a hint, points whose walk leaves the
+    triangulation and points not found within `max_walk_steps` fall back to the
+    global search of `Delaunay.find_simplex`. Hints of another triangulation (if
+    the array was last updated on it) are not followed.
+
+    Args:
+        triangulation (Delaunay): Triangulation of the grid.
+        points (ArrayFloat32Nx2): Points to be located.
+        simplex_hint (ArrayIntN): Last known simplex of each point (-1 if unknown).
+            It is updated in place with the simplices found.
+        max_walk_steps (int): Maximum number of steps of the local walk.
+
+    Returns:
+        ArrayIntN: Index of the simplex containing each point (-1 if outside).
+    """
+    eps = 100 * np.finfo(np.float64).eps
+    simplices = _drop_stale_hints(simplex_hint, triangulation, triangulation.nsimplex)
+
+    walking = np.flatnonzero(simplices >= 0)
+    for _ in range(max_walk_steps):
+        if walking.size == 0:
+            break
+        current = simplices[walking]
+        barycentric = barycentric_coordinates(triangulation, current, points[walking])
+        most_negative = np.argmin(barycentric, axis=1)
+        inside = barycentric[np.arange(walking.size), most_negative] >= -eps
+
+        outside = walking[~inside]
+        simplices[outside] = triangulation.neighbors[
+            current[~inside], most_negative[~inside]
+        ]
+        walking = outside[simplices[outside] >= 0]
+
+    unresolved = simplices < 0
+    unresolved[walking] = True  # Walk did not converge within max_walk_steps
+    if np.any(unresolved):
+        simplices[unresolved] = triangulation.find_simplex(points[unresolved])
+
+    simplex_hint[:] = simplices
+    return simplices
+
+
+def barycentric_coordinates(
+    triangulation: Delaunay, simplices: ArrayIntN, points: ArrayFloat32Nx2
+) -> np.ndarray:
+    """Returns the [n_points, 3] barycentric coordinates of points in simplices."""
+    transform = triangulation.transform[simplices]
+    b = np.einsum("nij,nj->ni", transform[:, :2], points - transform[:, 2])
+    return np.column_stack((b, 1 - b.sum(axis=1)))
+
+
+_edge_weights_cache = weakref.WeakKeyDictionary()
+
+
+def _clough_tocher_edge_weights(triangulation: Delaunay) -> np.ndarray:
+    """
+    Returns the [n_simplices, 3] affine-invariant weights `g` that define the
+    cross-boundary derivative directions of the Clough-Tocher interpolant (see
+    `scipy.interpolate.CloughTocher2DInterpolator`). They only depend on the
+    geometry, so they are computed once per triangulation.
+    """
+    if triangulation in _edge_weights_cache:
+        return _edge_weights_cache[triangulation]
+
+    n_simplices = triangulation.simplices.shape[0]
+    centroids = triangulation.points[triangulation.simplices].mean(axis=1)
+    weights = np.full((n_simplices, 3), -0.5)
+
+    own = np.arange(n_simplices)
+    for k in range(3):
+        neighbor = triangulation.neighbors[:, k]
+        has_neighbor = neighbor >= 0
+        c = barycentric_coordinates(
+            triangulation, own[has_neighbor], centroids[neighbor[has_neighbor]]
+        )
+        i, j = (k + 2) % 3, (k + 1) % 3
+        weights[has_neighbor, k] = (2 * c[:, i] + c[:, j] - 1) / (
+            2 - 3 * c[:, i] - 3 * c[:, j]
+        )
+
+    _edge_weights_cache[triangulation] = weights
+    return weights
+
+
+def _as_complex(values: np.ndarray) -> np.ndarray:
+    """
+    Zero-copy view of [n, 2] (u, v) values as n complex numbers u + iv, so that
+    both velocity components are handled by a single array operation.
+    """
+    return values.view(np.complex128)[:, 0]
+
+
+def _as_real(values: np.ndarray) -> ArrayFloat32Nx2:
+    """Zero-copy view of n complex numbers u + iv as [n, 2] (u, v) values."""
+    return values.view(np.float64).reshape(-1, 2)
+
+
+def _evaluate_linear(interpolator, simplices, points):
+    """Evaluates a LinearNDInterpolator at points of known simplices."""
+    triangulation = interpolator.tri
+    inside = simplices >= 0
+    result = np.full(points.shape[0], complex(np.nan, np.nan))
+
+    barycentric = barycentric_coordinates(
+        triangulation, simplices[inside], points[inside]
+    )
+    vertices = triangulation.simplices[simplices[inside]]
+    values = _as_complex(interpolator.values)
+    result[inside] = np.sum(barycentric * values[vertices], axis=1)
+    return _as_real(result)
+
+
+def _evaluate_clough_tocher(interpolator, complex_grad, simplices, points):
+    """
+    Evaluates a CloughTocher2DInterpolator at points of known simplices. This is a
+    vectorized version of the evaluation of scipy, which always performs its own
+    point location. The (u, v) values and their gradients are handled as complex
+    numbers (see `_as_complex`), with `complex_grad` of shape [n_points, 2].
+    """
+    triangulation = interpolator.tri
+    inside = simplices >= 0
+    result = np.full(points.shape[0], complex(np.nan, np.nan))
+
+    isimplex = simplices[inside]
+    b = barycentric_coordinates(triangulation, isimplex, points[inside])
+    g = _clough_tocher_edge_weights(triangulation)[isimplex]
+    vertices = triangulation.simplices[isimplex]
+
+    p = triangulation.points[vertices]
+    f = _as_complex(interpolator.values)[vertices]
+    df = complex_grad[vertices]
+
+    e12 = p[:, 1] - p[:, 0]
+    e23 = p[:, 2] - p[:, 1]
+    e31 = p[:, 0] - p[:, 2]
+
+    f1, f2, f3 = f[:, 0], f[:, 1], f[:, 2]
+    df12 = +np.sum(df[:, 0] * e12, axis=1)
+    df21 = -np.sum(df[:, 1] * e12, axis=1)
+    df23 = +np.sum(df[:, 1] * e23, axis=1)
+    df32 = -np.sum(df[:, 2] * e23, axis=1)
+    df31 = +np.sum(df[:, 2] * e31, axis=1)
+    df13 = -np.sum(df[:, 0] * e31, axis=1)
+
+    c3000 = f1
+    c2100 = (df12 + 3 * c3000) / 3
+    c2010 = (df13 + 3 * c3000) / 3
+    c0300 = f2
+    c1200 = (df21 + 3 * c0300) / 3
+    c0210 = (df23 + 3 * c0300) / 3
+    c0030 = f3
+    c1020 = (df31 + 3 * c0030) / 3
+    c0120 = (df32 + 3 * c0030) / 3
+
+    c2001 = (c2100 + c2010 + c3000) / 3
+    c0201 = (c1200 + c0300 + c0210) / 3
+    c0021 = (c1020 + c0120 + c0030) / 3
+
+    c0111 = (
+        g[:, 0] * (-c0300 + 3 * c0210 - 3 * c0120 + c0030)
+        + (-c0300 + 2 * c0210 - c0120 + c0021 + c0201)
+    ) / 2
+    c1011 = (
+        g[:, 1] * (-c0030 + 3 * c1020 - 3 * c2010 + c3000)
+        + (-c0030 + 2 * c1020 - c2010 + c2001 + c0021)
+    ) / 2
+    c1101 = (
+        g[:, 2] * (-c3000 + 3 * c2100 - 3 * c1200 + c0300)
+        + (-c3000 + 2 * c2100 - c1200 + c2001 + c0201)
+    ) / 2
+
+    c1002 = (c1101 + c1011 + c2001) / 3
+    c0102 = (c1101 + c0111 + c0201) / 3
+    c0012 = (c1011 + c0111 + c0021) / 3
+
+    c0003 = (c1002 + c0102 + c0012) / 3
+
+    # Extended barycentric coordinates (one of the 4 coordinates is zero)
+    minval = b.min(axis=1)
+    b1 = b[:, 0] - minval
+    b2 = b[:, 1] - minval
+    b3 = b[:, 2] - minval
+    b4 = 3 * minval
+
+    result[inside] = (
+        b1**3 * c3000
+        + 3 * b1**2 * b2 * c2100
+        + 3 * b1**2 * b3 * c2010
+        + 3 * b1**2 * b4 * c2001
+        + 3 * b1 * b2**2 * c1200
+        + 6 * b1 * b2 * b4 * c1101
+        + 3 * b1 * b3**2 * c1020
+        + 6 * b1 * b3 * b4 * c1011
+        + 3 * b1 * b4**2 * c1002
+        + b2**3 * c0300
+        + 3 * b2**2 * b3 * c0210
+        + 3 * b2**2 * b4 * c0201
+        + 3 * b2 * b3**2 * c0120
+        + 6 * b2 * b3 * b4 * c0111
+        + 3 * b2 * b4**2 * c0102
+        + b3**3 * c0030
+        + 3 * b3**2 * b4 * c0021
+        + 3 * b3 * b4**2 * c0012
+        + b4**3 * c0003
+    )
+    return _as_real(result)
+
+
 class CubicInterpolatorStrategy:
     """Piecewise cubic, C1 smooth, curvature-minimizing interpolator in 2D
     for the velocity field using Clough-Tocher interpolation.
@@ -39,10 +310,14 @@ class CubicInterpolatorStrategy:
     - Computationally expensive due to Delaunay triangulation.
     - Slower than simpler interpolation methods.
 
+    When a `simplex_hint` is given, point location is warm-started from it and the
+    interpolant is evaluated directly on the simplices found.
+
     Parameters
     ----------
-    points : NDArray
-        Array of shape `(n_points, 2)` representing the coordinates.
+    points : NDArray | Delaunay
+        Array of shape `(n_points, 2)` representing the coordinates, or their
+        (reusable) Delaunay triangulation.
     velocities_u : NDArray
         Array of shape `(n_points,)` representing the u-velocity values.
     velocities_v : NDArray
@@ -51,16 +326,31 @@ class CubicInterpolatorStrategy:
 
     def __init__(
         self,
-        points: ArrayFloat32Nx2,
+        points: ArrayFloat32Nx2 | Delaunay,
         velocities_u: ArrayFloat32N,
         velocities_v: ArrayFloat32N,
     ):
-        velocities = velocities_u + 1j * velocities_v
+        # Imported on first use, since scipy.interpolate is slow to import
+        from scipy.interpolate import CloughTocher2DInterpolator
+
+        velocities = np.stack((velocities_u, velocities_v), axis=-1, dtype=np.float64)
         self.interpolator = CloughTocher2DInterpolator(points, velocities)
+        self.complex_grad = None  # Packed on first warm-started evaluation
 
-    def interpolate(self, new_points: ArrayFloat32Nx2) -> ArrayFloat32Nx2:
-        interp_velocities = self.interpolator(new_points)
-        return np.column_stack((interp_velocities.real, interp_velocities.imag))
+    def interpolate(
+        self, new_points: ArrayFloat32Nx2, simplex_hint: ArrayIntN | None = None
+    ) -> ArrayFloat32Nx2:
+        if simplex_hint is None:
+            return self.interpolator(new_points)
+
+        if self.complex_grad is None:
+            grad = self.interpolator.grad  # [n_points, (u, v), (x, y)]
+            self.complex_grad = grad[:, 0] + 1j * grad[:, 1]
+
+        simplices = locate_simplices(self.interpolator.tri, new_points, simplex_hint)
+        return _evaluate_clough_tocher(
+            self.interpolator, self.complex_grad, simplices, new_points
+        )
 
 
 class LinearInterpolatorStrategy:
@@ -73,20 +363,30 @@ class LinearInterpolatorStrategy:
     Cons:
     - Not as smooth as cubic interpolation.
     - May introduce discontinuities in derivatives.
+
+    The `points` may also be given as a (reusable) Delaunay triangulation. When a
+    `simplex_hint` is given, point location is warm-started from it.
     """
 
     def __init__(
         self,
-        points: ArrayFloat32Nx2,
+        points: ArrayFloat32Nx2 | Delaunay,
         velocities_u: ArrayFloat32N,
         velocities_v: ArrayFloat32N,
     ):
-        velocities = velocities_u + 1j * velocities_v
+        from scipy.interpolate import LinearNDInterpolator  # Slow to import
+
+        velocities = np.stack((velocities_u, velocities_v), axis=-1, dtype=np.float64)
         self.interpolator = LinearNDInterpolator(points, velocities)
 
-    def interpolate(self, new_points: ArrayFloat32Nx2) -> ArrayFloat32Nx2:
-        interp_velocities = self.interpolator(new_points)
-        return np.column_stack((interp_velocities.real, interp_velocities.imag))
+    def interpolate(
+        self, new_points: ArrayFloat32Nx2, simplex_hint: ArrayIntN | None = None
+    ) -> ArrayFloat32Nx2:
+        if simplex_hint is None:
+            return self.interpolator(new_points)
+
+        simplices = locate_simplices(self.interpolator.tri, new_points, simplex_hint)
+        return _evaluate_linear(self.interpolator, simplices, new_points)
 
 
 class NearestNeighborInterpolatorStrategy:
@@ -99,61 +399,634 @@ class NearestNeighborInterpolatorStrategy:
     Cons:
     - Produces a blocky, discontinuous field.
     - Not suitable for smoothly varying velocity fields.
+
+    The `points` may also be given as a (reusable) KD-tree.
     """
 
     def __init__(
         self,
-        points: ArrayFloat32Nx2,
+        points: ArrayFloat32Nx2 | cKDTree,
         velocities_u: ArrayFloat32N,
         velocities_v: ArrayFloat32N,
     ):
-        velocities = velocities_u + 1j * velocities_v
-        self.interpolator = NearestNDInterpolator(points, velocities)
+        self.tree = points if isinstance(points, cKDTree) else cKDTree(points)
+        self.velocities = np.stack((velocities_u, velocities_v), axis=-1)
+
+    def interpolate(
+        self,
+        new_points: ArrayFloat32Nx2,
+        simplex_hint: ArrayIntN | None = None,  # noqa: ARG002
+    ) -> ArrayFloat32Nx2:
+        _, nearest_indices = self.tree.query(new_points)
+        return self.velocities.take(nearest_indices, axis=0)
+
+
+@dataclass(frozen=True)
+class UniformGrid:
+    """
+    Geometry of a uniform Cartesian grid, which allows locating the cell of any
+    point with O(1) arithmetic instead of a search.
+
+    Parameters
+    ----------
+    origin : tuple[float, float]
+        Coordinates of the first node.
+    spacing : tuple[float, float]
+        Distance between consecutive nodes along x and y (negative for descending
+        axes).
+    shape : tuple[int, int]
+        Number of nodes along x and y.
+    transposed : bool
+        Whether x varies along the columns of the grid files (MATLAB `meshgrid`
+        layout), rather than along the rows.
+    """
+
+    origin: tuple[float, float]
+    spacing: tuple[float, float]
+    shape: tuple[int, int]
+    transposed: bool = False
+
+    @classmethod
+    def from_coordinates(
+        cls, x: ArrayFloat32MxN, y: ArrayFloat32MxN, rtol: float = 1e-3
+    ) -> "UniformGrid":
+        """
+        Builds the geometry from the [M, N] coordinate grids, checking that the
+        nodes are evenly spaced (within `rtol` of the spacing).
+        """
+        transposed = x.shape[1] > 1 and x[0, 1] != x[0, 0]
+        if transposed:
+            x, y = x.T, y.T
 
-    def interpolate(self, new_points: ArrayFloat32Nx2) -> ArrayFloat32Nx2:
-        interp_velocities = self.interpolator(new_points)
-        return np.column_stack((interp_velocities.real, interp_velocities.imag))
+        axis_x, axis_y = x[:, 0], y[0, :]
+        if min(x.shape) < 2:
+            raise ValueError("A uniform grid requires at least 2 nodes per axis.")
+
+        spacing = (
+            (axis_x[-1] - axis_x[0]) / (axis_x.size - 1),
+            (axis_y[-1] - axis_y[0]) / (axis_y.size - 1),
+        )
+        is_uniform = (
+            np.allclose(x, axis_x[:, None], rtol=0, atol=rtol * abs(spacing[0]))
+            and np.allclose(y, axis_y[None, :], rtol=0, atol=rtol * abs(spacing[1]))
+            and np.allclose(np.diff(axis_x), spacing[0], rtol=rtol, atol=0)
+            and np.allclose(np.diff(axis_y), spacing[1], rtol=rtol, atol=0)
+        )
+        if not is_uniform:
+            raise ValueError("The coordinates do not form a uniform Cartesian grid.")
+
+        return cls(
+            origin=(float(axis_x[0]), float(axis_y[0])),
+            spacing=(float(spacing[0]), float(spacing[1])),
+            shape=x.shape,
+            transposed=bool(transposed),
+        )
+
+    @property
+    def nodes(self) -> ArrayFloat32Nx2:
+        """Nodes of the grid, of shape [M * N, 2], in the layout of the files."""
+        axis_x = self.origin[0] + self.spacing[0] * np.arange(self.shape[0])
+        axis_y = self.origin[1] + self.spacing[1] * np.arange(self.shape[1])
+        x, y = np.meshgrid(axis_x, axis_y, indexing="xy" if self.transposed else "ij")
+        return np.column_stack((x.ravel(), y.ravel()))
+
+    def stack(self, velocity_u: ArrayFloat32MxN, velocity_v: ArrayFloat32MxN):
+        """
+        Stacks both velocity components into a single C-contiguous array of shape
+        [nx * ny, 2], so that each node is fetched once for both components.
+        """
+        if self.transposed:
+            velocity_u, velocity_v = velocity_u.T, velocity_v.T
+        dtype = np.result_type(velocity_u, velocity_v, np.float32)
+        return np.stack((velocity_u, velocity_v), axis=-1, dtype=dtype).reshape(-1, 2)
+
+    def locate(
+        self,
+        points: ArrayFloat32Nx2,
+        cell_hint: ArrayIntN | None = None,  # noqa: ARG002
+    ):
+        """
+        Returns the (i, j) indices of the cell containing each point and the local
+        coordinates of the point within it. Points outside the grid are assigned
+        to the nearest boundary cell, with local coordinates outside [0, 1].
+        """
+        local = (points - np.asarray(self.origin)) / np.asarray(self.spacing)
+        i = np.clip(np.floor(local[:, 0]), 0, self.shape[0] - 2).astype(np.intp)
+        j = np.clip(np.floor(local[:, 1]), 0, self.shape[1] - 2).astype(np.intp)
+        return i, j, local[:, 0] - i, local[:, 1] - j
+
+
+class CurvilinearGrid:
+    """
+    Geometry of a logically structured grid with arbitrary node coordinates (e.g.
+    stretched or body-fitted CFD meshes).
+
+    Points are located in index space: starting from the last known cell of each
+    point (or from the cell with the nearest center), the bilinear map of the cell
+    is inverted by Newton iterations, and points whose local coordinates fall
+    outside [0, 1] walk to the cell they point at. No triangulation is needed, and
+    particles that move less than one cell per step are found in a single walk
+    step.
+
+    Parameters
+    ----------
+    x, y : ArrayFloat32MxN
+        Coordinates of the grid nodes, where the neighbors of node (i, j) are
+        (i +- 1, j) and (i, j +- 1).
+    max_walk_steps : int
+        Maximum number of cells visited by the walk of each point.
+    """
+
+    transposed = False
+
+    def __init__(
+        self, x: ArrayFloat32MxN, y: ArrayFloat32MxN, max_walk_steps: int = 16
+    ):
+        if min(x.shape) < 2:
+            raise ValueError("A structured grid requires at least 2 nodes per axis.")
+
+        self.shape = x.shape
+        self.max_walk_steps = max_walk_steps
+        self.node_coordinates = np.stack((x, y), axis=-1).astype(np.float64)
+
+        corners = self.node_coordinates
+        centers = 0.25 * (
+            corners[:-1, :-1] + corners[1:, :-1] + corners[:-1, 1:] + corners[1:, 1:]
+        )
+        self.tree = cKDTree(centers.reshape(-1, 2))
+        self.padded_nodes = None  # Built on first use by the bicubic method
+
+    @property
+    def nodes(self) -> ArrayFloat32Nx2:
+        """Nodes of the grid, of shape [M * N, 2], in the layout of the files."""
+        return self.node_coordinates.reshape(-1, 2)
+
+    def stack(self, velocity_u: ArrayFloat32MxN, velocity_v: ArrayFloat32MxN):
+        """
+        Stacks both velocity components into a single C-contiguous array of shape
+        [nx * ny, 2], so that each node is fetched once for both components.
+        """
+        dtype = np.result_type(velocity_u, velocity_v, np.float32)
+        return np.stack((velocity_u, velocity_v), axis=-1, dtype=dtype).reshape(-1, 2)
+
+    def locate(self, points: ArrayFloat32Nx2, cell_hint: ArrayIntN | None = None):
+        """
+        Returns the (i, j) indices of the cell containing each point and the local
+        coordinates of the point within it. Points outside the grid are assigned
+        to the boundary cell where their walk stops, with local coordinates outside
+        [0, 1].
+
+        Args:
+            points (ArrayFloat32Nx2): Points to be located.
+            cell_hint (ArrayIntN, optional): Last known (flat) cell of each point
+                (-1 if unknown). It is updated in place with the cells found. Hints
+                of another grid (if the array was last updated on it) are not
+                followed.
+        """
+        num_cells_y = self.shape[1] - 1
+        if cell_hint is None:
+            cells = self.tree.query(points)[1]
+        else:
+            cells = _drop_stale_hints(cell_hint, self, self.tree.n)
+            cold = cells < 0
+            if np.any(cold):
+                cells[cold] = self.tree.query(points[cold])[1]
+
+        i, j, s, t = self._walk(points, *np.divmod(cells, num_cells_y))
+
+        # A point outside the cell where its walk stopped lies outside the grid, or
+        # beyond a boundary that the walk cannot cross (e.g. the cut of an O-grid),
+        # in which case the walk from the nearest cell center finds it
+        outside = np.flatnonzero(_is_outside_cell(s, t))
+        if outside.size:
+            nearest = self.tree.query(points[outside])[1]
+            retry = nearest != i[outside] * num_cells_y + j[outside]
+            outside, nearest = outside[retry], nearest[retry]
+            i[outside], j[outside], s[outside], t[outside] = self._walk(
+                points[outside], *np.divmod(nearest, num_cells_y)
+            )
+
+        if cell_hint is not None:
+            cell_hint[:] = i * num_cells_y + j
+        return i, j, s, t
+
+    def isoparametric_coordinates(
+        self,
+        points: ArrayFloat32Nx2,
+        i: ArrayIntN,
+        j: ArrayIntN,
+        s: ArrayFloat32N,
+        t: ArrayFloat32N,
+        num_iterations: int = 2,
+    ):
+        """
+        Refines the local coordinates (s, t) of points in cells (i, j) so that the
+        bicubic interpolation of the node coordinates (rather than the bilinear map
+        of the cell) recovers the points. Bicubic interpolation in these
+        coordinates is isoparametric, and thus reproduces linear fields exactly.
+        """
+        if self.padded_nodes is None:
+            packed_nodes = self.node_coordinates.view(np.complex128)[..., 0]
+            self.padded_nodes = _pad_with_ghost_nodes(packed_nodes).ravel()
+        padded_ny = self.shape[1] + 2
+        target = points[:, 0] + 1j * points[:, 1]
+
+        for _ in range(num_iterations):
+            weights_s = _cubic_convolution_weights(s)
+            weights_t = _cubic_convolution_weights(t)
+            dweights_s = _cubic_convolution_weights(s, derivative=True)
+            dweights_t = _cubic_convolution_weights(t, derivative=True)
+
+            position = np.zeros(s.size, dtype=np.complex128)
+            dposition_ds = np.zeros_like(position)
+            dposition_dt = np.zeros_like(position)
+            for a, stencil_row in _stencil_rows(self.padded_nodes, padded_ny, i, j):
+                row_sum = np.einsum("nb,nb->n", weights_t, stencil_row)
+                position += weights_s[:, a] * row_sum
+                dposition_ds += dweights_s[:, a] * row_sum
+                dposition_dt += weights_s[:, a] * np.einsum(
+                    "nb,nb->n", dweights_t, stencil_row
+                )
+
+            r = position - target
+            det = (dposition_ds.conj() * dposition_dt).imag
+            with np.errstate(divide="ignore", invalid="ignore"):  # Degenerate cells
+                s = s - (r.conj() * dposition_dt).imag / det
+                t = t - (dposition_ds.conj() * r).imag / det
+
+        return s, t
+
+    def _walk(self, points: ArrayFloat32Nx2, i: ArrayIntN, j: ArrayIntN):
+        """Walks each point from cell (i, j) towards the cell that contains it."""
+        s, t = np.empty(points.shape[0]), np.empty(points.shape[0])
+
+        walking = np.arange(points.shape[0])
+        for _ in range(self.max_walk_steps):
+            s[walking], t[walking] = self._local_coordinates(
+                points[walking], i[walking], j[walking]
+            )
+            new_i = np.clip(i[walking] + _cell_offset(s[walking]), 0, self.shape[0] - 2)
+            new_j = np.clip(j[walking] + _cell_offset(t[walking]), 0, self.shape[1] - 2)
+            moved = (new_i != i[walking]) | (new_j != j[walking])
+            i[walking], j[walking] = new_i, new_j
+
+            walking = walking[moved]
+            if walking.size == 0:
+                break
+        else:
+            # Walk did not converge: local coordinates of the last cell visited
+            s[walking], t[walking] = self._local_coordinates(
+                points[walking], i[walking], j[walking]
+            )
+
+        return i, j, s, t
+
+    def _local_coordinates(
+        self,
+        points: ArrayFloat32Nx2,
+        i: ArrayIntN,
+        j: ArrayIntN,
+        num_iterations: int = 5,
+    ):
+        """
+        Inverts the bilinear map of cells (i, j) by Newton iterations, returning
+        the local coordinates (s, t) of the points (exact after one iteration for
+        parallelogram cells).
+        """
+        nodes = self.nodes
+        index = i * self.shape[1] + j
+        p00 = nodes.take(index, axis=0)
+        p01 = nodes.take(index + 1, axis=0)
+        p10 = nodes.take(index + self.shape[1], axis=0)
+        p11 = nodes.take(index + self.shape[1] + 1, axis=0)
+
+        a, b, c, d = p10 - p00, p01 - p00, p11 - p10 - p01 + p00, points - p00
+        s, t = np.full(points.shape[0], 0.5), np.full(points.shape[0], 0.5)
+
+        with np.errstate(divide="ignore", invalid="ignore"):  # Degenerate cells
+            for _ in range(num_iterations):
+                jac_s = a + t[:, None] * c
+                jac_t = b + s[:, None] * c
+                r = s[:, None] * a + t[:, None] * b + (s * t)[:, None] * c - d
+                det = jac_s[:, 0] * jac_t[:, 1] - jac_s[:, 1] * jac_t[:, 0]
+                s = s - (r[:, 0] * jac_t[:, 1] - r[:, 1] * jac_t[:, 0]) / det
+                t = t - (jac_s[:, 0] * r[:, 1] - jac_s[:, 1] * r[:, 0]) / det
+
+        return s, t
+
+
+def _cell_offset(local: ArrayFloat32N, eps: float = 1e-10) -> ArrayIntN:
+    """Number of cells to move along an axis to reach the given local coordinate."""
+    outside = (local < -eps) | (local > 1 + eps)
+    return np.where(outside, np.floor(local), 0).astype(np.intp)
+
+
+def _is_outside_cell(s: ArrayFloat32N, t: ArrayFloat32N) -> np.ndarray:
+    return (_cell_offset(s) != 0) | (_cell_offset(t) != 0)
+
+
+def build_structured_grid(
+    x: ArrayFloat32MxN, y: ArrayFloat32MxN
+) -> UniformGrid | CurvilinearGrid:
+    """
+    Returns the geometry of a structured grid: a `UniformGrid` when the nodes are
+    evenly spaced along the axes, otherwise a `CurvilinearGrid`.
+    """
+    try:
+        return UniformGrid.from_coordinates(x, y)
+    except ValueError:
+        return CurvilinearGrid(x, y)
+
+
+def _cubic_convolution_weights(
+    t: ArrayFloat32N, derivative: bool = False
+) -> np.ndarray:
+    """
+    Weights of the four nodes (-1, 0, 1, 2) around a cell for the Keys cubic
+    convolution kernel (a = -1/2), which reproduces quadratics and is C1, or their
+    derivatives with respect to the local coordinate `t`.
+    """
+    t2 = t * t
+    if derivative:
+        weights = (
+            -1.5 * t2 + 2.0 * t - 0.5,
+            4.5 * t2 - 5.0 * t,
+            -4.5 * t2 + 4.0 * t + 0.5,
+            1.5 * t2 - t,
+        )
+    else:
+        t3 = t2 * t
+        weights = (
+            -0.5 * t3 + t2 - 0.5 * t,
+            1.5 * t3 - 2.5 * t2 + 1.0,
+            -1.5 * t3 + 2.0 * t2 + 0.5 * t,
+            0.5 * t3 - 0.5 * t2,
+        )
+    return np.stack(weights, axis=-1)
+
+
+def _stencil_rows(padded_values: np.ndarray, padded_ny: int, i, j):
+    """
+    Yields, for each of the 4 rows of the 4 x 4 stencil of cells (i, j), the values
+    of its nodes in a grid padded with ghost nodes (see `_pad_with_ghost_nodes`).
+    """
+    offsets = np.arange(4)
+    cols = j[:, None] + offsets
+    for a in range(4):
+        yield a, padded_values.take((i + a)[:, None] * padded_ny + cols)
+
+
+def _pad_with_ghost_nodes(values: np.ndarray) -> np.ndarray:
+    """
+    Surrounds the [nx, ny] node values by a layer of ghost nodes, extrapolated as
+    f[-1] = 3 f[0] - 3 f[1] + f[2], so that the cubic convolution stays
+    third-order accurate up to the boundary (Keys, 1981).
+    """
+    for axis in (0, 1):
+        f = np.moveaxis(values, axis, 0)
+        if f.shape[0] > 2:
+            before, after = 3 * f[0] - 3 * f[1] + f[2], 3 * f[-1] - 3 * f[-2] + f[-3]
+        else:
+            before, after = 2 * f[0] - f[1], 2 * f[-1] - f[-2]
+        padded = np.concatenate((before[None], f, after[None]))
+        values = np.moveaxis(padded, 0, axis)
+    return np.ascontiguousarray(values)
 
 
 class GridInterpolatorStrategy:
-    """Grid-based interpolation using RegularGridInterpolator.
+    """Bilinear or bicubic interpolation on a structured grid.
+
+    The cell of each point is found by arithmetic on uniform Cartesian grids (see
+    `UniformGrid`), or by a walk in index space on curvilinear grids (see
+    `CurvilinearGrid`). Both velocity components are gathered from a single
+    stacked array and interpolated in the local coordinates of the cell. Points
+    outside the grid are linearly extrapolated from the boundary cells.
 
     Pros:
-    - Extremely fast when data is structured on a regular grid.
+    - Extremely fast when data is structured on a grid.
     - Memory efficient compared to unstructured methods.
 
     Cons:
     - Only works with structured grids.
-    - Requires careful handling of grid spacing and boundaries.
+
+    Parameters
+    ----------
+    grid : UniformGrid | CurvilinearGrid | tuple[ArrayFloat32MxN, ArrayFloat32MxN]
+        Geometry of the grid (see `InterpolatorFactory.get_geometry`), or the
+        [M, N] coordinate grids (coordinate_x, coordinate_y).
+    velocity_u, velocity_v : ArrayFloat32MxN
+        Velocity components at the grid nodes.
+    method : str
+        "linear" (bilinear) or "cubic" (bicubic convolution).
     """
 
     def __init__(
         self,
-        x: ArrayFloat32MxN,
-        y: ArrayFloat32MxN,
+        grid: UniformGrid | CurvilinearGrid | tuple[ArrayFloat32MxN, ArrayFloat32MxN],
         velocity_u: ArrayFloat32MxN,
         velocity_v: ArrayFloat32MxN,
+        method: str = "linear",
     ):
-        grid_shape = x.shape
-        grid_x = np.linspace(np.min(x), np.max(x), grid_shape[0])
-        grid_y = np.linspace(np.min(y), np.max(y), grid_shape[1])
+        if method not in ("linear", "cubic"):
+            raise ValueError(f"Unknown grid interpolation method: {method}")
+
+        if isinstance(grid, tuple):
+            grid = build_structured_grid(*grid)
+
+        self.grid = grid
+        self.values = self.grid.stack(velocity_u, velocity_v)
+        self.method = method
+
+        # Zero-copy view of each (u, v) pair as one complex number, so that every
+        # gather and weighted sum handles both components in a single operation
+        complex_dtype = np.result_type(self.values.dtype, np.complex64)
+        self.packed_values = self.values.view(complex_dtype)[:, 0]
+
+        if method == "cubic":
+            self.padded_values = _pad_with_ghost_nodes(
+                self.packed_values.reshape(self.grid.shape)
+            ).ravel()
+
+    def interpolate(
+        self,
+        new_points: ArrayFloat32Nx2,
+        simplex_hint: ArrayIntN | None = None,
+    ) -> ArrayFloat32Nx2:
+        """Interpolates velocity field at given Cartesian points."""
+        i, j, tx, ty = self.grid.locate(new_points, simplex_hint)
+
+        if self.method == "linear":
+            return self._bilinear(i, j, *self._as_value_dtype(tx, ty))
+
+        inside = (tx >= 0) & (tx <= 1) & (ty >= 0) & (ty <= 1)
+        if isinstance(self.grid, CurvilinearGrid):
+            tx[inside], ty[inside] = self.grid.isoparametric_coordinates(
+                new_points[inside], i[inside], j[inside], tx[inside], ty[inside]
+            )
+        tx, ty = self._as_value_dtype(tx, ty)
+        if inside.all():
+            return self._bicubic(i, j, tx, ty)
+
+        result = self._bilinear(i, j, tx, ty)
+        result[inside] = self._bicubic(i[inside], j[inside], tx[inside], ty[inside])
+        return result
+
+    def _bilinear(self, i, j, tx, ty) -> ArrayFloat32Nx2:
+        ny = self.grid.shape[1]
+        index = i * ny + j
+
+        v00 = self.packed_values.take(index)
+        v01 = self.packed_values.take(index + 1)
+        v10 = self.packed_values.take(index + ny)
+        v11 = self.packed_values.take(index + ny + 1)
+
+        v00 += ty * (v01 - v00)
+        v10 += ty * (v11 - v10)
+        v00 += tx * (v10 - v00)
+        return self._unpack(v00)
 
-        self.interpolator_u = RegularGridInterpolator(
-            (grid_x, grid_y), velocity_u, bounds_error=False, fill_value=None
+    def _bicubic(self, i, j, tx, ty) -> ArrayFloat32Nx2:
+        weights_x = _cubic_convolution_weights(tx)
+        weights_y = _cubic_convolution_weights(ty)
+        padded_ny = self.grid.shape[1] + 2
+
+        result = np.zeros(i.size, dtype=self.packed_values.dtype)
+        for a, stencil_row in _stencil_rows(self.padded_values, padded_ny, i, j):
+            result += weights_x[:, a] * np.einsum("nb,nb->n", weights_y, stencil_row)
+        return self._unpack(result)
+
+    def _as_value_dtype(self, tx, ty):
+        """
+        Casts the local coordinates (always located in double precision) to the
+        precision of the velocity values, so that the evaluation runs in it.
+        """
+        return tx.astype(self.values.dtype, copy=False), ty.astype(
+            self.values.dtype, copy=False
         )
-        self.interpolator_v = RegularGridInterpolator(
-            (grid_x, grid_y), velocity_v, bounds_error=False, fill_value=None
+
+    def _unpack(self, packed: np.ndarray) -> ArrayFloat32Nx2:
+        return packed.view(self.values.dtype).reshape(-1, 2)
+
+
+class SpaceTimeInterpolator:
+    """Space-time interpolator over a sequence of equally spaced snapshots.
+
+    The velocity at time `t` is linearly interpolated in time between the
+    interpolators of the two snapshots that bracket `t` (and extrapolated from the
+    first/last pair outside the sequence). This decouples the integration timestep
+    from the snapshot spacing, so that integrators may take steps smaller or larger
+    than the spacing between stored snapshots (e.g. when only every n-th snapshot
+    is read).
+
+    Snapshot interpolators are built lazily, and only the pair in use is kept.
+
+    Parameters
+    ----------
+    get_snapshot_interpolator : Callable[[int], InterpolationStrategy]
+        Returns the interpolator of the k-th snapshot.
+    snapshot_timestep : float
+        Time between consecutive snapshots (negative for backward time).
+    num_snapshots : int
+        Number of snapshots in the sequence. Time `t = 0` refers to the first one.
+    """
+
+    def __init__(
+        self,
+        get_snapshot_interpolator: Callable[[int], InterpolationStrategy],
+        snapshot_timestep: float,
+        num_snapshots: int,
+    ):
+        self.get_snapshot_interpolator = get_snapshot_interpolator
+        self.snapshot_timestep = snapshot_timestep
+        self.num_snapshots = num_snapshots
+        self.snapshot_interpolators = {}
+
+    def interpolate_at(
+        self,
+        t: float,
+        new_points: ArrayFloat32Nx2,
+        simplex_hint: ArrayIntN | None = None,
+    ) -> ArrayFloat32Nx2:
+        position = t / self.snapshot_timestep  # Fractional snapshot index
+        k = int(np.clip(np.floor(position), 0, max(self.num_snapshots - 2, 0)))
+        weight = position - k
+
+        velocity = self._snapshot_interpolator(k).interpolate(new_points, simplex_hint)
+        if weight == 0.0 or self.num_snapshots == 1:
+            return velocity
+
+        next_velocity = self._snapshot_interpolator(k + 1).interpolate(
+            new_points, simplex_hint
         )
+        return (1 - weight) * velocity + weight * next_velocity
+
+    def _snapshot_interpolator(self, k: int) -> InterpolationStrategy:
+        if k not in self.snapshot_interpolators:
+            # Keep only the pair of snapshots in use (integration is sequential)
+            for cached_k in list(self.snapshot_interpolators):
+                if cached_k not in (k - 1, k + 1):
+                    del self.snapshot_interpolators[cached_k]
+            self.snapshot_interpolators[k] = self.get_snapshot_interpolator(k)
+        return self.snapshot_interpolators[k]
 
-    def interpolate(self, new_points: ArrayFloat32Nx2) -> ArrayFloat32Nx2:
-        """Interpolates velocity field at given Cartesian points."""
-        u_interp = self.interpolator_u(new_points)
-        v_interp = self.interpolator_v(new_points)
 
-        return np.column_stack((u_interp, v_interp))
+class AnalyticVelocityField:
+    """Closed-form velocity field, evaluated directly at the particle positions.
+
+    Implements both `InterpolationStrategy` (frozen at `time`) and
+    `TimeDependentInterpolationStrategy` (with `t` relative to `time`), so that
+    integrators evaluate each of their stages at its exact time. Nothing is read
+    from disk nor built, which isolates the cost of the integration from the I/O,
+    and makes the interpolation error zero (e.g. to validate the integrators).
+
+    Parameters
+    ----------
+    velocity : Callable
+        Vectorized velocity field `u, v = velocity(x, y, t)`, evaluated on arrays
+        of coordinates (e.g. `src.synthetic.double_gyre_velocity`).
+    time : float
+        Time of the snapshot, i.e. the time at which `t = 0`.
+    """
+
+    def __init__(
+        self,
+        velocity: Callable[[ArrayFloat32N, ArrayFloat32N, float], tuple],
+        time: float = 0.0,
+    ):
+        self.velocity = velocity
+        self.time = time
+
+    def interpolate(
+        self,
+        new_points: ArrayFloat32Nx2,
+        simplex_hint: ArrayIntN | None = None,
+    ) -> ArrayFloat32Nx2:
+        return self.interpolate_at(0.0, new_points, simplex_hint)
+
+    def interpolate_at(
+        self,
+        t: float,
+        new_points: ArrayFloat32Nx2,
+        simplex_hint: ArrayIntN | None = None,  # noqa: ARG002
+    ) -> ArrayFloat32Nx2:
+        u, v = self.velocity(new_points[:, 0], new_points[:, 1], self.time + t)
+        return np.column_stack((u, v)).astype(new_points.dtype, copy=False)
 
 
 class InterpolatorFactory:
+    """
+    Creates the interpolator of each snapshot.
+
+    The triangulation (or KD-tree) of the grid only depends on the coordinates, so
+    it is built once and reused by all snapshots that share the same grid, which
+    leaves only the velocity values (and, for Clough-Tocher, the gradient
+    estimates) to be updated per snapshot. The geometry cache is shared by all
+    factories of a process, so each worker triangulates a fixed grid only once.
+    """
+
+    num_cached_geometries = 2
+    geometry_cache: OrderedDict = OrderedDict()
+
     def __init__(
         self,
         coordinate_reader: CoordinateDataReader,
@@ -174,46 +1047,176 @@ class InterpolatorFactory:
         - "cubic": Clough-Tocher interpolation (default, high-quality but slow).
         - "linear": Linear interpolation (faster, but less smooth).
         - "nearest": Nearest-neighbor interpolation (fastest, but lowest quality).
-        - "grid": Grid-based interpolation (fastest for structured grids).
+        - "grid": Bilinear interpolation (fastest, for structured grids).
+        - "grid_cubic": Bicubic interpolation (for structured grids).
 
         Args:
             snapshot_file (str): Path to the velocity data file.
             grid_file (str): Path to the coordinate data file.
             strategy (str): Interpolation strategy to use ("cubic", "linear",
-            "nearest", "grid").
+            "nearest", "grid", "grid_cubic").
 
         Returns:
             (InterpolationStrategy): The selected interpolator object.
         """
-        flatten = strategy != "grid"
+        flatten = not strategy.startswith("grid")
 
         # Choose the appropriate method dynamically
         read_velocity = getattr(
             self.velocity_reader, "read_flatten" if flatten else "read_raw"
         )
-        read_coordinates = getattr(
-            self.coordinate_reader, "read_flatten" if flatten else "read_raw"
-        )
 
-        velocities = read_velocity(snapshot_file)
-        coordinates = read_coordinates(grid_file)
+        with telemetry.measure("read"):
+            velocities = read_velocity(snapshot_file)
+        with telemetry.measure("build"):
+            geometry = self.get_geometry(grid_file, strategy)
+            return build_interpolator(geometry, velocities, strategy)
 
-        match strategy:
-            case "cubic":
-                return CubicInterpolatorStrategy(
-                    coordinates, velocities[:, 0], velocities[:, 1]
-                )
-            case "linear":
-                return LinearInterpolatorStrategy(
-                    coordinates, velocities[:, 0], velocities[:, 1]
-                )
-            case "nearest":
-                return NearestNeighborInterpolatorStrategy(
-                    coordinates, velocities[:, 0], velocities[:, 1]
-                )
-            case "grid":
-                return GridInterpolatorStrategy(
-                    coordinates[0], coordinates[1], velocities[0], velocities[1]
+    def get_geometry(self, grid_file: str, strategy: str = "cubic"):
+        """
+        Returns the Delaunay triangulation ("cubic" and "linear" strategies), the
+        KD-tree ("nearest" strategy) or the structured grid ("grid" strategies, see
+        `build_structured_grid`) of the grid file, building it only if the grid
+        was not seen before. A triangulation or KD-tree stored under a different
+        file name is also reused when its coordinates are identical to a cached
+        one.
+
+        Args:
+            grid_file (str): Path to the coordinate data file.
+            strategy (str): Interpolation strategy to use ("cubic", "linear",
+            "nearest", "grid", "grid_cubic").
+
+        Returns:
+            (Delaunay | cKDTree | UniformGrid | CurvilinearGrid): Geometry of the
+            grid.
+        """
+        if strategy.startswith("grid"):
+            kind = "structured"
+        else:
+            kind = "kdtree" if strategy == "nearest" else "delaunay"
+        cache = InterpolatorFactory.geometry_cache
+
+        key = (grid_file, kind)
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+
+        if kind == "structured":
+            with telemetry.measure("read"):
+                coordinates = self.coordinate_reader.read_raw(grid_file)
+            geometry = build_geometry(coordinates, strategy)
+        else:
+            with telemetry.measure("read"):
+                coordinates = self.coordinate_reader.read_flatten(grid_file)
+            for (_, cached_kind), geometry in cache.items():
+                if cached_kind != kind:
+                    continue
+                cached_points = (
+                    geometry.data if cached_kind == "kdtree" else geometry.points
                 )
-            case _:
-                raise ValueError(f"Unknown interpolation strategy: {strategy}")
+                if np.array_equal(cached_points, coordinates):
+                    break
+            else:
+                geometry = build_geometry(coordinates, strategy)
+
+        cache[key] = geometry
+        if len(cache) > InterpolatorFactory.num_cached_geometries:
+            cache.popitem(last=False)
+
+        return geometry
+
+
+def build_geometry(coordinates, strategy: str = "cubic"):
+    """
+    Builds the geometry of a grid used by the interpolators of the given strategy,
+    so that it can be shared by all the snapshots on the same grid.
+
+    Args:
+        coordinates: Array of shape [n_points, 2], or tuple of [M, N] arrays
+            (coordinate_x, coordinate_y) for the "grid" strategies.
+        strategy (str): Interpolation strategy to use ("cubic", "linear",
+        "nearest", "grid", "grid_cubic").
+
+    Returns:
+        (Delaunay | cKDTree | UniformGrid | CurvilinearGrid): The Delaunay
+        triangulation ("cubic" and "linear" strategies), the KD-tree ("nearest"
+        strategy) or the structured grid ("grid" strategies).
+    """
+    if strategy.startswith("grid"):
+        return build_structured_grid(*coordinates)
+    return cKDTree(coordinates) if strategy == "nearest" else Delaunay(coordinates)
+
+
+def build_interpolator(coordinates, velocities, strategy: str = "cubic"):
+    """
+    Creates an interpolator of the given strategy from in-memory arrays.
+
+    Args:
+        coordinates: Array of shape [n_points, 2], or tuple of [M, N] arrays
+            (coordinate_x, coordinate_y) for the "grid" strategies, or their
+            geometry, as returned by `InterpolatorFactory.get_geometry`.
+        velocities: Array of shape [n_points, 2], or tuple of [M, N] arrays
+            (velocity_x, velocity_y) for the "grid" strategies.
+        strategy (str): Interpolation strategy to use ("cubic", "linear",
+        "nearest", "grid", "grid_cubic").
+
+    Returns:
+        (InterpolationStrategy): The selected interpolator object.
+    """
+    match strategy:
+        case "cubic":
+            return CubicInterpolatorStrategy(
+                coordinates, velocities[:, 0], velocities[:, 1]
+            )
+        case "linear":
+            return LinearInterpolatorStrategy(
+                coordinates, velocities[:, 0], velocities[:, 1]
+            )
+        case "nearest":
+            return NearestNeighborInterpolatorStrategy(
+                coordinates, velocities[:, 0], velocities[:, 1]
+            )
+        case "grid":
+            return GridInterpolatorStrategy(coordinates, velocities[0], velocities[1])
+        case "grid_cubic":
+            return GridInterpolatorStrategy(
+                coordinates, velocities[0], velocities[1], method="cubic"
+            )
+        case _:
+            raise ValueError(f"Unknown interpolation strategy: {strategy}")
+
+
+class AnalyticInterpolatorFactory:
+    """
+    Creates the velocity field of each snapshot of an analytic flow (see
+    `AnalyticVelocityField`), in place of `InterpolatorFactory`. Snapshots are
+    only labels of the times at which the field is evaluated, and there is no
+    grid nor interpolation strategy.
+
+    Parameters
+    ----------
+    velocity : Callable
+        Vectorized velocity field `u, v = velocity(x, y, t)`.
+    snapshot_times : dict[str, float]
+        Time of each snapshot label.
+    """
+
+    def __init__(
+        self,
+        velocity: Callable[[ArrayFloat32N, ArrayFloat32N, float], tuple],
+        snapshot_times: dict[str, float],
+    ):
+        self.velocity = velocity
+        self.snapshot_times = snapshot_times
+
+    def create_interpolator(
+        self,
+        snapshot_file: str,
+        grid_file: str,  # noqa: ARG002
+        strategy: str = "cubic",  # noqa: ARG002
+    ) -> AnalyticVelocityField:
+        """
+        Returns the velocity field at the time of the given snapshot label (the
+        grid file and strategy are ignored).
+        """
+        return AnalyticVelocityField(self.velocity, self.snapshot_times[snapshot_file])
@@ -1,208 +1,1135 @@
-import itertools
+import contextlib
+import cProfile
+import functools
+import json
 import multiprocessing
 import os
+import shutil
 import time
-from typing import List
+import tracemalloc
+from collections import deque
+from multiprocessing import resource_tracker
+from typing import Callable
 
-from scipy.io import savemat
-from tqdm import tqdm
-
-from src.cauchy_green import compute_flow_map_jacobian
+from src.checkpoint import (
+    JobManifest,
+    ParticleCheckpoint,
+    file_fingerprint,
+    window_digest,
+)
 from src.decorators import timeit
 from src.file_readers import (
     CoordinateDataReader,
     VelocityDataReader,
+    mat_file_cache,
     read_seed_particles_coordinates,
 )
 from src.file_utils import get_files_list
-from src.ftle import compute_ftle
-from src.hyperparameters import args
+from src.flow_map import FlowMapStore, compose_flow_maps
+from src.ftle import compute_ftle_from_particles
+from src.ftle_output import (
+    AsyncFTLEWriter,
+    FTLEWriter,
+    MatFTLEWriter,
+    StackedFTLEWriter,
+)
+from src.hyperparameters import MyProgramArgs, parse_args
 from src.integrate import get_integrator
-from src.interpolate import InterpolatorFactory
+from src.interpolate import (
+    AnalyticInterpolatorFactory,
+    InterpolationStrategy,
+    InterpolatorFactory,
+    SpaceTimeInterpolator,
+)
+from src.memmap_store import MemmapCoordinateDataReader, MemmapVelocityDataReader
+from src.memory import deep_nbytes
+from src.my_types import ArrayFloat32N
+from src.particles import NeighboringParticles
+from src.prefetch import Prefetcher
+from src.refinement import QuadtreeFTLE, refine_ftle
+from src.scheduler import WorkerContext, contiguous_blocks
+from src.shared_store import SharedSnapshotStore
+from src.sweep import SweepEngine
+from src.synthetic import get_velocity_field
+from src.telemetry import Telemetry, telemetry
+from src.watch import SnapshotWatcher
+
+# Configuration, input files and channels of the job, set in each worker by
+# `init_worker`
+worker = WorkerContext([], [], [], 0)
+
+# Short flow-map stores of the current (worker) process, by cache directory
+flow_map_stores: dict[tuple[str, int], FlowMapStore] = {}
+
+
+def init_worker(context: WorkerContext, tqdm_positions=None) -> None:
+    """
+    Initializes a pool worker (or the current process, if replaying a window) with
+    the context of the job, and assigns it a fixed position for its progress bar.
+    """
+    global worker
+    worker = context
+    worker.tqdm_position = tqdm_positions.get() if tqdm_positions is not None else 0
+    config = worker.config
+    telemetry.trace = config.trace
+    telemetry.track_memory = config.track_memory
+    if config.track_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    telemetry.name_process(f"worker {worker.tqdm_position}")
+
+
+def sample_memory(config: MyProgramArgs, **objects) -> None:
+    """
+    Records the memory usage of the worker, with the estimated bytes held by its
+    caches (interpolators, grid geometries, decoded files and seed particles) and
+    by the given objects (e.g. the particles in flight), if `track_memory` is set.
+    Each cache is measured on its own, so arrays shared by several caches (e.g. the
+    triangulations of the cached interpolators) count in each, but only once in
+    the `total`.
+    """
+    if not config.track_memory:
+        return
+
+    held = {
+        "interpolators": InterpolatorFactory.create_interpolator.cache,
+        "geometries": InterpolatorFactory.geometry_cache,
+        "mat_files": mat_file_cache.files,
+        "seed_particles": read_seed_particles_coordinates.cache,
+        **objects,
+    }
+    cached_nbytes = {name: deep_nbytes(obj) for name, obj in held.items()}
+    cached_nbytes["total"] = deep_nbytes(*held.values())
+    telemetry.sample_memory(f"worker {worker.tqdm_position}", cached_nbytes)
+
+
+def get_interpolator_factory(
+    config: MyProgramArgs,
+) -> InterpolatorFactory | AnalyticInterpolatorFactory:
+    """
+    Returns an interpolator factory reading from the memory-mapped snapshot store
+    (if given) or from the MATLAB files, through the shared store (if any), or the
+    factory of the analytic velocity field (if selected).
+    """
+    if worker.snapshot_times is not None:
+        return AnalyticInterpolatorFactory(
+            get_velocity_field(config.velocity_field, config.velocity_field_parameters),
+            dict(zip(worker.snapshot_files, worker.snapshot_times)),
+        )
+    if config.snapshot_store is not None:
+        return InterpolatorFactory(
+            MemmapCoordinateDataReader(config.snapshot_store),
+            MemmapVelocityDataReader(config.snapshot_store, config.precision),
+        )
+    return InterpolatorFactory(
+        CoordinateDataReader(store=worker.snapshot_store),
+        VelocityDataReader(config.precision, store=worker.snapshot_store),
+    )
+
+
+@contextlib.contextmanager
+def prefetched(
+    config: MyProgramArgs, build: Callable[[int], InterpolationStrategy], num_items: int
+):
+    """
+    Yields a function returning `build(k)`. If `prefetch_depth` is set, the items
+    are built ahead in a background thread (see `Prefetcher`), so that reading the
+    next snapshots overlaps with the integration of the current one.
+    """
+    if config.prefetch_depth == 0:
+        yield build
+        return
+
+    max_bytes = None
+    if config.prefetch_memory is not None:
+        max_bytes = int(config.prefetch_memory * 2**20)
+    with Prefetcher(build, num_items, config.prefetch_depth, max_bytes) as prefetcher:
+        yield prefetcher.get
+
+
+@contextlib.contextmanager
+def profiled(config: MyProgramArgs, window_indices: range):
+    """
+    Profiles the enclosed block with cProfile if it computes the `profile_window`,
+    saving the stats to `profile{profile_window:04d}.prof` in the output directory.
+    """
+    if config.profile_window not in window_indices:
+        yield
+        return
+
+    output_path = os.path.join(
+        f"outputs/{config.experiment_name}", f"profile{config.profile_window:04d}.prof"
+    )
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(output_path)
+
+
+def worker_progress_bar(total: int, desc: str):
+    """Returns a progress bar at the position of the worker, cleared when closed."""
+    from tqdm import tqdm  # Imported on first use, to keep startup fast
+
+    return tqdm(
+        total=total,
+        desc=desc,
+        position=worker.tqdm_position,
+        leave=False,
+        dynamic_ncols=True,
+        mininterval=0.5,
+    )
+
+
+def compute_and_save_ftle(
+    index: int,
+    particles: NeighboringParticles,
+    map_period: float,
+    writer: FTLEWriter,
+    refine: Callable[[ArrayFloat32N], QuadtreeFTLE] | None = None,
+) -> None:
+    """
+    Computes the FTLE field of a window and hands it over to the writer, after
+    refining it with `refine` (see `refine_ftle`), if given.
+    """
+    with telemetry.measure("ftle", len(particles)):
+        ftle_field = compute_ftle_from_particles(particles, map_period)
+    if refine is not None:
+        ftle_field = refine(ftle_field)
+    writer.write(index, ftle_field)
+
+
+def open_ftle_writer(
+    config: MyProgramArgs,
+    output_dir: str,
+    on_written: Callable[[int], None] | None = None,
+) -> AsyncFTLEWriter:
+    """
+    Returns the writer of the FTLE fields of a worker task, which saves them on a
+    dedicated thread, either to one `.mat` file per window or to the stacked store.
+    """
+    if config.output_format == "stacked":
+        writer = StackedFTLEWriter(output_dir)
+    else:
+        writer = MatFTLEWriter(output_dir, config.output_precision)
+    return AsyncFTLEWriter(writer, on_written=on_written)
+
+
+def run_window_block(window_indices: range) -> None:
+    """
+    Computes a block of consecutive windows, one after the other, handing their
+    FTLE fields over to a single writer, which reports each window once saved.
+    """
+    if worker.config.execution_mode == "composition":
+        processor_class = CompositionProcessor
+    else:
+        processor_class = SnapshotProcessor
+
+    output_dir = f"outputs/{worker.config.experiment_name}"
+    with open_ftle_writer(worker.config, output_dir, worker.notify_completed) as writer:
+        for index in window_indices:
+            processor_class(index, worker.config, writer).run()
+    worker.notify_finished(window_indices)
+
+
+def run_sweep_block(window_indices: range) -> None:
+    """Computes a block of consecutive windows in a single sweep."""
+    SweepProcessor(window_indices, worker.config).run()
+    worker.notify_finished(window_indices)
 
 
 class SnapshotProcessor:
-    """Handles the computation of FTLE for a single snapshot period."""
+    """
+    Handles the computation of FTLE for a single snapshot period, handing the field
+    over to the `writer` of the task.
+    """
 
-    def __init__(
-        self,
-        index: int,
-        snapshot_files: List[str],
-        grid_files: List[str],
-        particle_file: str,
-        tqdm_position_queue,
-        progress_dict,
-    ):
+    def __init__(self, index: int, config: MyProgramArgs, writer: FTLEWriter):
         self.index = index
-        self.snapshot_files = snapshot_files
-        self.grid_files = grid_files
-        self.particle_file = particle_file
-        self.progress_dict = progress_dict
-        self.tqdm_position_queue = tqdm_position_queue
-        self.tqdm_position = None  # Will be assigned dynamically
-        self.output_dir = f"outputs/{args.experiment_name}"
+        self.config = config
+        self.writer = writer
+        self.snapshots = worker.window_snapshots(index)  # Positions in the lists
+        files = worker.window_files(index)
+        self.snapshot_files, self.grid_files, self.particle_file = files
+        self.output_dir = f"outputs/{config.experiment_name}"
 
     def run(self):
-        """Processes a single snapshot period."""
-        self.tqdm_position = self.tqdm_position_queue.get()
-
-        # Force clean ghost tqdm_bar bars before starting a new one
-        if hasattr(self, "tqdm_bar"):
-            self.tqdm_bar.clear()
-            self.tqdm_bar.close()
-
-        tqdm_bar = tqdm(
-            total=len(self.snapshot_files),
-            desc=f"FTLE {self.index:04d}",
-            position=self.tqdm_position,
-            leave=False,
-            dynamic_ncols=True,
-            mininterval=0.5,
-        )
-
-        particles = read_seed_particles_coordinates(self.particle_file)
-        integrator = get_integrator(args.integrator)
-        velocity_reader = VelocityDataReader()
-        coordinate_reader = CoordinateDataReader()
-        interpolator_factory = InterpolatorFactory(coordinate_reader, velocity_reader)
-
-        for snapshot_file, grid_file in zip(self.snapshot_files, self.grid_files):
+        """
+        Processes a single snapshot period, tracing it and profiling it (if it is
+        the `profile_window`).
+        """
+        with (
+            telemetry.span("window", index=self.index),
+            profiled(self.config, range(self.index, self.index + 1)),
+        ):
+            self._process()
+
+    def _process(self):
+        tqdm_bar = worker_progress_bar(
+            len(self.snapshot_files), f"FTLE {self.index:04d}"
+        )
+
+        # Work on a copy, since the seed reader caches (and shares) its result
+        seed_particles = read_seed_particles_coordinates(self.particle_file)
+        particles = NeighboringParticles(
+            positions=seed_particles.positions.astype(self.config.precision)
+        )
+        integrator = get_integrator(self.config.integrator)
+        interpolator_factory = get_interpolator_factory(self.config)
+
+        # Resume from the last checkpoint of the window, if any
+        checkpoint = self._get_checkpoint()
+        first_step = checkpoint.restore(particles, integrator) if checkpoint else 0
+
+        def build_snapshot_interpolator(k):
+            return interpolator_factory.create_interpolator(
+                self.snapshot_files[k], self.grid_files[k], self.config.interpolator
+            )
+
+        self._advect(
+            particles,
+            integrator,
+            build_snapshot_interpolator,
+            tqdm_bar,
+            checkpoint,
+            first_step,
+        )
+
+        def advect_refined(new_particles):
+            tqdm_bar.reset()
+            self._advect(
+                new_particles,
+                get_integrator(self.config.integrator),
+                build_snapshot_interpolator,
+                tqdm_bar,
+            )
+
+        sample_memory(self.config, particles=particles)
+        self._compute_and_save_ftle(
+            particles, self._refinement(seed_particles, advect_refined)
+        )
+        if checkpoint:
+            checkpoint.remove()
+
+        tqdm_bar.clear()
+        tqdm_bar.close()
+
+    def _advect(
+        self,
+        particles,
+        integrator,
+        build_snapshot_interpolator,
+        tqdm_bar,
+        checkpoint=None,
+        first_step=0,
+    ):
+        """Advects the particles over the window period, from the `first_step`."""
+        if self.config.integration_timestep is not None:
+            with prefetched(
+                self.config, build_snapshot_interpolator, len(self.snapshot_files)
+            ) as get_snapshot_interpolator:
+                self._integrate_in_space_time(
+                    particles,
+                    integrator,
+                    get_snapshot_interpolator,
+                    tqdm_bar,
+                    checkpoint,
+                    first_step,
+                )
+        else:
+            tqdm_bar.update(first_step)
+            with prefetched(
+                self.config,
+                lambda offset: build_snapshot_interpolator(first_step + offset),
+                len(self.snapshot_files) - first_step,
+            ) as get_snapshot_interpolator:
+                for k in range(first_step, len(self.snapshot_files)):
+                    snapshot_file = self.snapshot_files[k]
+                    tqdm_bar.set_description(f"FTLE {self.index:04d}: {snapshot_file}")
+                    tqdm_bar.update(1)
+
+                    interpolator = get_snapshot_interpolator(k - first_step)
+                    with telemetry.measure("integrate", len(particles.positions)):
+                        integrator.integrate(
+                            self.config.snapshot_timestep, particles, interpolator
+                        )
+                    if checkpoint:
+                        checkpoint.save(k + 1, particles, integrator)
+
+    def _integrate_in_space_time(
+        self,
+        particles,
+        integrator,
+        get_snapshot_interpolator,
+        tqdm_bar,
+        checkpoint=None,
+        first_step=0,
+    ):
+        """
+        Integrates the particles over the window period with the
+        `integration_timestep`, interpolating the velocity in time between the
+        snapshots that bracket each integration stage (see `SpaceTimeInterpolator`).
+        """
+
+        def get_snapshot_interpolator_with_progress(k):
+            tqdm_bar.set_description(f"FTLE {self.index:04d}: {self.snapshot_files[k]}")
+            tqdm_bar.update(1)
+            return get_snapshot_interpolator(k)
+
+        if worker.snapshot_times is not None:
+            # Analytic fields are evaluated at the exact time of each stage
+            velocity_field = get_snapshot_interpolator(0)
+            tqdm_bar.update(len(self.snapshot_files))
+        else:
+            velocity_field = SpaceTimeInterpolator(
+                get_snapshot_interpolator_with_progress,
+                self.config.snapshot_timestep,
+                len(self.snapshot_files),
+            )
+
+        # Adjust the step so that an integer number of steps spans the period
+        window_period = (len(self.snapshot_files) - 1) * self.config.snapshot_timestep
+        num_steps = max(1, round(abs(window_period / self.config.integration_timestep)))
+        h = window_period / num_steps
+
+        for n in range(first_step, num_steps):
+            with telemetry.measure("integrate", len(particles.positions)):
+                integrator.integrate(h, particles, velocity_field, t=n * h)
+            if checkpoint:
+                checkpoint.save(n + 1, particles, integrator)
+
+    def _get_checkpoint(self) -> ParticleCheckpoint | None:
+        """Returns the checkpoint of the in-flight state of the window, if enabled."""
+        if self.config.checkpoint_interval is None:
+            return None
+        digest = window_digest(worker.input_files(self.index))
+        return ParticleCheckpoint(
+            os.path.join(self.output_dir, "checkpoints", f"window{self.index:04d}.npz"),
+            digest,
+            self.config.checkpoint_interval,
+        )
+
+    def _map_period(self) -> float:
+        """Returns the integration period of the flow map of the window."""
+        return (len(self.snapshot_files) - 1) * abs(self.config.snapshot_timestep)
+
+    def _refinement(
+        self,
+        seed_particles: NeighboringParticles,
+        advect: Callable[[NeighboringParticles], None],
+    ) -> Callable[[ArrayFloat32N], QuadtreeFTLE] | None:
+        """Returns the adaptive refinement of the FTLE field, if enabled."""
+        if self.config.refinement_levels == 0:
+            return None
+        return functools.partial(
+            refine_ftle,
+            seed_particles,
+            advect=advect,
+            map_period=self._map_period(),
+            num_levels=self.config.refinement_levels,
+            fraction=self.config.refinement_fraction,
+        )
+
+    def _compute_and_save_ftle(self, particles, refine=None):
+        """Computes FTLE (refined by `refine`, if given) and saves the results."""
+        compute_and_save_ftle(
+            self.index, particles, self._map_period(), self.writer, refine
+        )
+
+
+def get_flow_map_store(
+    config: MyProgramArgs, num_cached_maps: int, live: bool = False
+) -> FlowMapStore:
+    """
+    Returns the short flow-map store of the current (worker) process. The maps of
+    the `watch` mode (`live`) are keyed by the position of their snapshot in the
+    stream of files, rather than in the (time-ordered) input list, so they are kept
+    apart. Either way, saved maps are only reused if computed from the same
+    snapshot and grid files (see `FlowMapStore`).
+    """
+    cache_dir = os.path.join(
+        f"outputs/{config.experiment_name}",
+        "flow_maps",
+        f"{config.integrator}_{config.interpolator}_dt{config.snapshot_timestep:g}"
+        f"_{config.precision}" + ("_live" if live else ""),
+    )
+    key = (cache_dir, num_cached_maps)
+    if key not in flow_map_stores:
+        flow_map_stores[key] = FlowMapStore(
+            get_interpolator_factory(config),
+            config.integrator,
+            config.interpolator,
+            config.snapshot_timestep,
+            cache_dir=cache_dir,
+            num_cached_maps=num_cached_maps,
+            dtype=config.precision,
+        )
+    return flow_map_stores[key]
+
+
+class CompositionProcessor(SnapshotProcessor):
+    """
+    Handles the computation of FTLE for a single snapshot period by composing the
+    short flow maps between consecutive snapshots (see `FlowMapStore`), instead of
+    integrating the particles from scratch.
+
+    Short maps are computed once and shared (in memory and on disk) by all the
+    windows that overlap them.
+    """
+
+    def _process(self):
+        tqdm_bar = worker_progress_bar(
+            len(self.snapshot_files), f"FTLE {self.index:04d}"
+        )
+
+        seed_particles = read_seed_particles_coordinates(self.particle_file)
+        particles = NeighboringParticles(
+            positions=seed_particles.positions.astype(self.config.precision)
+        )
+        store = get_flow_map_store(self.config, len(self.snapshot_files))
+        self._compose(particles, store, tqdm_bar)
+
+        def compose_refined(new_particles):
+            tqdm_bar.reset()
+            self._compose(new_particles, store, tqdm_bar)
+
+        sample_memory(self.config, particles=particles, flow_maps=store.cache)
+        self._compute_and_save_ftle(
+            particles, self._refinement(seed_particles, compose_refined)
+        )
+
+        tqdm_bar.clear()
+        tqdm_bar.close()
+
+    def _compose(self, particles, store, tqdm_bar):
+        """Maps the particles over the window through the short flow maps."""
+        for k, snapshot_file, grid_file in zip(
+            self.snapshots, self.snapshot_files, self.grid_files
+        ):
             tqdm_bar.set_description(f"FTLE {self.index:04d}: {snapshot_file}")
             tqdm_bar.update(1)
 
-            interpolator = interpolator_factory.create_interpolator(
-                snapshot_file, grid_file, args.interpolator
+            flow_map = store.get(k, snapshot_file, grid_file)
+            compose_flow_maps(particles, [flow_map])
+
+
+class SweepProcessor:
+    """
+    Handles the computation of FTLE for a contiguous block of windows in a single
+    pass over their snapshots (see `SweepEngine`).
+
+    Each snapshot of the block is read and its interpolator built only once, no
+    matter how many windows overlap it.
+    """
+
+    def __init__(self, window_indices: range, config: MyProgramArgs):
+        self.window_indices = window_indices
+        self.config = config
+        self.num_snapshots_in_window = worker.num_snapshots_in_window
+        self.snapshot_files = worker.snapshot_files
+        self.grid_files = worker.grid_files
+        self.particle_files = worker.particle_files
+        self.output_dir = f"outputs/{config.experiment_name}"
+
+    def run(self):
+        """
+        Sweeps once over the snapshots spanned by the block of windows, tracing it
+        and profiling it (if it holds the `profile_window`).
+        """
+        first, last = self.window_indices[0], self.window_indices[-1]
+        with (
+            telemetry.span("sweep", first=first, last=last),
+            profiled(self.config, self.window_indices),
+        ):
+            self._process()
+
+    def _process(self):
+        config = self.config
+        # Snapshots of the block, in integration order, and the window starting at
+        # each of them
+        first_snapshots = {
+            worker.window_snapshots(i)[0]: i for i in self.window_indices
+        }
+        snapshots = range(
+            self.window_indices.start,
+            self.window_indices.stop - 1 + self.num_snapshots_in_window,
+        )
+        if worker.backward:
+            snapshots = snapshots[::-1]
+
+        tqdm_bar = worker_progress_bar(
+            len(snapshots), f"Sweep {self.window_indices.start:04d}"
+        )
+
+        engine = SweepEngine(
+            self.num_snapshots_in_window, config.integrator, config.precision
+        )
+        interpolator_factory = get_interpolator_factory(config)
+        map_period = (self.num_snapshots_in_window - 1) * abs(config.snapshot_timestep)
+
+        def build_snapshot_interpolator(offset):
+            k = snapshots[offset]
+            return interpolator_factory.create_interpolator(
+                self.snapshot_files[k],
+                self.grid_files[k % len(self.grid_files)],
+                config.interpolator,
             )
-            integrator.integrate(args.snapshot_timestep, particles, interpolator)
 
-        self._compute_and_save_ftle(particles)
+        with (
+            open_ftle_writer(
+                config, self.output_dir, worker.notify_completed
+            ) as writer,
+            prefetched(
+                config, build_snapshot_interpolator, len(snapshots)
+            ) as get_snapshot_interpolator,
+        ):
+            for offset, k in enumerate(snapshots):
+                snapshot_file = self.snapshot_files[k]
+                tqdm_bar.set_description(f"Sweep {len(engine):03d}: {snapshot_file}")
+                tqdm_bar.update(1)
+
+                if k in first_snapshots:
+                    particle_file = self.particle_files[k % len(self.particle_files)]
+                    engine.start_window(
+                        first_snapshots[k],
+                        read_seed_particles_coordinates(particle_file),
+                    )
+
+                interpolator = get_snapshot_interpolator(offset)
+                sample_memory(config, particles=engine.windows)
+                for window in engine.step(config.snapshot_timestep, interpolator):
+                    compute_and_save_ftle(
+                        window.index, window.particles, map_period, writer
+                    )
 
         tqdm_bar.clear()
         tqdm_bar.close()
-        self.progress_dict[self.index] = True  # Notify progress monitor
-        self.tqdm_position_queue.put(self.tqdm_position)
 
-    def _compute_and_save_ftle(self, particles):
-        """Computes FTLE and saves the results."""
-        jacobian = compute_flow_map_jacobian(particles)
-        map_period = (len(self.snapshot_files) - 1) * abs(args.snapshot_timestep)
-        ftle_field = compute_ftle(jacobian, map_period)
 
+class LiveProcessor:
+    """
+    Computes the backward-time FTLE of the newest window of a running simulation
+    whenever one of its snapshots is completely written (see `SnapshotWatcher`).
+
+    The short flow map of each new snapshot (see `FlowMapStore`) is computed as it
+    arrives, and the maps of the last snapshots of the window are kept in memory,
+    so each new FTLE field only costs one integration step of the grid nodes and
+    the composition of the maps of the window, instead of integrating the whole
+    window. The field of the k-th snapshot is saved as `ftle{k:04d}.mat`.
+    """
+
+    def __init__(self, config: MyProgramArgs):
+        self.config = config
+        self._validate()
+        self.grid_file = get_files_list(config.list_grid_files)[0]
+        self.particle_file = get_files_list(config.list_particle_files)[0]
+        self.num_snapshots_in_window = (
+            int(config.flow_map_period / abs(config.snapshot_timestep)) + 1
+        )
+        self.output_dir = f"outputs/{config.experiment_name}"
+
+    def _validate(self):
+        """Ensures the options of the job are supported by the `watch` mode."""
+        config = self.config
+        if config.snapshot_timestep >= 0:
+            raise ValueError(
+                "The `watch` mode computes the backward-time FTLE, so "
+                "`snapshot_timestep` must be negative."
+            )
+        if config.velocity_field != "files" or config.output_format != "mat":
+            raise ValueError(
+                "The `watch` mode requires the `files` velocity field and the "
+                "`mat` output format."
+            )
+        if config.integration_timestep is not None or config.refinement_levels > 0:
+            raise ValueError(
+                "`integration_timestep` and `refinement_levels` are not supported "
+                "by the `watch` mode."
+            )
+        if config.list_velocity_files is None and config.watch_directory is None:
+            raise ValueError(
+                "The `watch` mode follows either `list_velocity_files` or the "
+                "`watch_directory`."
+            )
+        if config.list_grid_files is None or (
+            len(get_files_list(config.list_grid_files)) != 1
+        ):
+            raise ValueError(
+                "The `watch` mode requires a single (fixed) grid file in "
+                "`list_grid_files`."
+            )
+
+    def run(self):
+        """Follows the snapshots until the `watch_timeout` (or an interruption)."""
+        config = self.config
+        num_snapshots_in_window = self.num_snapshots_in_window
         os.makedirs(self.output_dir, exist_ok=True)
+        init_worker(
+            WorkerContext(
+                [],
+                [self.grid_file],
+                [self.particle_file],
+                num_snapshots_in_window,
+                config=config,
+            )
+        )
+
+        if config.watch_directory is not None:
+            watcher = SnapshotWatcher(
+                directory=config.watch_directory,
+                pattern=config.watch_pattern,
+                poll_interval=config.poll_interval,
+                timeout=config.watch_timeout,
+            )
+            print(f"Watching {config.watch_directory} for new snapshots")
+        else:
+            watcher = SnapshotWatcher(
+                list_file=config.list_velocity_files,
+                poll_interval=config.poll_interval,
+                timeout=config.watch_timeout,
+            )
+            print(f"Watching {config.list_velocity_files} for new snapshots")
+
+        store = get_flow_map_store(config, num_snapshots_in_window, live=True)
+        seed_particles = read_seed_particles_coordinates(self.particle_file)
+        map_period = (num_snapshots_in_window - 1) * abs(config.snapshot_timestep)
+        window = deque(maxlen=num_snapshots_in_window)  # Newest snapshot first
+
+        with open_ftle_writer(config, self.output_dir) as writer:
+            try:
+                for k, snapshot_file in enumerate(watcher):
+                    start_time = time.perf_counter()
+                    window.appendleft((k, snapshot_file))
+                    flow_maps = [
+                        store.get(j, file, self.grid_file) for j, file in window
+                    ]
+                    if len(window) < num_snapshots_in_window:
+                        print(f"Snapshot {k:04d}: {snapshot_file} (filling window)")
+                        continue
 
-        filename = os.path.join(self.output_dir, f"ftle{self.index:04d}.mat")
-        savemat(filename, {"ftle": ftle_field})
+                    particles = NeighboringParticles(
+                        positions=seed_particles.positions.astype(config.precision)
+                    )
+                    compose_flow_maps(particles, flow_maps)
+                    compute_and_save_ftle(k, particles, map_period, writer)
+                    elapsed = time.perf_counter() - start_time
+                    print(f"FTLE {k:04d}: {snapshot_file} ({elapsed:.3f} s)")
+            except KeyboardInterrupt:
+                print("Stopped watching")
 
 
 class FTLEComputationManager:
     """Manages the distribution of snapshot processing tasks."""
 
-    def __init__(self):
-        self.snapshot_files = get_files_list(args.list_velocity_files)
-        self.grid_files = get_files_list(args.list_grid_files)
-        self.particle_files = get_files_list(args.list_particle_files)
+    def __init__(self, config: MyProgramArgs):
+        self.config = config
         self._validate_input_lists()
+        self.snapshot_times = None
+        if config.velocity_field == "files":
+            self.snapshot_files = get_files_list(config.list_velocity_files)
+            self.grid_files = get_files_list(config.list_grid_files)
+        else:
+            # Snapshots of analytic fields are labels of their times, without grid
+            self.snapshot_times = [
+                k * abs(config.snapshot_timestep) for k in range(config.num_snapshots)
+            ]
+            self.snapshot_files = [
+                f"{config.velocity_field}(t={t:g})" for t in self.snapshot_times
+            ]
+            self.grid_files = [config.velocity_field]
+        self.particle_files = get_files_list(config.list_particle_files)
+        self._validate_file_counts()
 
         self.num_snapshots_total = len(self.snapshot_files)
         self.num_snapshots_in_flow_map_period = (
-            int(args.flow_map_period / abs(args.snapshot_timestep)) + 1
+            int(config.flow_map_period / abs(config.snapshot_timestep)) + 1
         )
-        self.num_processes = args.num_processes
+        self.num_windows = (
+            self.num_snapshots_total - self.num_snapshots_in_flow_map_period + 1
+        )
+        self.num_processes = config.num_processes
+        self.output_dir = f"outputs/{config.experiment_name}"
 
         self._handle_time_direction()
+        self.context = WorkerContext(
+            self.snapshot_files,
+            self.grid_files,
+            self.particle_files,
+            self.num_snapshots_in_flow_map_period,
+            snapshot_times=self.snapshot_times,
+            config=config,
+            backward=config.snapshot_timestep < 0,
+        )
+        self.task_errors = []
+        self.num_tasks = 0
+        # Aggregated over all the workers
+        self.telemetry = Telemetry(config.trace, config.track_memory)
 
     def _validate_input_lists(self):
-        """Ensures input lists are correctly formatted."""
+        """Ensures the inputs and options of the job are consistent."""
+        config = self.config
+        if config.velocity_field == "files":
+            if config.list_velocity_files is None or config.list_grid_files is None:
+                raise ValueError(
+                    "`list_velocity_files` and `list_grid_files` are required to "
+                    "read the velocity field from files."
+                )
+        else:
+            if config.num_snapshots is None:
+                raise ValueError(
+                    f"`num_snapshots` is required by the `{config.velocity_field}` "
+                    "analytic velocity field."
+                )
+            if config.execution_mode == "composition":
+                raise ValueError(
+                    "Analytic velocity fields are not supported by the "
+                    "`composition` execution mode, which needs a grid."
+                )
+            if (
+                config.snapshot_store is not None
+                or config.shared_memory_size is not None
+            ):
+                raise ValueError(
+                    "`snapshot_store` and `shared_memory_size` cannot be used with "
+                    "an analytic velocity field, which reads no snapshots."
+                )
+        if (
+            config.integration_timestep is not None
+            and config.execution_mode != "window"
+        ):
+            raise ValueError(
+                "`integration_timestep` is only supported by the `window` "
+                f"execution mode, got `{config.execution_mode}`."
+            )
+        if config.snapshot_store is not None and config.shared_memory_size is not None:
+            raise ValueError(
+                "`shared_memory_size` cannot be used with `snapshot_store`, whose "
+                "pages are already shared by all the workers through the OS cache."
+            )
+        if config.output_format == "mat" and config.output_precision == "float16":
+            raise ValueError(
+                "MATLAB files do not support `float16`: use the `stacked` output "
+                "format, or another `output_precision`."
+            )
+        if config.refinement_levels > 0 and (
+            config.execution_mode == "sweep" or config.output_format != "mat"
+        ):
+            raise ValueError(
+                "`refinement_levels` requires the `window` or `composition` "
+                "execution mode and the `mat` output format."
+            )
+
+    def _validate_file_counts(self):
+        """Ensures the grid and particle lists match the snapshot list."""
         if len(self.grid_files) > 1:
             assert len(self.snapshot_files) == len(self.grid_files)
         if len(self.particle_files) > 1:
             assert len(self.snapshot_files) == len(self.particle_files)
 
     def _handle_time_direction(self):
-        """Handles time direction for backward/forward FTLE computation."""
-        if args.snapshot_timestep < 0:
-            self.snapshot_files.reverse()
-            self.grid_files.reverse()
-            self.particle_files.reverse()
+        """
+        Reports the time direction of the FTLE computation. The input lists keep
+        their (time) order either way: backward-time windows integrate their
+        snapshots from the last one (see `WorkerContext.window_snapshots`), so a
+        window keeps its index (and its output) when snapshots are appended.
+        """
+        if self.config.snapshot_timestep < 0:
             print("Running backward-time FTLE")
         else:
             print("Running forward-time FTLE")
 
+    def _job_parameters(self) -> dict:
+        """Returns the parameters that affect the results of the job."""
+        names = [
+            "snapshot_timestep",
+            "integration_timestep",
+            "flow_map_period",
+            "integrator",
+            "interpolator",
+            "execution_mode",
+            "precision",
+            "output_format",
+            "output_precision",
+            "velocity_field",
+            "velocity_field_parameters",
+            "num_snapshots",
+            "refinement_levels",
+            "refinement_fraction",
+        ]
+        return {name: getattr(self.config, name) for name in names}
+
+    def _find_pending_windows(self) -> list[int]:
+        """
+        Loads the job manifest and returns the windows still to be computed, i.e.
+        all of them, unless resuming a job with the same parameters, in which case
+        the windows already completed with the same input files are skipped. The
+        checkpoints and short flow maps of a job that starts over are deleted (the
+        maps kept when resuming are verified against their inputs by the store).
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        self.manifest = JobManifest(
+            os.path.join(self.output_dir, "manifest.json"),
+            self._job_parameters(),
+            resume=self.config.resume,
+        )
+
+        checkpoint_dir = os.path.join(self.output_dir, "checkpoints")
+        if self.manifest.reset:
+            shutil.rmtree(checkpoint_dir, ignore_errors=True)
+            shutil.rmtree(
+                os.path.join(self.output_dir, "flow_maps"), ignore_errors=True
+            )
+        if self.config.checkpoint_interval is not None:
+            os.makedirs(checkpoint_dir, exist_ok=True)
+
+        fingerprint = functools.cache(file_fingerprint)  # Windows share their files
+        self.window_digests = [
+            window_digest(self.context.input_files(i), fingerprint)
+            for i in range(self.num_windows)
+        ]
+        pending = [
+            i
+            for i, digest in enumerate(self.window_digests)
+            if not self.manifest.is_completed(i, digest)
+        ]
+        if len(pending) < self.num_windows:
+            print(f"Resuming job: {self.num_windows - len(pending)} windows completed")
+        return pending
+
     def run(self):
         """Runs FTLE computation using multiprocessing with shared progress tracking."""
-        pool = multiprocessing.Pool(processes=self.num_processes)
-        manager = multiprocessing.Manager()
-        progress_dict = manager.dict()
-        tqdm_position_queue = manager.Queue()
+        if self.config.replay_window is not None:
+            self.replay(self.config.replay_window)
+            return
+
+        from tqdm import tqdm
+
+        start_time = time.perf_counter()
+        pending_windows = self._find_pending_windows()
+        if self.config.output_format == "stacked":
+            self._create_stacked_output(keep_existing=not self.manifest.reset)
+
+        manager = None
+        if self.config.shared_memory_size is not None:
+            # Start the resource tracker before forking, so that all workers share it
+            resource_tracker.ensure_running()
+            manager = multiprocessing.Manager()
+            self.context.snapshot_store = SharedSnapshotStore(
+                manager.dict(),
+                manager.Lock(),
+                int(self.config.shared_memory_size * 2**20),
+            )
+        events = multiprocessing.Queue()
+        self.context.events = events
 
-        # Initialize available tqdm positions (from 1 to num_processes)
+        # Available tqdm positions (from 1 to num_processes), one for each worker
+        tqdm_positions = multiprocessing.Queue()
         for i in range(1, self.num_processes + 1):
-            tqdm_position_queue.put(i)
+            tqdm_positions.put(i)
+
+        pool = multiprocessing.Pool(
+            processes=self.num_processes,
+            initializer=init_worker,
+            initargs=(self.context, tqdm_positions),
+        )
 
         tqdm_outer = tqdm(
-            total=self.num_snapshots_total - self.num_snapshots_in_flow_map_period + 1,
+            total=self.num_windows,
+            initial=self.num_windows - len(pending_windows),
             desc="Total Progress",
             position=0,
             leave=True,
         )
 
-        tasks = []
-        for i in range(
-            self.num_snapshots_total - self.num_snapshots_in_flow_map_period + 1
-        ):
-            snapshot_files_period = self.snapshot_files[
-                i : i + self.num_snapshots_in_flow_map_period
-            ]
-            grid_files_period = list(
-                itertools.islice(
-                    itertools.cycle(self.grid_files),
-                    i,
-                    i + self.num_snapshots_in_flow_map_period,
-                )
+        if self.config.execution_mode == "sweep":
+            self._submit_sweep_tasks(pool, pending_windows)
+        else:
+            self._submit_window_tasks(pool, pending_windows)
+
+        try:
+            self._monitor_progress(events, tqdm_outer, start_time)
+        except BaseException:
+            pool.terminate()
+            raise
+        else:
+            pool.close()
+        finally:
+            pool.join()
+            if self.context.snapshot_store is not None:
+                self.context.snapshot_store.clear()
+            tqdm_outer.close()
+
+        self._save_telemetry(time.perf_counter() - start_time)
+
+    def replay(self, index: int):
+        """
+        Computes a single window in the current process, without a pool (nor job
+        manifest), e.g. to debug or profile it (see `profile_window`). In the
+        `sweep` execution mode, the window is swept on its own.
+        """
+        if not 0 <= index < self.num_windows:
+            raise ValueError(
+                f"`replay_window` must be in [0, {self.num_windows}), got {index}."
             )
-            particle_file = list(
-                itertools.islice(
-                    itertools.cycle(self.particle_files), self.num_snapshots_total
+
+        start_time = time.perf_counter()
+        os.makedirs(self.output_dir, exist_ok=True)
+        if self.config.checkpoint_interval is not None:
+            os.makedirs(os.path.join(self.output_dir, "checkpoints"), exist_ok=True)
+        if self.config.output_format == "stacked":
+            self._create_stacked_output(keep_existing=True)
+
+        init_worker(self.context)
+        if self.config.execution_mode == "sweep":
+            run_sweep_block(range(index, index + 1))
+        else:
+            run_window_block(range(index, index + 1))
+
+        self.telemetry.merge(telemetry.collect())
+        self._save_telemetry(time.perf_counter() - start_time)
+
+    def _create_stacked_output(self, keep_existing: bool):
+        """
+        Preallocates the single store where all workers write their windows (or
+        resizes it to the current number of windows, keeping the existing ones, e.g.
+        when resuming a job).
+        """
+        num_particles = len(read_seed_particles_coordinates(self.particle_files[0]))
+        StackedFTLEWriter.create(
+            self.output_dir,
+            num_particles,
+            [self.context.window_files(i)[0][0] for i in range(self.num_windows)],
+            (self.num_snapshots_in_flow_map_period - 1)
+            * abs(self.config.snapshot_timestep),
+            dtype=self.config.output_precision or self.config.precision,
+            keep_existing=keep_existing,
+        )
+
+    def _submit_window_tasks(self, pool, window_indices):
+        """
+        Submits the windows in small blocks of consecutive windows, each integrating
+        its windows from scratch (or composing their short flow maps, in the
+        `composition` execution mode). Consecutive windows share most of their
+        snapshots, so a worker reuses its caches within a block, while blocks are
+        small enough to keep all the workers busy until the end of the job.
+        """
+        block_size = -(-len(window_indices) // (4 * self.num_processes))  # ceil
+        for block in contiguous_blocks(window_indices, max(block_size, 1)):
+            self._submit(pool, run_window_block, block)
+
+    def _submit_sweep_tasks(self, pool, window_indices):
+        """
+        Splits the windows into one contiguous block per process, each block being
+        computed by a single sweep over its snapshots. Blocks never span windows
+        that are not to be computed (e.g. already completed by a resumed job).
+        """
+        block_size = -(-len(window_indices) // self.num_processes)  # ceil division
+        for block in contiguous_blocks(window_indices, max(block_size, 1)):
+            self._submit(pool, run_sweep_block, block)
+
+    def _submit(self, pool, task: Callable[[range], None], block: range):
+        """Submits a task, reporting its failure to the progress monitor."""
+
+        def on_error(error: BaseException):
+            self.task_errors.append(error)
+            self.context.events.put(("failed", block.start, {}))
+
+        # Only the indices are sent, the workers already hold the file lists
+        pool.apply_async(task, (block,), error_callback=on_error)
+        self.num_tasks += 1
+
+    def _monitor_progress(self, events, tqdm_outer, start_time: float):
+        """
+        Waits for all the tasks to finish, updates the progress bar (with the
+        throughput in particle-steps per second), aggregates the telemetry of the
+        workers and records the completed windows in the job manifest (saved at
+        most every couple of seconds). Raises the error of the first failed task,
+        if any.
+        """
+        self.manifest.save()
+        last_save = time.monotonic()
+        num_finished = 0
+        try:
+            while num_finished < self.num_tasks:
+                event, index, stages = events.get()
+                if event == "failed":
+                    raise self.task_errors[0]
+
+                self.telemetry.merge(stages)
+                if event == "finished":
+                    num_finished += 1
+                    continue
+
+                self.manifest.mark_completed(index, self.window_digests[index])
+                particle_steps = self.telemetry.items("integrate")
+                elapsed = time.perf_counter() - start_time
+                tqdm_outer.set_postfix_str(
+                    f"{particle_steps / elapsed:.3g} particle-steps/s", refresh=False
                 )
-            )[i]
+                tqdm_outer.update(1)
+                if time.monotonic() - last_save > 2.0:
+                    self.manifest.save()
+                    last_save = time.monotonic()
+        finally:
+            self.manifest.save()
 
-            progress_dict[i] = False  # Mark as incomplete
+    def _save_telemetry(self, wall_time: float):
+        """
+        Prints the time spent in each stage and saves the telemetry summary (and
+        the timeline, if traced).
+        """
+        summary = self.telemetry.summary(wall_time)
+        with open(os.path.join(self.output_dir, "telemetry.json"), "w") as f:
+            json.dump(summary, f, indent=2)
+        if self.config.trace:
+            trace_path = os.path.join(self.output_dir, "trace.json")
+            self.telemetry.save_trace(trace_path)
+            print(f"Timeline saved to: {trace_path}")
 
-            processor = SnapshotProcessor(
-                i,
-                snapshot_files_period,
-                grid_files_period,
-                particle_file,
-                tqdm_position_queue,
-                progress_dict,
+        for stage, counters in summary["stages"].items():
+            print(
+                f"{stage:>12}: {counters['seconds']:9.2f} s "
+                f"({100 * (counters['time_fraction'] or 0):5.1f}%) "
+                f"in {counters['calls']} calls"
             )
-            tasks.append(pool.apply_async(processor.run))
+        rate = summary["particle_steps_per_second"]
+        if rate is not None:
+            print(f"Throughput: {rate:.4g} particle-steps/s")
+
+        for process, usage in summary.get("processes", {}).items():
+            cached = usage["cached_bytes"].get("total", 0)
+            print(
+                f"{process:>12}: peak RSS {usage['peak_rss_bytes'] / 2**20:.1f} MB, "
+                f"caches {cached / 2**20:.1f} MB"
+            )
+        if "total_peak_rss_bytes" in summary:
+            total = summary["total_peak_rss_bytes"] / 2**20
+            print(f"Peak RSS of all workers: {total:.1f} MB")
+
 
-        self._monitor_progress(tasks, progress_dict, tqdm_outer)
+def run(config: MyProgramArgs) -> None:
+    """
+    Computes the FTLE fields of a run, e.g. from another program:
 
-        pool.close()
-        pool.join()
-        tqdm_outer.close()
+        from src.hyperparameters import MyProgramArgs
+        from src.main import run
 
-    def _monitor_progress(self, tasks, tqdm_dict, tqdm_outer):
-        """Monitors the completion of parallel tasks and updates the progress bar."""
-        completed = 0
-        while completed < len(tasks):
-            completed = sum(1 for v in tqdm_dict.values() if v)  # Count completed tasks
-            tqdm_outer.update(completed - tqdm_outer.n)  # Increment new completions
-            tqdm_outer.refresh()
-            time.sleep(2.0)  # Prevents excessive polling, keeping CPU usage low
+        run(MyProgramArgs(experiment_name="gyre", ...))
 
-            # OBS: the computations inside the loop runs asynchronously, thus
-            # time.sleep will not held the computations. The present method just
-            # waits for notifications of completed tasks.
+    Args:
+        config (MyProgramArgs): Configuration of the run.
+    """
+    if config.watch:
+        LiveProcessor(config).run()
+    else:
+        FTLEComputationManager(config).run()
 
 
 @timeit
 def main():
     """Main execution entry point."""
-    manager = FTLEComputationManager()
-    manager.run()
+    run(parse_args())
 
 
 if __name__ == "__main__":
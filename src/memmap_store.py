@@ -0,0 +1,185 @@
+"""
+Memory-mappable binary store of a snapshot dataset.
+
+The velocity and coordinate fields of the files listed in `list_velocity_files`
+and `list_grid_files` are converted once into two time-stacked `.npy` arrays of
+shape [num_files, M, N, 2], plus a small `index.json` that maps each original file
+path to its position in the stack. Readers then return zero-copy `np.memmap` views
+of the store, skipping MAT parsing entirely, and all the workers of a node share
+its pages through the OS cache.
+
+Usage:
+    python -m src.memmap_store --list_velocity_files velocity_files.txt \
+        --list_grid_files grid_files.txt --output_dir inputs/store
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+from numpy.lib.format import open_memmap
+from numpy.typing import DTypeLike
+from scipy.io import loadmat
+
+from src.file_utils import get_files_list
+from src.my_types import ArrayFloat32MxN, ArrayFloat32Nx2
+
+INDEX_FILE = "index.json"
+
+
+def convert_to_memmap_store(
+    velocity_files: list[str],
+    grid_files: list[str],
+    output_dir: str,
+    dtype: DTypeLike = np.float64,
+) -> None:
+    """
+    Converts the velocity and grid MATLAB files into a memory-mappable store.
+
+    Args:
+        velocity_files (list[str]): Paths to the velocity files (with `velocity_x`
+            and `velocity_y`).
+        grid_files (list[str]): Paths to the grid files (with `coordinate_x` and
+            `coordinate_y`).
+        output_dir (str): Directory where the store is written.
+        dtype (DTypeLike): Precision of the stored velocities (coordinates are
+            always stored in float64).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    _stack_files(velocity_files, "velocity", output_dir, dtype)
+    _stack_files(grid_files, "coordinate", output_dir, np.float64)
+
+    # Written last, so that an interrupted conversion leaves no usable store
+    index = {
+        "velocity": [os.path.normpath(f) for f in velocity_files],
+        "coordinate": [os.path.normpath(f) for f in grid_files],
+    }
+    with open(os.path.join(output_dir, INDEX_FILE), "w") as f:
+        json.dump(index, f, indent=2)
+
+
+def _stack_files(
+    file_paths: list[str], variable: str, output_dir: str, dtype: DTypeLike
+) -> None:
+    """Writes the `{variable}_x/_y` fields of the files to `{variable}.npy`."""
+    stacked = None
+    for k, file_path in enumerate(file_paths):
+        data = loadmat(file_path, variable_names=[f"{variable}_x", f"{variable}_y"])
+        x, y = data[f"{variable}_x"], data[f"{variable}_y"]
+
+        if stacked is None:
+            stacked = open_memmap(
+                os.path.join(output_dir, f"{variable}.npy"),
+                mode="w+",
+                dtype=dtype,
+                shape=(len(file_paths), *x.shape, 2),
+            )
+        elif x.shape != stacked.shape[1:3]:
+            raise ValueError(
+                f"All files must have the same shape to be stacked: {file_path} has "
+                f"shape {x.shape}, expected {stacked.shape[1:3]}."
+            )
+
+        stacked[k, ..., 0] = x
+        stacked[k, ..., 1] = y
+
+    if stacked is not None:
+        stacked.flush()
+
+
+class MemmapDataReader:
+    """
+    Reads the `variable` ("velocity" or "coordinate") fields from a store written by
+    `convert_to_memmap_store`, as zero-copy views of the memory-mapped stack. Files
+    are identified by the paths they had when the store was converted.
+
+    Views are read-only; they are only converted (copied) if `dtype` differs from
+    the precision of the store.
+    """
+
+    def __init__(self, store_dir: str, variable: str, dtype: DTypeLike = np.float64):
+        self.store_dir = store_dir
+        self.variable = variable
+        self.dtype = dtype
+
+        with open(os.path.join(store_dir, INDEX_FILE)) as f:
+            file_paths = json.load(f)[variable]
+        self.positions = {path: k for k, path in enumerate(file_paths)}
+        self.stacked = np.load(
+            os.path.join(store_dir, f"{variable}.npy"), mmap_mode="r"
+        )
+
+    def read_raw(self, file_path: str) -> tuple[ArrayFloat32MxN, ArrayFloat32MxN]:
+        """
+        Returns the fields of the given file as a tuple of (strided) arrays with
+        shapes [M, N].
+
+        Args:
+            file_path (str): Path of the file when the store was converted.
+
+        Returns:
+            tuple[ArrayFloat32MxN, ArrayFloat32MxN]: Tuple of arrays of shape [M, N].
+        """
+        snapshot = self._snapshot(file_path)
+        return snapshot[..., 0], snapshot[..., 1]
+
+    def read_flatten(self, file_path: str) -> ArrayFloat32Nx2:
+        """
+        Returns the fields of the given file as an array with shape [n_points, 2].
+
+        Args:
+            file_path (str): Path of the file when the store was converted.
+
+        Returns:
+            ArrayFloat32Nx2: Array of shape [n_points, 2].
+        """
+        return self._snapshot(file_path).reshape(-1, 2)
+
+    def _snapshot(self, file_path: str) -> np.ndarray:
+        try:
+            k = self.positions[os.path.normpath(file_path)]
+        except KeyError:
+            raise KeyError(
+                f"{file_path} is not in the snapshot store at {self.store_dir}."
+            ) from None
+        return self.stacked[k].astype(self.dtype, copy=False)
+
+
+class MemmapVelocityDataReader(MemmapDataReader):
+    """Reads velocity data from a memory-mapped store (see `MemmapDataReader`)."""
+
+    def __init__(self, store_dir: str, dtype: DTypeLike = np.float64):
+        super().__init__(store_dir, "velocity", dtype)
+
+
+class MemmapCoordinateDataReader(MemmapDataReader):
+    """Reads coordinate data from a memory-mapped store (see `MemmapDataReader`)."""
+
+    def __init__(self, store_dir: str, dtype: DTypeLike = np.float64):
+        super().__init__(store_dir, "coordinate", dtype)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Converts a MATLAB snapshot dataset into a memory-mappable store."
+    )
+    parser.add_argument("--list_velocity_files", type=str, required=True)
+    parser.add_argument("--list_grid_files", type=str, required=True)
+    parser.add_argument("--output_dir", type=str, required=True)
+    parser.add_argument(
+        "--precision", type=str, choices=["float64", "float32"], default="float64"
+    )
+    args = parser.parse_args()
+
+    convert_to_memmap_store(
+        get_files_list(args.list_velocity_files),
+        get_files_list(args.list_grid_files),
+        args.output_dir,
+        args.precision,
+    )
+    print(f"Snapshot store saved to: {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
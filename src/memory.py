@@ -0,0 +1,108 @@
+import mmap
+import os
+import sys
+import types
+from collections import deque
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Objects referenced by others without being held by them
+UNOWNED_TYPES = (type, types.FunctionType, types.MethodType, types.ModuleType)
+
+# Approximate size of a node of a cKDTree, which does not expose its node array
+KDTREE_NODE_NBYTES = 72
+
+
+def current_rss() -> int:
+    """Returns the resident set size (in bytes) of the current process, or 0."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def peak_rss() -> int:
+    """Returns the peak resident set size (in bytes) of the current process, or 0."""
+    if resource is None:
+        return 0
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Reported in kilobytes on Linux, but in bytes on macOS
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def deep_nbytes(*objects) -> int:
+    """
+    Estimates the memory held by the numpy arrays reachable from the objects,
+    through their attributes and containers (e.g. a cache of interpolators, with
+    their triangulations and Clough-Tocher gradients). Arrays shared by several
+    objects (or views of the same array) are only counted once, so this estimates
+    the actual footprint of a whole cache, or of a single item (e.g. a prefetched
+    interpolator, whose shared geometry is then counted as well).
+
+    Dictionaries are walked through their values only, since their keys are
+    usually file paths or objects owned elsewhere (e.g. the factory of a cached
+    interpolator). The nodes of KD-trees are estimated from their number.
+
+    Args:
+        *objects: Objects to be measured.
+
+    Returns:
+        int: Estimated number of bytes.
+    """
+    nbytes = 0
+    seen = set()
+    pending = list(objects)
+    while pending:
+        obj = pending.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+
+        if isinstance(obj, np.ndarray):
+            if isinstance(obj.base, np.ndarray):
+                pending.append(obj.base)  # Count the viewed array once
+            elif not isinstance(obj.base, mmap.mmap):
+                nbytes += obj.nbytes
+            # Arrays over mapped memory (files or shared memory) are not owned
+        elif isinstance(obj, cKDTree):
+            nbytes += obj.size * KDTREE_NODE_NBYTES
+            pending.extend([obj.data, obj.indices])
+        elif isinstance(obj, dict):
+            pending.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+            pending.extend(obj)
+        elif hasattr(obj, "__dict__") and not isinstance(obj, UNOWNED_TYPES):
+            pending.extend(vars(obj).values())
+    return nbytes
+
+
+def process_tree_rss(pid: int) -> int:
+    """
+    Returns the total resident set size (in bytes) of a process and all its
+    descendants (e.g. the workers of a pool), or 0 if not available (Linux only).
+
+    Args:
+        pid (int): Process id of the root of the tree.
+
+    Returns:
+        int: Total number of bytes.
+    """
+    total = 0
+    pending = [pid]
+    while pending:
+        pid = pending.pop()
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                total += int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+            with open(f"/proc/{pid}/task/{pid}/children") as f:
+                pending.extend(int(child) for child in f.read().split())
+        except (OSError, ValueError):
+            continue  # The process exited, or the platform has no procfs
+    return total
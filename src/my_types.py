@@ -1,7 +1,18 @@
-from nptyping import Float32, NDArray, Shape
+from typing import TYPE_CHECKING
 
-ArrayFloat32N = NDArray[Shape["*"], Float32]
-ArrayFloat32MxN = NDArray[Shape["*, *"], Float32]
-ArrayFloat32Nx2 = NDArray[Shape["*, 2"], Float32]
-ArrayFloat32Nx2x2 = NDArray[Shape["*, 2, 2"], Float32]
-ArrayFloat32N4x2 = NDArray[Shape["*, 4, 2"], Float32]
+import numpy as np
+
+if TYPE_CHECKING:
+    from nptyping import Float32, Int, NDArray, Shape
+
+    ArrayFloat32N = NDArray[Shape["*"], Float32]
+    ArrayFloat32MxN = NDArray[Shape["*, *"], Float32]
+    ArrayFloat32Nx2 = NDArray[Shape["*, 2"], Float32]
+    ArrayFloat32Nx2x2 = NDArray[Shape["*, 2, 2"], Float32]
+    ArrayFloat32N4x2 = NDArray[Shape["*, 4, 2"], Float32]
+    ArrayIntN = NDArray[Shape["*"], Int]
+else:
+    # nptyping imports pandas, which would take most of the startup time, so the
+    # shapes are only checked statically
+    ArrayFloat32N = ArrayFloat32MxN = ArrayFloat32Nx2 = np.ndarray
+    ArrayFloat32Nx2x2 = ArrayFloat32N4x2 = ArrayIntN = np.ndarray
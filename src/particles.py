@@ -2,7 +2,7 @@ from dataclasses import dataclass, field
 
 import numpy as np
 
-from src.my_types import ArrayFloat32N4x2, ArrayFloat32Nx2
+from src.my_types import ArrayFloat32N4x2, ArrayFloat32Nx2, ArrayIntN
 
 
 @dataclass
@@ -17,6 +17,10 @@ class NeighboringParticles:
     - Last  N rows → Bottom neighbors (x, y)
 
     This structure allows efficient vectorized computations
+
+    The `simplex_hint` array keeps the last simplex (of the grid triangulation)
+    containing each position, so that interpolators can warm-start the point
+    location at the next evaluation (-1 means unknown).
     """
 
     positions: ArrayFloat32N4x2  # Flattened representation with shape (4*N, 2)
@@ -24,6 +28,7 @@ class NeighboringParticles:
     initial_delta_top_bottom: ArrayFloat32Nx2 = field(init=False)
     initial_delta_right_left: ArrayFloat32Nx2 = field(init=False)
     initial_centroid: ArrayFloat32Nx2 = field(init=False)
+    simplex_hint: ArrayIntN = field(init=False, repr=False)
 
     def __post_init__(self) -> None:
         assert (
@@ -41,6 +46,7 @@ class NeighboringParticles:
         self.initial_centroid = np.mean(
             self.positions.reshape(n_particles, 4, 2), axis=1
         )
+        self.simplex_hint = np.full(self.positions.shape[0], -1, dtype=np.intp)
 
     def __len__(self) -> int:
         """Returns the number of particle groups (N)."""
@@ -69,3 +75,16 @@ class NeighboringParticles:
         """Compute the centroid of the four neighboring positions."""
         n_particles = self.positions.shape[0] // 4  # n_particles = N
         return np.mean(self.positions.reshape(n_particles, 4, 2), axis=1)
+
+
+@dataclass
+class ParticleBatch:
+    """
+    Plain set of particle positions with shape (n_points, 2), to be advanced by the
+    integrators when no neighboring-particle structure is needed (e.g. the
+    concatenation of several `NeighboringParticles`, or the nodes of a grid).
+    Point location is only warm-started if a `simplex_hint` is given.
+    """
+
+    positions: ArrayFloat32Nx2
+    simplex_hint: ArrayIntN | None = None
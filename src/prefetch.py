@@ -0,0 +1,136 @@
+import threading
+from typing import Callable, Generic, TypeVar
+
+from src.memory import deep_nbytes
+
+T = TypeVar("T")
+
+
+class Prefetcher(Generic[T]):
+    """
+    Builds the items `build(0), build(1), ...` in a background thread, ahead of
+    their use, so that reading and decoding the next snapshots (and building their
+    interpolators) overlaps with the integration of the current one.
+
+    At most `depth` items are kept ready and, if `max_bytes` is given, the thread
+    also waits while the ready items hold more than `max_bytes` (as estimated by
+    `size_of`). Items are expected to be requested in increasing order: requesting
+    an item discards the ones before it, and an item requested again after that is
+    built in the calling thread. Errors raised by `build` are re-raised by `get`.
+
+    Parameters
+    ----------
+    build : Callable[[int], T]
+        Function that builds the item of the given index.
+    num_items : int
+        Number of items to build.
+    depth : int
+        Maximum number of items built ahead.
+    max_bytes : int, optional
+        Maximum memory held by the items built ahead. At least one item is always
+        built ahead, regardless of its size.
+    size_of : Callable[[T], int], optional
+        Function that estimates the memory held by an item (`deep_nbytes` by
+        default).
+    """
+
+    def __init__(
+        self,
+        build: Callable[[int], T],
+        num_items: int,
+        depth: int = 2,
+        max_bytes: int | None = None,
+        size_of: Callable[[T], int] | None = None,
+    ):
+        self.build = build
+        self.num_items = num_items
+        self.depth = depth
+        self.max_bytes = max_bytes
+        self.size_of = size_of or deep_nbytes
+
+        self.ready = {}  # index -> (item, nbytes, error)
+        self.ready_bytes = 0
+        self.next_to_get = 0
+        self.closed = False
+        self.condition = threading.Condition()
+        # Builders usually share caches that are not thread-safe
+        self.build_lock = threading.Lock()
+
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get(self, index: int) -> T:
+        """
+        Returns the item of the given index, waiting for it to be built.
+
+        Args:
+            index (int): Index of the item.
+
+        Returns:
+            T: The built item.
+        """
+        if not 0 <= index < self.num_items:
+            raise IndexError(f"Item {index} out of range ({self.num_items} items).")
+        if index < self.next_to_get:
+            with self.build_lock:
+                return self.build(index)
+
+        with self.condition:
+            self.next_to_get = index + 1
+            for skipped in [k for k in self.ready if k < index]:
+                self.ready_bytes -= self.ready.pop(skipped)[1]
+            self.condition.notify_all()
+
+            self.condition.wait_for(lambda: index in self.ready)
+            item, nbytes, error = self.ready.pop(index)
+            self.ready_bytes -= nbytes
+            self.condition.notify_all()
+
+        if error is not None:
+            raise error
+        return item
+
+    def close(self) -> None:
+        """Stops the background thread (the items built ahead are dropped)."""
+        with self.condition:
+            self.closed = True
+            self.ready.clear()
+            self.condition.notify_all()
+        self.thread.join()
+
+    def _has_room(self, index: int) -> bool:
+        if self.closed or not self.ready:
+            return True
+        if index >= self.next_to_get + self.depth:
+            return False
+        return self.max_bytes is None or self.ready_bytes < self.max_bytes
+
+    def _run(self) -> None:
+        for index in range(self.num_items):
+            with self.condition:
+                self.condition.wait_for(lambda: self._has_room(index))
+                if self.closed:
+                    return
+                if index < self.next_to_get - 1:
+                    continue  # Already requested past it
+
+            item, nbytes, error = None, 0, None
+            try:
+                with self.build_lock:
+                    item = self.build(index)
+                nbytes = self.size_of(item)
+            except Exception as exception:
+                error = exception
+
+            with self.condition:
+                if self.closed:
+                    return
+                self.ready[index] = (item, nbytes, error)
+                self.ready_bytes += nbytes
+                self.condition.notify_all()
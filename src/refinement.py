@@ -0,0 +1,255 @@
+from dataclasses import dataclass
+from typing import Callable
+
+import numpy as np
+from numpy.typing import DTypeLike
+from scipy.spatial import cKDTree
+
+from src.ftle import compute_ftle_from_particles
+from src.my_types import ArrayFloat32N, ArrayFloat32Nx2, ArrayIntN
+from src.particles import NeighboringParticles
+from src.telemetry import telemetry
+
+# Centers of the 4 children of a cell, in units of its size (SW, SE, NW, NE)
+CHILD_OFFSETS = np.array([[-1, -1], [1, -1], [-1, 1], [1, 1]]) / 4
+
+
+@dataclass
+class QuadtreeFTLE:
+    """
+    FTLE field on the cells of a quadtree of seed particles (see `refine_ftle`).
+
+    The first cells are the seeds of the particle file, in order, so the leading
+    values of `ftle` are the uniform (coarse) field. The 4 children of a refined
+    cell are stored together, from `first_child` on, and point back to it through
+    `parent` (-1 for the coarse cells). Indices start at 0.
+    """
+
+    center: ArrayFloat32Nx2  # Center (seed particle) of each cell
+    size: ArrayFloat32Nx2  # Width and height of each cell
+    level: ArrayIntN  # Refinement level of each cell (0 for the coarse cells)
+    parent: ArrayIntN  # Index of the parent of each cell, or -1
+    first_child: ArrayIntN  # Index of the first child of each cell, or -1 (leaves)
+    ftle: ArrayFloat32N  # FTLE of each cell
+
+    def __len__(self) -> int:
+        """Returns the number of cells."""
+        return len(self.ftle)
+
+    @property
+    def is_leaf(self) -> np.ndarray:
+        """Flags the cells that are not refined."""
+        return self.first_child < 0
+
+    def to_dict(self) -> dict[str, np.ndarray]:
+        """Returns the arrays of the tree, e.g. to be saved with `savemat`."""
+        return {
+            "ftle": self.ftle,
+            "center": self.center,
+            "size": self.size,
+            "level": self.level,
+            "parent": self.parent,
+            "first_child": self.first_child,
+        }
+
+
+def _lattice_labels(values: np.ndarray, rtol: float = 1e-9) -> tuple:
+    """
+    Groups (nearly) equal coordinates, returning the sorted distinct coordinates and
+    the label of each value.
+    """
+    order = np.argsort(values)
+    sorted_values = values[order]
+    tolerance = rtol * max(np.ptp(sorted_values), np.max(np.abs(sorted_values)))
+    labels = np.empty(len(values), dtype=np.intp)
+    labels[order] = np.concatenate(([0], np.cumsum(np.diff(sorted_values) > tolerance)))
+    coordinates = np.bincount(labels, weights=values) / np.bincount(labels)
+    return coordinates, labels
+
+
+def seed_cells(seed_particles: NeighboringParticles) -> tuple:
+    """
+    Returns the cells represented by the seed particles, which must lie on the nodes
+    of a uniform rectilinear lattice (some nodes may be missing, e.g. inside a
+    solid body). Each cell is centered at its seed and spans the lattice spacing.
+
+    Args:
+        seed_particles (NeighboringParticles): Seed particles, at the initial time.
+
+    Returns:
+        tuple: Centers and sizes (width and height) of the cells, of shape [N, 2].
+    """
+    num_particles = len(seed_particles)
+    centers = (
+        np.asarray(seed_particles.positions, dtype=np.float64)
+        .reshape(4, num_particles, 2)  # Left, right, top and bottom neighbors
+        .mean(axis=0)
+    )
+    sizes = np.empty_like(centers)
+    labels = []
+    for axis in range(2):
+        coordinates, axis_labels = _lattice_labels(centers[:, axis])
+        if len(coordinates) < 2:
+            raise ValueError(
+                "Adaptive refinement requires seed particles on a lattice with at "
+                "least 2 nodes in each direction."
+            )
+        steps = np.diff(coordinates)
+        # Missing rows or columns of nodes are multiples of the spacing
+        spacing = steps.min()
+        num_steps = np.round(steps / spacing)
+        if not np.allclose(steps, num_steps * spacing, rtol=1e-6):
+            raise ValueError(
+                "Adaptive refinement requires seed particles on the nodes of a "
+                "uniform rectilinear lattice."
+            )
+        sizes[:, axis] = spacing
+        labels.append(axis_labels)
+
+    if len(np.unique(np.column_stack(labels), axis=0)) != len(centers):
+        raise ValueError("Adaptive refinement requires distinct seed particles.")
+    return centers, sizes
+
+
+def seed_particles_at(
+    centers: ArrayFloat32Nx2, spacing: ArrayFloat32Nx2, dtype: DTypeLike = np.float64
+) -> NeighboringParticles:
+    """
+    Returns seed particles at the given centers, with their neighbors at the given
+    distances (along x for the left and right neighbors, and along y for the top
+    and bottom ones).
+    """
+    offset_x = np.column_stack((spacing[:, 0], np.zeros(len(spacing))))
+    offset_y = np.column_stack((np.zeros(len(spacing)), spacing[:, 1]))
+    positions = np.concatenate(
+        [
+            centers - offset_x,  # Left
+            centers + offset_x,  # Right
+            centers + offset_y,  # Top
+            centers - offset_y,  # Bottom
+        ]
+    )
+    return NeighboringParticles(positions=positions.astype(dtype))
+
+
+def estimate_gradient(
+    centers: ArrayFloat32Nx2,
+    sizes: ArrayFloat32Nx2,
+    ftle: ArrayFloat32N,
+    num_neighbors: int = 8,
+) -> np.ndarray:
+    """
+    Estimates the magnitude of the FTLE gradient of each cell, as the steepest
+    slope to its adjacent cells (of any size), found among its nearest cells.
+
+    Args:
+        centers (ArrayFloat32Nx2): Centers of the cells.
+        sizes (ArrayFloat32Nx2): Widths and heights of the cells.
+        ftle (ArrayFloat32N): FTLE of the cells.
+        num_neighbors (int): Number of nearest cells searched for adjacent ones.
+
+    Returns:
+        np.ndarray: Gradient estimate of each cell, of shape [N] (NaN values, e.g.
+            of particles that left the domain, are ignored).
+    """
+    k = min(num_neighbors + 1, len(centers))
+    if k < 2:
+        return np.zeros(len(centers))
+    distances, neighbors = cKDTree(centers).query(centers, k=k)
+    distances, neighbors = distances[:, 1:], neighbors[:, 1:]  # Skip the cell itself
+
+    half_diagonals = np.hypot(sizes[:, 0], sizes[:, 1]) / 2
+    adjacent = distances <= (half_diagonals[:, None] + half_diagonals[neighbors]) * (
+        1 + 1e-6
+    )
+    with np.errstate(invalid="ignore"):
+        slopes = np.abs(ftle[neighbors] - ftle[:, None]) / distances
+    slopes = np.where(adjacent & np.isfinite(slopes), slopes, 0.0)
+    return slopes.max(axis=1)
+
+
+def refine_ftle(
+    seed_particles: NeighboringParticles,
+    ftle: ArrayFloat32N,
+    advect: Callable[[NeighboringParticles], None],
+    map_period: float,
+    num_levels: int,
+    fraction: float = 0.1,
+) -> QuadtreeFTLE:
+    """
+    Refines the FTLE field of a uniform seeding where the LCS ridges are, by
+    splitting the cells of the seeds with the highest FTLE or FTLE gradient into 4
+    children, level after level, and computing the FTLE of the new seeds only.
+
+    The thresholds are the top `fraction` of the FTLE and of its gradient at the
+    coarse level. At each level, every leaf whose FTLE or gradient (estimated
+    from the current leaves, see `estimate_gradient`) is above its threshold is
+    split (so a uniform field is not refined), and the refinement follows the ridges
+    beyond the cells refined so far.
+    The seeds of a level are advected together, in a single pass over the
+    snapshots, and keep the neighbor spacing of their coarse seed, so all the FTLE
+    values share the same finite-difference resolution.
+
+    Args:
+        seed_particles (NeighboringParticles): Coarse seed particles, at the initial
+            time, on a rectilinear lattice (see `seed_cells`).
+        ftle (ArrayFloat32N): FTLE field of the coarse seed particles.
+        advect (Callable[[NeighboringParticles], None]): Function that advects new
+            seed particles (in place) over the integration period of the field.
+        map_period (float): Integration period of the flow map.
+        num_levels (int): Maximum number of refinement levels.
+        fraction (float): Fraction of the coarse cells above each threshold.
+
+    Returns:
+        QuadtreeFTLE: FTLE field on the cells of the quadtree.
+    """
+    centers, sizes = seed_cells(seed_particles)
+    spacing = (
+        np.column_stack(
+            (
+                seed_particles.initial_delta_right_left[:, 0],
+                seed_particles.initial_delta_top_bottom[:, 1],
+            )
+        )
+        / 2
+    )
+    num_cells = len(centers)
+    levels = np.zeros(num_cells, dtype=np.intp)
+    parents = np.full(num_cells, -1, dtype=np.intp)
+    first_children = np.full(num_cells, -1, dtype=np.intp)
+
+    ftle_threshold = np.nanquantile(ftle, 1 - fraction)
+    gradient_threshold = np.quantile(
+        estimate_gradient(centers, sizes, ftle), 1 - fraction
+    )
+
+    for level in range(1, num_levels + 1):
+        leaves = np.flatnonzero(first_children < 0)
+        gradient = estimate_gradient(centers[leaves], sizes[leaves], ftle[leaves])
+        with np.errstate(invalid="ignore"):
+            selected = (ftle[leaves] > ftle_threshold) | (gradient > gradient_threshold)
+        refined = leaves[selected]
+        if len(refined) == 0:
+            break
+
+        child_centers = (
+            centers[refined, None, :] + CHILD_OFFSETS * sizes[refined, None, :]
+        ).reshape(-1, 2)
+        child_spacing = np.repeat(spacing[refined], 4, axis=0)
+        particles = seed_particles_at(child_centers, child_spacing, ftle.dtype)
+        advect(particles)
+        with telemetry.measure("ftle", len(particles)):
+            child_ftle = compute_ftle_from_particles(particles, map_period)
+
+        first_children[refined] = len(ftle) + 4 * np.arange(len(refined))
+        centers = np.concatenate([centers, child_centers])
+        sizes = np.concatenate([sizes, np.repeat(sizes[refined] / 2, 4, axis=0)])
+        spacing = np.concatenate([spacing, child_spacing])
+        levels = np.concatenate([levels, np.full(4 * len(refined), level)])
+        parents = np.concatenate([parents, np.repeat(refined, 4)])
+        first_children = np.concatenate(
+            [first_children, np.full(4 * len(refined), -1, dtype=np.intp)]
+        )
+        ftle = np.concatenate([ftle, child_ftle])
+
+    return QuadtreeFTLE(centers, sizes, levels, parents, first_children, ftle)
@@ -0,0 +1,100 @@
+from dataclasses import dataclass
+from typing import Any, List
+
+from src.shared_store import SharedSnapshotStore
+from src.telemetry import telemetry
+
+
+@dataclass
+class WorkerContext:
+    """
+    Configuration, input file lists and communication channels of a job, sent once
+    to each pool worker (see `init_worker` in `src.main`), so that tasks only carry
+    the indices of their windows.
+
+    Window `i` spans the snapshots `i, ..., i + num_snapshots_in_window - 1` of the
+    (time-ordered) input lists, which a `backward` window integrates from the last
+    one, so appending snapshots to the lists does not change the index of any
+    window. The grid and particle lists are cycled, so they may hold a single file
+    (fixed grid) or one file per snapshot (moving grid).
+
+    With an analytic velocity field, `snapshot_files` are only labels of the
+    `snapshot_times` at which the field is evaluated (see
+    `AnalyticInterpolatorFactory`), and no velocity nor grid file is read.
+    """
+
+    snapshot_files: List[str]
+    grid_files: List[str]
+    particle_files: List[str]
+    num_snapshots_in_window: int
+    events: Any = None  # Queue of (event, index, telemetry) tuples read by the manager
+    snapshot_store: SharedSnapshotStore | None = None
+    tqdm_position: int = 0
+    snapshot_times: List[float] | None = None  # Analytic velocity field only
+    config: Any = None  # Configuration of the run (see `MyProgramArgs`)
+    backward: bool = False  # Backward-time FTLE (negative `snapshot_timestep`)
+
+    def window_snapshots(self, index: int) -> range:
+        """Returns the positions of the snapshots of a window, in integration order."""
+        if self.backward:
+            return range(index + self.num_snapshots_in_window - 1, index - 1, -1)
+        return range(index, index + self.num_snapshots_in_window)
+
+    def window_files(self, index: int) -> tuple[List[str], List[str], str]:
+        """
+        Returns the snapshot files and grid files of a window, in integration order,
+        and the particle file of its first snapshot.
+        """
+        window = self.window_snapshots(index)
+        return (
+            [self.snapshot_files[k] for k in window],
+            [self.grid_files[k % len(self.grid_files)] for k in window],
+            self.particle_files[window[0] % len(self.particle_files)],
+        )
+
+    def input_files(self, index: int) -> List[str]:
+        """
+        Returns the files read by a window, whose fingerprints identify its inputs
+        (see `window_digest`). Analytic velocity fields only read the particle file.
+        """
+        snapshot_files, grid_files, particle_file = self.window_files(index)
+        if self.snapshot_times is not None:
+            return [particle_file]
+        return [*snapshot_files, *grid_files, particle_file]
+
+    def notify_completed(self, index: int) -> None:
+        """
+        Notifies the manager that the FTLE of a window was saved, along with the
+        telemetry gathered since the last notification.
+        """
+        if self.events is not None:
+            self.events.put(("completed", index, telemetry.collect()))
+
+    def notify_finished(self, block: range) -> None:
+        """Notifies the manager that a task finished its block of windows."""
+        if self.events is not None:
+            self.events.put(("finished", block.start, telemetry.collect()))
+
+
+def contiguous_blocks(indices: List[int], max_block_size: int) -> List[range]:
+    """
+    Groups the sorted window indices into blocks of consecutive windows, with at
+    most `max_block_size` windows each. Consecutive windows share most of their
+    snapshots, so a worker computing a whole block reuses its caches (decoded
+    files, geometries and the OS page cache) from one window to the next.
+
+    Args:
+        indices (List[int]): Sorted indices of the windows to be computed.
+        max_block_size (int): Maximum number of windows of a block.
+
+    Returns:
+        List[range]: The blocks, in order.
+    """
+    blocks = []
+    for i in indices:
+        last = blocks[-1] if blocks else None
+        if last is not None and last.stop == i and len(last) < max_block_size:
+            blocks[-1] = range(last.start, i + 1)
+        else:
+            blocks.append(range(i, i + 1))
+    return blocks
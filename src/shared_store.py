@@ -0,0 +1,150 @@
+import time
+import weakref
+from multiprocessing import shared_memory
+from typing import Callable, Hashable
+
+import numpy as np
+
+
+class SharedSnapshotStore:
+    """
+    Node-level store of decoded snapshot arrays, shared by all the workers of a
+    multiprocessing pool through `multiprocessing.shared_memory`.
+
+    The first worker that needs an array decodes it and copies it into a shared
+    memory block; every other worker maps the same block (read-only) instead of
+    reading and decoding the file again. Blocks are reference counted: a block in
+    use by any worker is never released, whereas unused blocks are kept (as a
+    cache) until their total size exceeds `max_cached_bytes`, when the least
+    recently used ones are unlinked.
+
+    The store only holds picklable handles (the registry and lock proxies of a
+    `multiprocessing.Manager`), so it can be passed to the workers.
+
+    Parameters
+    ----------
+    registry : dict
+        Shared dictionary (e.g. `Manager().dict()`) mapping each key to the
+        (block name, shape, dtype, reference count, last use) of its array.
+    lock : Lock
+        Shared lock (e.g. `Manager().Lock()`) guarding the registry.
+    max_cached_bytes : int
+        Maximum total size of the blocks kept when no worker uses them.
+    """
+
+    def __init__(self, registry, lock, max_cached_bytes: int):
+        self.registry = registry
+        self.lock = lock
+        self.max_cached_bytes = max_cached_bytes
+
+    def __getstate__(self):
+        return self.registry, self.lock, self.max_cached_bytes
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    def get(self, key: Hashable, load: Callable[[], np.ndarray]) -> np.ndarray:
+        """
+        Returns a read-only array backed by shared memory, decoding it with `load`
+        only if no worker did it before. The reference held by the calling worker
+        is released once the returned array (and every view of it) is garbage
+        collected.
+
+        Args:
+            key (Hashable): Unique key of the array (e.g. the file path and the
+                kind of data read from it).
+            load (Callable[[], np.ndarray]): Function that decodes the array.
+
+        Returns:
+            np.ndarray: Read-only array in shared memory.
+        """
+        with self.lock:
+            entry = self._acquire(key)
+
+        if entry is None:
+            # Decode outside the lock, so that other workers are not blocked. If
+            # another worker publishes the same array meanwhile, ours is dropped
+            array = np.ascontiguousarray(load())
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            np.ndarray(array.shape, array.dtype, buffer=block.buf)[...] = array
+
+            with self.lock:
+                entry = self._acquire(key)
+                if entry is None:
+                    entry = (block.name, array.shape, array.dtype.str)
+                    self.registry[key] = (*entry, 1, time.monotonic_ns())
+                    self._evict()
+
+            if entry[0] != block.name:
+                block.close()
+                block.unlink()
+            else:
+                return self._as_array(key, block, entry)
+
+        return self._as_array(key, _attach(entry[0]), entry)
+
+    def clear(self) -> None:
+        """Unlinks every block (to be called once all the workers are done)."""
+        with self.lock:
+            for name, *_ in self.registry.values():
+                _unlink(name)
+            self.registry.clear()
+
+    def _acquire(self, key: Hashable):
+        """Increments the reference count of `key`, if stored (lock must be held)."""
+        if key not in self.registry:
+            return None
+        name, shape, dtype, references, _ = self.registry[key]
+        self.registry[key] = (name, shape, dtype, references + 1, time.monotonic_ns())
+        return name, shape, dtype
+
+    def _release(self, key: Hashable, block: shared_memory.SharedMemory) -> None:
+        block.close()
+        with self.lock:
+            if key in self.registry:
+                name, shape, dtype, references, last_use = self.registry[key]
+                self.registry[key] = (name, shape, dtype, references - 1, last_use)
+                self._evict()
+
+    def _evict(self) -> None:
+        """Unlinks the least recently used unreferenced blocks over the budget."""
+        # Last uses are read from the monotonic clock of the node, which (unlike a
+        # process-local counter) orders the uses of all the workers
+        unused = [
+            (last_use, key, name, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+            for key, (name, shape, dtype, references, last_use) in self.registry.items()
+            if references == 0
+        ]
+        unused.sort(key=lambda block: block[0])  # Keys may not be comparable
+        cached_bytes = sum(nbytes for *_, nbytes in unused)
+        for _, key, name, nbytes in unused:
+            if cached_bytes <= self.max_cached_bytes:
+                break
+            _unlink(name)
+            del self.registry[key]
+            cached_bytes -= nbytes
+
+    def _as_array(self, key: Hashable, block: shared_memory.SharedMemory, entry):
+        _, shape, dtype = entry
+        array = np.ndarray(shape, dtype, buffer=block.buf)
+        array.flags.writeable = False
+        release = weakref.finalize(array, self._release, key, block)
+        release.atexit = False  # The registry may be gone; `clear` unlinks anyway
+        return array
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Maps an existing block, without making this process responsible for it."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:  # Python < 3.13 always tracks (and warns about) the block
+        return shared_memory.SharedMemory(name=name)
+
+
+def _unlink(name: str) -> None:
+    try:
+        block = _attach(name)
+    except FileNotFoundError:
+        return
+    block.close()
+    block.unlink()
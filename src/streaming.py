@@ -0,0 +1,132 @@
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+
+import numpy as np
+from numpy.typing import DTypeLike
+
+from src.ftle import compute_ftle_from_particles
+from src.interpolate import build_geometry, build_interpolator
+from src.my_types import ArrayFloat32N
+from src.particles import NeighboringParticles
+from src.sweep import SweepEngine
+from src.telemetry import telemetry
+
+
+@dataclass
+class FTLEWindow:
+    """FTLE field of a sliding window, yielded by `stream_ftle`."""
+
+    index: int  # Index of the first snapshot of the window in the stream
+    time: float  # Time of the first snapshot of the window
+    ftle: ArrayFloat32N  # FTLE of each seed particle, of shape [N]
+
+
+def _copy_arrays(arrays, dtype: DTypeLike = None):
+    """Copies an array, or a tuple of arrays (the layout of the "grid" strategies)."""
+    if isinstance(arrays, tuple):
+        return tuple(np.array(array, dtype=dtype) for array in arrays)
+    return np.array(arrays, dtype=dtype)
+
+
+def _same_coordinates(coordinates, other_coordinates) -> bool:
+    if isinstance(coordinates, tuple) != isinstance(other_coordinates, tuple):
+        return False
+    if isinstance(coordinates, tuple):
+        return len(coordinates) == len(other_coordinates) and all(
+            np.array_equal(a, b) for a, b in zip(coordinates, other_coordinates)
+        )
+    return np.array_equal(coordinates, other_coordinates)
+
+
+def stream_ftle(
+    snapshots: Iterable[tuple],
+    seed_particles: NeighboringParticles,
+    flow_map_period: float,
+    integrator: str = "euler",
+    interpolator: str = "cubic",
+    precision: DTypeLike = np.float64,
+) -> Iterator[FTLEWindow]:
+    """
+    Computes the FTLE fields of the sliding windows of a stream of in-memory
+    snapshots (e.g. handed over by a running solver), yielding each field as soon
+    as its window completes, without any file I/O.
+
+    A window starts at every snapshot and spans `flow_map_period`. All the windows
+    in flight are advanced together (see `SweepEngine`), each step taking the
+    velocity of a snapshot up to the time of the next one, so a snapshot is only
+    used (and its interpolator only held) until the next one arrives. Memory is
+    thus bounded by the particles of the windows in flight. The geometry of the
+    grid is reused as long as the coordinates do not change.
+
+    Args:
+        snapshots (Iterable[tuple]): (coordinates, velocities, time) of each
+            snapshot, in the layout of `build_interpolator` (arrays of shape
+            [n_points, 2], or tuples of [M, N] arrays for the "grid" strategies).
+            Snapshots must be equally spaced in time, which increases for the
+            forward-time FTLE and decreases for the backward-time FTLE. The arrays
+            are copied, so the caller may reuse them for the next snapshot.
+        seed_particles (NeighboringParticles): Seed particles of every window
+            (e.g. read by `read_seed_particles_coordinates`).
+        flow_map_period (float): Integration period of each window. As in the
+            command line, a window spans the `int(flow_map_period / |dt|) + 1`
+            snapshots from its own, and its FTLE is that of the period from its
+            first to its last snapshot.
+        integrator (str): Time-stepping method ("rk4", "euler", "ab2").
+        interpolator (str): Interpolation strategy ("cubic", "linear", "nearest",
+            "grid", "grid_cubic").
+        precision (DTypeLike): Floating-point precision of the velocities, particle
+            positions and FTLE fields.
+
+    Yields:
+        FTLEWindow: FTLE field of each window, in order. Windows still in flight
+            when the stream ends are dropped.
+    """
+    engine = None
+    timestep = map_period = None
+    grid_coordinates = geometry = None
+    previous = None  # Interpolator and time of the last snapshot
+    window_times = {}  # Start time of the windows in flight
+
+    for index, (coordinates, velocities, time) in enumerate(snapshots):
+        if previous is not None:
+            previous_interpolator, previous_time = previous
+            h = time - previous_time
+            if engine is None:
+                if h == 0:
+                    raise ValueError("Consecutive snapshots have the same time.")
+                timestep = h
+                # Windows as in the command line: each of their snapshots drives a
+                # step, and the FTLE period spans the first to the last snapshot
+                num_snapshots_in_window = int(flow_map_period / abs(timestep)) + 1
+                if num_snapshots_in_window < 2:
+                    raise ValueError(
+                        "The flow map period must span at least one snapshot "
+                        f"interval, got {flow_map_period:g} for a timestep of "
+                        f"{timestep:g}."
+                    )
+                map_period = (num_snapshots_in_window - 1) * abs(timestep)
+                engine = SweepEngine(num_snapshots_in_window, integrator, precision)
+            elif not np.isclose(h, timestep, rtol=1e-6, atol=0.0):
+                raise ValueError(
+                    "Snapshots must be equally spaced in time: expected a timestep "
+                    f"of {timestep:g}, got {h:g} at snapshot {index}."
+                )
+
+            # The window of the last snapshot starts with the step it drives
+            engine.start_window(index - 1, seed_particles)
+            window_times[index - 1] = previous_time
+            for window in engine.step(h, previous_interpolator):
+                with telemetry.measure("ftle", len(window.particles)):
+                    ftle = compute_ftle_from_particles(window.particles, map_period)
+                yield FTLEWindow(window.index, window_times.pop(window.index), ftle)
+
+        with telemetry.measure("build"):
+            if geometry is None or not _same_coordinates(coordinates, grid_coordinates):
+                grid_coordinates = _copy_arrays(coordinates)
+                geometry = build_geometry(grid_coordinates, interpolator)
+            previous = (
+                build_interpolator(
+                    geometry, _copy_arrays(velocities, precision), interpolator
+                ),
+                time,
+            )
@@ -0,0 +1,129 @@
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+from numpy.typing import DTypeLike
+
+from src.integrate import get_integrator
+from src.interpolate import InterpolationStrategy
+from src.particles import NeighboringParticles, ParticleBatch
+from src.telemetry import telemetry
+
+
+@dataclass
+class ActiveWindow:
+    """A sliding FTLE window being advanced by the `SweepEngine`."""
+
+    index: int
+    particles: NeighboringParticles
+    num_remaining_steps: int
+
+
+class SweepEngine:
+    """
+    Advances every sliding FTLE window together in a single pass over the snapshots.
+
+    Instead of integrating each window from scratch (which builds the interpolator
+    of every snapshot once per window), the engine walks the snapshots in order.
+    At each snapshot, the interpolator is built once and evaluated on the
+    concatenated positions of all active windows:
+
+    1. A new window is started from its seed particles (if any);
+    2. All active windows take one integration step;
+    3. The oldest window is returned once it has covered its whole period.
+
+    For N snapshots and windows of W snapshots, this turns O(N*W) interpolator
+    builds into O(N).
+
+    Parameters
+    ----------
+    num_snapshots_in_window : int
+        Number of snapshots (integration steps) covered by each window.
+    integrator_name : str
+        Name of the time-stepping method (see `get_integrator`).
+    dtype : DTypeLike
+        Floating-point precision of the particle positions.
+    """
+
+    def __init__(
+        self,
+        num_snapshots_in_window: int,
+        integrator_name: str,
+        dtype: DTypeLike = np.float64,
+    ):
+        self.num_snapshots_in_window = num_snapshots_in_window
+        self.integrator = get_integrator(integrator_name)
+        self.dtype = dtype
+        self.windows: deque[ActiveWindow] = deque()
+
+    def __len__(self) -> int:
+        """Returns the number of active windows."""
+        return len(self.windows)
+
+    def start_window(self, index: int, seed_particles: NeighboringParticles) -> None:
+        """Starts a new window from a private copy of the seed particles."""
+        particles = NeighboringParticles(
+            positions=seed_particles.positions.astype(self.dtype)
+        )
+        self.windows.append(
+            ActiveWindow(index, particles, self.num_snapshots_in_window)
+        )
+        self._align_integrator_history(0, particles.positions.shape[0])
+
+    def step(self, h: float, interpolator: InterpolationStrategy) -> list[ActiveWindow]:
+        """
+        Advances all active windows by one integration step using the interpolator
+        of the current snapshot.
+
+        Args:
+            h (float): Step size for integration.
+            interpolator (InterpolationStrategy): Interpolator of the current
+                snapshot.
+
+        Returns:
+            list[ActiveWindow]: Windows that completed their period at this step.
+        """
+        if not self.windows:
+            return []
+
+        batch = ParticleBatch(
+            np.concatenate([window.particles.positions for window in self.windows]),
+            np.concatenate([window.particles.simplex_hint for window in self.windows]),
+        )
+        with telemetry.measure("integrate", len(batch.positions)):
+            self.integrator.integrate(h, batch, interpolator)
+
+        offset = 0
+        for window in self.windows:
+            rows = slice(offset, offset + window.particles.positions.shape[0])
+            window.particles.positions[:] = batch.positions[rows]
+            window.particles.simplex_hint[:] = batch.simplex_hint[rows]
+            window.num_remaining_steps -= 1
+            offset = rows.stop
+
+        finished = []
+        while self.windows and self.windows[0].num_remaining_steps == 0:
+            finished.append(self.windows.popleft())
+
+        num_dropped_rows = sum(w.particles.positions.shape[0] for w in finished)
+        self._align_integrator_history(num_dropped_rows, 0)
+
+        return finished
+
+    def _align_integrator_history(self, num_dropped: int, num_added: int) -> None:
+        """
+        Keeps the history of multistep integrators (the previous velocity of AB2)
+        aligned with the rows of the concatenated batch. Windows leave the front of
+        the batch and join at its end; rows of new windows are filled with NaN,
+        which the integrator treats as "no history yet".
+        """
+        history = getattr(self.integrator, "previous_velocity", None)
+        if history is None:
+            return
+
+        history = history[num_dropped:]
+        if num_added:
+            history = np.concatenate(
+                [history, np.full((num_added, history.shape[1]), np.nan)]
+            )
+        self.integrator.previous_velocity = history
@@ -0,0 +1,206 @@
+"""
+Scalable synthetic dataset of the double-gyre flow, for benchmarks and tests.
+
+The velocity is evaluated for all the nodes of a batch of snapshots at once, so
+large datasets (fine grids, many snapshots) are written at the speed of the disk.
+Fields are stored as [ny, nx] arrays, so the dataset can be used with all the
+interpolators, including the structured `grid` ones.
+
+Usage:
+    python -m src.synthetic --output_dir inputs/synthetic --nx 200 --ny 100 \
+        --nt 101 --num_particles 10000
+"""
+
+import argparse
+import functools
+import inspect
+import os
+from typing import Callable
+
+import numpy as np
+from scipy.io import savemat
+
+from src.file_utils import write_list_to_txt
+from src.my_types import ArrayFloat32N
+
+DOMAIN = ((0.0, 2.0), (0.0, 1.0))  # (x_min, x_max), (y_min, y_max)
+
+
+def double_gyre_velocity(
+    x: ArrayFloat32N,
+    y: ArrayFloat32N,
+    t: float | np.ndarray,
+    amplitude: float = 0.1,
+    epsilon: float = 0.25,
+    omega: float = 2 * np.pi / 10,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Evaluates the double-gyre velocity field, broadcasting `x`, `y` and `t` (e.g.
+    `t[:, None, None]` with [ny, nx] grids gives the fields of all snapshots).
+
+    Args:
+        x (ArrayFloat32N): x-coordinates.
+        y (ArrayFloat32N): y-coordinates.
+        t (float | np.ndarray): Time(s).
+        amplitude (float): Amplitude of the flow.
+        epsilon (float): Perturbation strength.
+        omega (float): Frequency of oscillation.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Velocity components (u, v).
+    """
+    a = epsilon * np.sin(omega * t)
+    b = 1 - 2 * a
+    f = (a * x + b) * x
+    df_dx = 2 * a * x + b
+
+    u = -np.pi * amplitude * np.sin(np.pi * f) * np.cos(np.pi * y)
+    v = np.pi * amplitude * np.cos(np.pi * f) * np.sin(np.pi * y) * df_dx
+    return u, v
+
+
+ANALYTIC_VELOCITY_FIELDS = {"double_gyre": double_gyre_velocity}
+
+
+def get_velocity_field(name: str, parameters: dict | None = None) -> Callable:
+    """
+    Returns the vectorized analytic velocity field `u, v = velocity(x, y, t)` of the
+    given name, with its parameters (e.g. `epsilon` of the double gyre) fixed.
+
+    Args:
+        name (str): Name of the field (see `ANALYTIC_VELOCITY_FIELDS`).
+        parameters (dict, optional): Keyword arguments of the field.
+
+    Returns:
+        Callable: The velocity field.
+    """
+    if name not in ANALYTIC_VELOCITY_FIELDS:
+        raise ValueError(
+            f"Invalid velocity field name '{name}'. "
+            f"Choose from {list(ANALYTIC_VELOCITY_FIELDS.keys())}."
+        )
+    velocity = ANALYTIC_VELOCITY_FIELDS[name]
+    parameters = parameters or {}
+    unknown = set(parameters) - set(inspect.signature(velocity).parameters)
+    if unknown:
+        raise ValueError(f"Unknown parameters of '{name}': {sorted(unknown)}.")
+    return functools.partial(velocity, **parameters)
+
+
+def neighboring_seed_particles(
+    num_particles: int, spacing: float = 0.0025, margin: float = 0.05
+) -> dict[str, np.ndarray]:
+    """
+    Returns about `num_particles` seed particles evenly spread over the domain,
+    each with its four neighbors (`top`, `bottom`, `left` and `right`), in the
+    layout of the particle files.
+
+    Args:
+        num_particles (int): Approximate number of seed particles.
+        spacing (float): Distance between a particle and its neighbors.
+        margin (float): Distance kept from the domain boundaries.
+
+    Returns:
+        dict[str, np.ndarray]: Neighbor positions, of shape [N, 2] each.
+    """
+    (x_min, x_max), (y_min, y_max) = DOMAIN
+    aspect_ratio = (x_max - x_min) / (y_max - y_min)
+    num_x = max(1, round(np.sqrt(num_particles * aspect_ratio)))
+    num_y = max(1, round(num_particles / num_x))
+
+    central_x, central_y = np.meshgrid(
+        np.linspace(x_min + margin, x_max - margin, num_x),
+        np.linspace(y_min + margin, y_max - margin, num_y),
+    )
+    centers = np.column_stack((central_x.ravel(), central_y.ravel()))
+    return {
+        "top": centers + [0, spacing],
+        "bottom": centers - [0, spacing],
+        "left": centers - [spacing, 0],
+        "right": centers + [spacing, 0],
+    }
+
+
+def write_double_gyre_dataset(
+    output_dir: str,
+    nx: int = 100,
+    ny: int = 50,
+    nt: int = 501,
+    timestep: float = 0.01,
+    num_particles: int = 100,
+    batch_size: int = 64,
+) -> dict[str, str]:
+    """
+    Writes the snapshot, grid and particle files of a double-gyre dataset, and the
+    text files listing them.
+
+    Args:
+        output_dir (str): Directory of the dataset.
+        nx (int): Number of grid nodes in the x-direction.
+        ny (int): Number of grid nodes in the y-direction.
+        nt (int): Number of snapshots.
+        timestep (float): Time between snapshots.
+        num_particles (int): Approximate number of seed particles.
+        batch_size (int): Number of snapshots evaluated at once (bounds memory).
+
+    Returns:
+        dict[str, str]: Paths to the lists of velocity, grid and particle files
+            (keys `velocity`, `grid` and `particle`).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    (x_min, x_max), (y_min, y_max) = DOMAIN
+    x, y = np.meshgrid(np.linspace(x_min, x_max, nx), np.linspace(y_min, y_max, ny))
+
+    grid_file = os.path.join(output_dir, "grid.mat")
+    savemat(grid_file, {"coordinate_x": x, "coordinate_y": y})
+    particle_file = os.path.join(output_dir, "particles.mat")
+    savemat(particle_file, neighboring_seed_particles(num_particles))
+
+    velocity_files = []
+    for start in range(0, nt, batch_size):
+        times = np.arange(start, min(start + batch_size, nt)) * timestep
+        u, v = double_gyre_velocity(x, y, times[:, None, None])
+        for k in range(len(times)):
+            velocity_file = os.path.join(output_dir, f"velocities{start + k:04d}.mat")
+            savemat(velocity_file, {"velocity_x": u[k], "velocity_y": v[k]})
+            velocity_files.append(velocity_file)
+
+    lists = {
+        "velocity": (velocity_files, "inputs_velocity.txt"),
+        "grid": ([grid_file], "inputs_grid.txt"),
+        "particle": ([particle_file], "inputs_particle.txt"),
+    }
+    list_files = {}
+    for name, (files, list_name) in lists.items():
+        list_files[name] = os.path.join(output_dir, list_name)
+        write_list_to_txt(files, list_files[name])
+    return list_files
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Writes a synthetic double-gyre dataset of any size."
+    )
+    parser.add_argument("--output_dir", type=str, required=True)
+    parser.add_argument("--nx", type=int, default=100)
+    parser.add_argument("--ny", type=int, default=50)
+    parser.add_argument("--nt", type=int, default=501)
+    parser.add_argument("--timestep", type=float, default=0.01)
+    parser.add_argument("--num_particles", type=int, default=100)
+    args = parser.parse_args()
+
+    list_files = write_double_gyre_dataset(
+        args.output_dir,
+        args.nx,
+        args.ny,
+        args.nt,
+        args.timestep,
+        args.num_particles,
+    )
+    print(f"Dataset saved to: {args.output_dir} (timestep {args.timestep})")
+    for name, list_file in list_files.items():
+        print(f"List of {name} files saved to: {list_file}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+import contextlib
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+from src.memory import current_rss, peak_rss
+
+# Stages of the pipeline, in the order they are reported
+STAGES = ["read", "build", "interpolate", "integrate", "ftle", "write"]
+
+
+class Telemetry:
+    """
+    Per-stage counters of a process: number of calls, time spent and number of
+    items processed (e.g. particles) by each stage of the pipeline.
+
+    Times are exclusive: the time spent in a stage measured within another one
+    (e.g. `interpolate` within `integrate`) is only counted in the inner stage, so
+    that the times of all stages add up to the measured time. Stages may be
+    measured concurrently by several threads (e.g. the prefetch and writer threads).
+
+    If `trace` is enabled, the start and end of each measured stage, and of the
+    spans enclosing them (e.g. windows), are also recorded as events of the Chrome
+    trace-event format (see `save_trace`), on a timeline shared by all the
+    processes of a node.
+
+    If `track_memory` is enabled, each stage also records the largest resident set
+    size (RSS) of the process at the end of its calls and, if `tracemalloc` is
+    tracing, its peak traced memory above the level at its start (i.e. the memory
+    it temporarily needs). Peaks of stages measured concurrently by other threads
+    may be underestimated, since `tracemalloc` keeps a single peak per process.
+
+    Parameters
+    ----------
+    trace : bool
+        Whether to record trace events.
+    track_memory : bool
+        Whether to record the memory usage of each stage.
+    """
+
+    def __init__(self, trace: bool = False, track_memory: bool = False):
+        self.trace = trace
+        self.track_memory = track_memory
+        self.stages = {}  # stage -> [calls, seconds, items]
+        self.memory = {}  # stage -> [peak RSS, peak traced memory] (bytes)
+        self.processes = {}  # process name -> memory usage (see `sample_memory`)
+        self.peak_traced = 0  # Peak traced memory before the last peak reset
+        self.events = []  # Trace events
+        self.lock = threading.Lock()
+        self.local = threading.local()  # Stack of the stages being measured
+
+    @contextlib.contextmanager
+    def measure(self, stage: str, items: int = 0):
+        """
+        Measures the time spent in the enclosed block.
+
+        Args:
+            stage (str): Name of the stage.
+            items (int): Number of items processed by the block.
+        """
+        stack = self.local.__dict__.setdefault("stack", [])
+        # Time spent in nested stages, and traced memory at the start and its peak
+        entry = [0.0, 0, 0]
+        track_traced = self.track_memory and tracemalloc.is_tracing()
+        if track_traced:
+            current, peak = tracemalloc.get_traced_memory()
+            for parent in stack:  # The peak is reset for this stage
+                parent[2] = max(parent[2], peak)
+            self.peak_traced = max(self.peak_traced, peak)
+            tracemalloc.reset_peak()
+            entry[1:] = current, current
+        stack.append(entry)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            if stack:
+                stack[-1][0] += elapsed
+            self.record(stage, elapsed - entry[0], items)
+            if self.track_memory:
+                if track_traced:
+                    entry[2] = max(entry[2], tracemalloc.get_traced_memory()[1])
+                    for parent in stack:
+                        parent[2] = max(parent[2], entry[2])
+                self._record_memory(stage, current_rss(), entry[2] - entry[1])
+            if self.trace:
+                self._add_event(stage, "stage", start, elapsed, {"items": items})
+
+    @contextlib.contextmanager
+    def span(self, name: str, **event_args):
+        """
+        Traces the enclosed block (e.g. the computation of a window), without
+        counting it as a stage. Does nothing if `trace` is disabled.
+
+        Args:
+            name (str): Name of the span.
+            **event_args: Arguments shown with the event (e.g. the window index).
+        """
+        if not self.trace:
+            yield
+            return
+
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self._add_event(name, "span", start, elapsed, event_args)
+
+    def _add_event(
+        self, name: str, category: str, start: float, duration: float, event_args
+    ) -> None:
+        # The monotonic clock is shared by all the processes of a node
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",  # Complete event
+            "ts": start * 1e6,
+            "dur": duration * 1e6,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+            "args": event_args,
+        }
+        with self.lock:
+            self.events.append(event)
+
+    def name_process(self, name: str) -> None:
+        """Names the current process on the timeline (e.g. "worker 1")."""
+        if self.trace:
+            event = {
+                "name": "process_name",
+                "ph": "M",  # Metadata event
+                "pid": os.getpid(),
+                "args": {"name": name},
+            }
+            with self.lock:
+                self.events.append(event)
+
+    def record(self, stage: str, seconds: float, items: int = 0, calls: int = 1):
+        with self.lock:
+            counters = self.stages.setdefault(stage, [0, 0.0, 0])
+            counters[0] += calls
+            counters[1] += seconds
+            counters[2] += items
+
+    def _record_memory(self, stage: str, rss: int, traced: int) -> None:
+        with self.lock:
+            peaks = self.memory.setdefault(stage, [0, 0])
+            peaks[0] = max(peaks[0], rss)
+            peaks[1] = max(peaks[1], traced)
+
+    def sample_memory(self, process: str, cached_nbytes: dict[str, int]) -> None:
+        """
+        Records the memory usage of the current process: its current and peak RSS,
+        its peak traced memory (if `tracemalloc` is tracing) and the estimated
+        bytes held by its caches (the largest sample of each is kept).
+
+        Args:
+            process (str): Name of the process (e.g. "worker 1").
+            cached_nbytes (dict[str, int]): Estimated bytes held by each cache (or
+                by other large objects, e.g. the particles in flight).
+        """
+        rss = current_rss()
+        usage = {
+            "pid": os.getpid(),
+            "rss_bytes": rss,
+            "peak_rss_bytes": max(rss, peak_rss()),
+            "peak_traced_bytes": self._peak_traced(),
+            "cached_bytes": cached_nbytes,
+        }
+        with self.lock:
+            self.processes[process] = _max_merge(self.processes.get(process), usage)
+
+    def _peak_traced(self) -> int:
+        """Returns the peak traced memory of the process, despite peak resets."""
+        if not tracemalloc.is_tracing():
+            return 0
+        return max(self.peak_traced, tracemalloc.get_traced_memory()[1])
+
+    def merge(self, collected: dict) -> None:
+        """
+        Adds the counters, memory usage and trace events of another process (as
+        returned by `collect`).
+        """
+        for stage, (calls, seconds, items) in collected["stages"].items():
+            self.record(stage, seconds, items, calls)
+        for stage, (rss, traced) in collected["memory"].items():
+            self._record_memory(stage, rss, traced)
+        with self.lock:
+            for process, usage in collected["processes"].items():
+                self.processes[process] = _max_merge(self.processes.get(process), usage)
+            self.events.extend(collected["events"])
+
+    def collect(self) -> dict:
+        """
+        Returns the counters, memory usage and trace events gathered since the
+        last call, and resets them.
+        """
+        with self.lock:
+            collected = {
+                "stages": self.stages,
+                "memory": self.memory,
+                "processes": self.processes,
+                "events": self.events,
+            }
+            self.stages, self.memory, self.processes, self.events = {}, {}, {}, []
+        return collected
+
+    def items(self, stage: str) -> int:
+        """Returns the number of items processed by a stage."""
+        with self.lock:
+            return self.stages.get(stage, [0, 0.0, 0])[2]
+
+    def summary(self, wall_time: float) -> dict:
+        """
+        Returns the counters of each stage, with their throughput and share of the
+        measured time, and the overall throughput in particle-steps per second.
+        If memory was tracked, also returns the memory peaks of each stage, the
+        memory usage of each process and their total peak RSS (an estimate of the
+        memory needed by the job on a node).
+
+        Args:
+            wall_time (float): Elapsed (wall-clock) time of the job, in seconds.
+
+        Returns:
+            dict: JSON-serializable summary.
+        """
+        with self.lock:
+            stages = dict(self.stages)
+            memory = dict(self.memory)
+            processes = dict(self.processes)
+        order = {stage: k for k, stage in enumerate(STAGES)}
+        total_seconds = sum(seconds for _, seconds, _ in stages.values())
+
+        summary = {}
+        for stage in sorted(stages, key=lambda s: order.get(s, len(order))):
+            calls, seconds, items = stages[stage]
+            summary[stage] = {
+                "calls": calls,
+                "seconds": seconds,
+                "items": items,
+                "items_per_second": items / seconds if items and seconds else None,
+                "time_fraction": seconds / total_seconds if total_seconds else None,
+            }
+            if stage in memory:
+                summary[stage]["peak_rss_bytes"] = memory[stage][0]
+                summary[stage]["peak_traced_bytes"] = memory[stage][1]
+
+        particle_steps = stages.get("integrate", [0, 0.0, 0])[2]
+        summary = {
+            "wall_time": wall_time,
+            "particle_steps": particle_steps,
+            "particle_steps_per_second": (
+                particle_steps / wall_time if wall_time > 0 else None
+            ),
+            "stages": summary,
+        }
+        if processes:
+            summary["processes"] = processes
+            summary["total_peak_rss_bytes"] = sum(
+                usage["peak_rss_bytes"] for usage in processes.values()
+            )
+        return summary
+
+    def save_trace(self, path: str) -> None:
+        """
+        Saves the trace events to a JSON file, which can be opened in
+        `chrome://tracing` or https://ui.perfetto.dev.
+        """
+        with self.lock:
+            trace = {"traceEvents": self.events, "displayTimeUnit": "ms"}
+            with open(path, "w") as f:
+                json.dump(trace, f)
+
+
+def _max_merge(old: dict | None, new: dict) -> dict:
+    """Merges two memory usage samples of a process, keeping the largest values."""
+    if old is None:
+        return new
+    merged = {
+        key: value if key == "pid" else max(value, old.get(key, 0))
+        for key, value in new.items()
+        if key != "cached_bytes"
+    }
+    cached = dict(old["cached_bytes"])
+    for cache, nbytes in new["cached_bytes"].items():
+        cached[cache] = max(nbytes, cached.get(cache, 0))
+    merged["cached_bytes"] = cached
+    return merged
+
+
+# Counters of the current process, reported to the manager by the pool workers
+telemetry = Telemetry()
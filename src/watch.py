@@ -0,0 +1,95 @@
+import os
+import time
+from typing import Iterator
+
+from src.checkpoint import file_fingerprint
+from src.file_utils import find_files_with_pattern, get_files_list
+
+
+class SnapshotWatcher:
+    """
+    Follows the velocity files written by a running simulation, either listed in a
+    growing list file or found in a directory (see `find_files_with_pattern`), and
+    returns the new ones, in order, once they are completely written.
+
+    A file is considered complete once its fingerprint (size and modification
+    time) did not change between two consecutive polls, so files being written
+    are never read. Files are returned in the order of the list (sorted by name,
+    for a directory), and never before the files preceding them.
+
+    Parameters
+    ----------
+    list_file : str, optional
+        Text file listing the velocity files (see `get_files_list`), to which the
+        simulation appends the new snapshots.
+    directory : str, optional
+        Directory searched (recursively) for the velocity files, used instead of
+        the `list_file`.
+    pattern : str
+        Pattern matched by the names of the velocity files in the `directory`.
+    poll_interval : float
+        Time (in seconds) between polls.
+    timeout : float, optional
+        Time (in seconds) without new files after which the iteration stops. If
+        None, files are followed until interrupted.
+    """
+
+    def __init__(
+        self,
+        list_file: str | None = None,
+        directory: str | None = None,
+        pattern: str = ".mat",
+        poll_interval: float = 1.0,
+        timeout: float | None = None,
+    ):
+        if (list_file is None) == (directory is None):
+            raise ValueError("Either a list file or a directory must be watched.")
+        self.list_file = list_file
+        self.directory = directory
+        self.pattern = pattern
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.num_returned = 0
+        self.fingerprints = {}  # Fingerprint of the pending files at the last poll
+
+    def _list_files(self) -> list[str]:
+        if self.directory is not None:
+            return find_files_with_pattern(self.directory, self.pattern)
+        if not os.path.exists(self.list_file):
+            return []
+        return get_files_list(self.list_file)
+
+    def poll(self) -> list[str]:
+        """Returns the files completely written since the last poll, in order."""
+        ready = []
+        blocked = False  # A preceding file is not complete yet
+        fingerprints = {}
+        for path in self._list_files()[self.num_returned :]:
+            try:
+                fingerprints[path] = file_fingerprint(path)
+            except FileNotFoundError:
+                break  # Listed before being written
+            # New or still being written files are checked again at the next poll
+            blocked = blocked or self.fingerprints.get(path) != fingerprints[path]
+            if not blocked:
+                ready.append(path)
+                del fingerprints[path]
+
+        self.fingerprints = fingerprints
+        self.num_returned += len(ready)
+        return ready
+
+    def __iter__(self) -> Iterator[str]:
+        """Yields the new files as they are completed, until the `timeout`."""
+        last_arrival = time.monotonic()
+        while True:
+            ready = self.poll()
+            yield from ready
+            if ready:
+                last_arrival = time.monotonic()
+                continue
+            if self.timeout is not None and (
+                time.monotonic() - last_arrival > self.timeout
+            ):
+                return
+            time.sleep(self.poll_interval)
@@ -0,0 +1,34 @@
+import pytest
+
+from benchmarks.run_benchmarks import compare_to_baseline, run_kernel_case
+
+
+def test_compare_to_baseline():
+    baseline = [
+        {"name": "kernel/a", "throughput": 100.0},
+        {"name": "kernel/b", "throughput": 100.0},
+        {"name": "kernel/removed", "throughput": 100.0},
+    ]
+    results = [
+        {"name": "kernel/a", "throughput": 95.0},
+        {"name": "kernel/b", "throughput": 80.0},
+        {"name": "kernel/new", "throughput": 10.0},
+    ]
+
+    comparison = compare_to_baseline(results, baseline, tolerance=0.1)
+    assert [case["name"] for case in comparison] == ["kernel/a", "kernel/b"]
+    assert comparison[0]["ratio"] == pytest.approx(0.95)
+    assert [case["regressed"] for case in comparison] == [False, True]
+
+
+@pytest.mark.parametrize("interpolator", ["linear", "grid"])
+def test_run_kernel_case(interpolator):
+    result = run_kernel_case(
+        interpolator, "rk4", nx=20, ny=10, num_particles=10, num_steps=3
+    )
+
+    assert result["name"] == f"kernel/{interpolator}/rk4/20x10/10"
+    assert result["throughput"] > 0
+    assert result["latency_per_step"]["p95"] >= result["latency_per_step"]["median"]
+    assert result["interpolator_bytes"] > 0
+    assert result["peak_memory_bytes"] > 0
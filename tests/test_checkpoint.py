@@ -0,0 +1,172 @@
+import glob
+import os
+
+import numpy as np
+import pytest
+from scipy.io import loadmat
+
+from src.checkpoint import JobManifest, ParticleCheckpoint, window_digest
+from src.file_utils import get_files_list, write_list_to_txt
+from src.hyperparameters import MyProgramArgs
+from src.integrate import get_integrator
+from src.main import run
+from src.particles import NeighboringParticles
+from src.synthetic import write_double_gyre_dataset
+
+
+class RotatingField:
+    """Solid-body rotation, whose speed grows with the snapshot index."""
+
+    def __init__(self, k):
+        self.k = k
+
+    def interpolate(self, points, simplex_hint=None):  # noqa: ARG002
+        return (1 + 0.1 * self.k) * np.stack((-points[:, 1], points[:, 0]), axis=-1)
+
+
+@pytest.fixture
+def seed_particles():
+    rng = np.random.default_rng(0)
+    return NeighboringParticles(positions=rng.random((4 * 5, 2)))
+
+
+@pytest.fixture
+def input_files(tmp_path):
+    file_paths = [str(tmp_path / f"snapshot{k}.mat") for k in range(3)]
+    for file_path in file_paths:
+        with open(file_path, "w") as f:
+            f.write("data")
+    return file_paths
+
+
+def test_window_digest_changes_with_modified_files(input_files):
+    digest = window_digest(input_files)
+    assert window_digest(input_files) == digest
+
+    os.utime(input_files[1], ns=(0, 0))
+    assert window_digest(input_files) != digest
+
+
+def test_manifest_skips_completed_windows(tmp_path):
+    path = str(tmp_path / "manifest.json")
+    manifest = JobManifest(path, {"integrator": "rk4"})
+    manifest.mark_completed(3, "digest")
+    manifest.save()
+
+    resumed = JobManifest(path, {"integrator": "rk4"})
+    assert not resumed.reset
+    assert resumed.is_completed(3, "digest")
+    assert not resumed.is_completed(3, "other digest")  # Input files changed
+    assert not resumed.is_completed(4, "digest")  # New window
+
+
+@pytest.mark.parametrize(
+    "parameters, resume",
+    [({"integrator": "euler"}, True), ({"integrator": "rk4"}, False)],
+)
+def test_manifest_is_reset(tmp_path, parameters, resume):
+    path = str(tmp_path / "manifest.json")
+    manifest = JobManifest(path, {"integrator": "rk4"})
+    manifest.mark_completed(3, "digest")
+    manifest.save()
+
+    restarted = JobManifest(path, parameters, resume=resume)
+    assert restarted.reset
+    assert not restarted.is_completed(3, "digest")
+
+
+@pytest.mark.parametrize("integrator_name", ["rk4", "ab2"])
+def test_resumed_window_matches_uninterrupted_one(
+    tmp_path, seed_particles, integrator_name
+):
+    def integrate(particles, integrator, steps, checkpoint=None):
+        for k in steps:
+            integrator.integrate(0.1, particles, RotatingField(k))
+            if checkpoint:
+                checkpoint.save(k + 1, particles, integrator)
+
+    expected = NeighboringParticles(positions=seed_particles.positions.copy())
+    integrate(expected, get_integrator(integrator_name), range(10))
+
+    # Interrupted after 7 steps, with the last checkpoint taken after step 6
+    checkpoint = ParticleCheckpoint(str(tmp_path / "window.npz"), "digest", 3)
+    particles = NeighboringParticles(positions=seed_particles.positions.copy())
+    integrate(particles, get_integrator(integrator_name), range(7), checkpoint)
+
+    resumed = NeighboringParticles(positions=seed_particles.positions.copy())
+    integrator = get_integrator(integrator_name)
+    first_step = checkpoint.restore(resumed, integrator)
+    integrate(resumed, integrator, range(first_step, 10))
+
+    assert first_step == 6
+    np.testing.assert_allclose(resumed.positions, expected.positions, rtol=1e-14)
+    np.testing.assert_array_equal(
+        resumed.initial_delta_right_left, seed_particles.initial_delta_right_left
+    )
+
+
+def test_checkpoint_of_other_inputs_is_ignored(tmp_path, seed_particles):
+    integrator = get_integrator("euler")
+    ParticleCheckpoint(str(tmp_path / "window.npz"), "digest", 1).save(
+        1, seed_particles, integrator
+    )
+
+    checkpoint = ParticleCheckpoint(str(tmp_path / "window.npz"), "other digest", 1)
+    assert checkpoint.restore(seed_particles, integrator) == 0
+
+
+def file_versions(pattern):
+    """Returns the inode and modification time of each file matching the pattern."""
+    return {
+        path: (os.stat(path).st_ino, os.stat(path).st_mtime_ns)
+        for path in glob.glob(pattern, recursive=True)
+    }
+
+
+@pytest.mark.parametrize("snapshot_timestep", [0.1, -0.1])
+def test_appended_snapshots_match_a_fresh_run(
+    tmp_path, monkeypatch, capsys, snapshot_timestep
+):
+    monkeypatch.chdir(tmp_path)
+    list_files = write_double_gyre_dataset(
+        "inputs", nx=20, ny=10, nt=14, num_particles=20
+    )
+    velocity_files = get_files_list(list_files["velocity"])
+    write_list_to_txt(velocity_files[:10], "first_snapshots.txt")
+
+    def run_job(experiment_name, list_velocity_files):
+        run(
+            MyProgramArgs(
+                experiment_name=experiment_name,
+                list_particle_files=list_files["particle"],
+                snapshot_timestep=snapshot_timestep,
+                flow_map_period=0.5,
+                list_velocity_files=list_velocity_files,
+                list_grid_files=list_files["grid"],
+                interpolator="linear",
+                execution_mode="composition",
+                resume=True,
+            )
+        )
+
+    # Windows of 6 snapshots: 5 windows of the first 10 snapshots, then 9
+    run_job("appended", "first_snapshots.txt")
+    outputs = file_versions("outputs/appended/ftle*.mat")
+    flow_maps = file_versions("outputs/appended/flow_maps/**/*.npz")
+    assert len(outputs) == 5 and len(flow_maps) == 10
+    capsys.readouterr()
+
+    # Appended snapshots (at the end of the list, in either time direction) only
+    # add new windows and maps, without computing the existing ones again
+    run_job("appended", list_files["velocity"])
+    assert "Resuming job: 5 windows completed" in capsys.readouterr().out
+    assert file_versions("outputs/appended/ftle*.mat").items() >= outputs.items()
+    new_flow_maps = file_versions("outputs/appended/flow_maps/**/*.npz")
+    assert new_flow_maps.items() >= flow_maps.items()
+    assert len(new_flow_maps) == 14
+
+    run_job("fresh", list_files["velocity"])
+    for index in range(9):
+        appended = loadmat(f"outputs/appended/ftle{index:04d}.mat")["ftle"]
+        fresh = loadmat(f"outputs/fresh/ftle{index:04d}.mat")["ftle"]
+        np.testing.assert_array_equal(appended, fresh)
@@ -4,6 +4,7 @@ from scipy.io import loadmat, savemat
 
 from src.file_readers import (
     CoordinateDataReader,
+    MatFileCache,
     VelocityDataReader,
     read_seed_particles_coordinates,
 )
@@ -54,6 +55,22 @@ def test_read_coordinates(mock_coordinate_file):
     np.testing.assert_array_equal(result, expected)
 
 
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_readers_convert_to_dtype(mock_velocity_file, mock_coordinate_file, dtype):
+    velocity_reader = VelocityDataReader(dtype)
+    coordinate_reader = CoordinateDataReader(dtype)
+
+    assert velocity_reader.read_flatten(mock_velocity_file).dtype == dtype
+    assert coordinate_reader.read_flatten(mock_coordinate_file).dtype == dtype
+    assert all(
+        array.dtype == dtype for array in velocity_reader.read_raw(mock_velocity_file)
+    )
+    assert all(
+        array.dtype == dtype
+        for array in coordinate_reader.read_raw(mock_coordinate_file)
+    )
+
+
 @pytest.fixture
 def mock_seed_particle_file(tmp_path):
     file_path = tmp_path / "seed_particles.mat"
@@ -109,3 +126,70 @@ def test_read_seed_particles_coordinates_caching(mock_seed_particle_file, mocker
     read_seed_particles_coordinates(mock_seed_particle_file)
     read_seed_particles_coordinates(mock_seed_particle_file)
     mocked_loadmat.assert_called_once_with(mock_seed_particle_file)
+
+
+@pytest.fixture
+def mock_snapshot_file(tmp_path):
+    # Snapshot that also stores its grid and other fields (as solver dumps do)
+    file_path = str(tmp_path / "snapshot.mat")
+    data = {
+        "coordinate_x": np.array([[7.0, 8.0, 9.0]]).T,
+        "coordinate_y": np.array([[10.0, 11.0, 12.0]]).T,
+        "velocity_x": np.array([[1.0, 2.0, 3.0]]).T,
+        "velocity_y": np.array([[4.0, 5.0, 6.0]]).T,
+        "pressure": np.array([[0.0, 0.0, 0.0]]).T,
+    }
+    create_mock_matlab_file(file_path, data)
+    return file_path
+
+
+def test_mat_cache_decodes_only_requested_variables(mock_snapshot_file, mocker):
+    mocked_loadmat = mocker.patch("src.file_readers.loadmat", wraps=loadmat)
+    mat_cache = MatFileCache()
+    reader = VelocityDataReader(mat_cache=mat_cache)
+
+    reader.read_flatten(mock_snapshot_file)
+    reader.read_raw(mock_snapshot_file)
+
+    mocked_loadmat.assert_called_once_with(
+        mock_snapshot_file, variable_names=["velocity_x", "velocity_y"]
+    )
+    assert set(mat_cache.files[mock_snapshot_file]) == {"velocity_x", "velocity_y"}
+
+
+def test_mat_cache_parses_shared_files_once(tmp_path, mock_snapshot_file, mocker):
+    second_file = str(tmp_path / "snapshot2.mat")
+    create_mock_matlab_file(second_file, loadmat(mock_snapshot_file))
+    mocked_loadmat = mocker.patch("src.file_readers.loadmat", wraps=loadmat)
+    mat_cache = MatFileCache()
+    coordinate_reader = CoordinateDataReader(mat_cache=mat_cache)
+    velocity_reader = VelocityDataReader(mat_cache=mat_cache)
+
+    for file_path in [mock_snapshot_file, second_file]:
+        coordinate_reader.read_flatten(file_path)
+        velocity_reader.read_flatten(file_path)
+
+    # The first file reveals that both readers share files: the next is parsed once
+    assert mocked_loadmat.call_count == 3
+    mocked_loadmat.assert_called_with(
+        second_file,
+        variable_names=["coordinate_x", "coordinate_y", "velocity_x", "velocity_y"],
+    )
+
+
+def test_reader_with_custom_variable_names(mock_snapshot_file):
+    reader = VelocityDataReader(
+        variable_names=("pressure", "velocity_x"), mat_cache=MatFileCache()
+    )
+
+    pressure, velocity_x = reader.read_raw(mock_snapshot_file)
+
+    np.testing.assert_array_equal(pressure, np.zeros((3, 1)))
+    np.testing.assert_array_equal(velocity_x, [[1.0], [2.0], [3.0]])
+
+
+def test_missing_variable_raises(mock_velocity_file):
+    reader = CoordinateDataReader(mat_cache=MatFileCache())
+
+    with pytest.raises(KeyError, match="coordinate_x"):
+        reader.read_raw(mock_velocity_file)
@@ -1,9 +1,9 @@
+import os
+import tempfile
 import unittest
 from pathlib import Path
 from unittest.mock import mock_open, patch
 
-import pandas as pd
-
 from src.file_utils import (
     find_files_with_pattern,
     get_files_list,
@@ -41,22 +41,17 @@ class TestFileUtils(unittest.TestCase):
         mock_file().write.assert_any_call("file1.txt\n")
         mock_file().write.assert_any_call("file2.txt\n")
 
-    @patch("os.path.exists")
-    @patch("pandas.read_csv")
-    def test_get_files_list_exists(self, mock_read_csv, mock_exists):
-        # Mock
-        mock_exists.return_value = True
-        mock_read_csv.return_value = pd.DataFrame(
-            {0: ["file1.txt", "file2.txt", "file3.txt"]}
-        )  # Mocking data without headers
+    def test_get_files_list_exists(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            list_file = os.path.join(tmp_dir, "velocity_file.txt")
+            with open(list_file, "w") as f:
+                f.write("file1.txt\nfile2.txt\n\nfile3.txt\n")
 
-        # Test
-        result = get_files_list("velocity_file.csv")
+            # Test
+            result = get_files_list(list_file)
 
         # Verify
         self.assertEqual(result, ["file1.txt", "file2.txt", "file3.txt"])  # Flat list
-        mock_exists.assert_called_once_with("velocity_file.csv")
-        mock_read_csv.assert_called_once_with("velocity_file.csv", header=None)
 
     @patch("os.path.exists")
     def test_get_files_list_not_exists(self, mock_exists):
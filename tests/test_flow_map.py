@@ -0,0 +1,114 @@
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+from scipy.spatial import Delaunay
+
+from src.flow_map import FlowMapStore, compose_flow_maps
+from src.interpolate import InterpolatorFactory, LinearInterpolatorStrategy
+from src.particles import NeighboringParticles
+
+UNIFORM_VELOCITY = np.array([0.2, -0.1])
+
+
+def generate_grid():
+    x, y = np.meshgrid(np.linspace(0, 1, 6), np.linspace(0, 1, 6))
+    return np.column_stack((x.ravel(), y.ravel()))
+
+
+@pytest.fixture(autouse=True)
+def input_files(tmp_path, monkeypatch):
+    """Snapshot and grid files, whose fingerprints identify the short maps."""
+    monkeypatch.chdir(tmp_path)
+    for name in ["grid.mat"] + [f"snapshot{k}.mat" for k in range(3)]:
+        (tmp_path / name).write_text(name)
+
+
+@pytest.fixture
+def mock_factory():
+    points = generate_grid()
+    velocities = np.tile(UNIFORM_VELOCITY, (points.shape[0], 1))
+
+    factory = MagicMock(spec=InterpolatorFactory)
+    factory.get_geometry.side_effect = lambda *_: Delaunay(points)
+    factory.create_interpolator.side_effect = lambda *_: LinearInterpolatorStrategy(
+        points, velocities[:, 0], velocities[:, 1]
+    )
+    return factory
+
+
+@pytest.fixture
+def particles():
+    positions = np.array(
+        [[0.4, 0.5], [0.6, 0.5], [0.5, 0.6], [0.5, 0.4]], dtype=np.float64
+    )
+    return NeighboringParticles(positions=positions)
+
+
+def test_compose_uniform_flow_maps(mock_factory, particles):
+    h = 0.1
+    store = FlowMapStore(mock_factory, "rk4", "linear", h)
+    initial_positions = particles.positions.copy()
+
+    flow_maps = [store.get(k, f"snapshot{k}.mat", "grid.mat") for k in range(3)]
+    compose_flow_maps(particles, flow_maps)
+
+    expected = initial_positions + 3 * h * UNIFORM_VELOCITY
+    np.testing.assert_allclose(particles.positions, expected, atol=1e-12)
+
+
+def test_flow_maps_are_cached_in_memory(mock_factory):
+    store = FlowMapStore(mock_factory, "euler", "linear", 0.1, num_cached_maps=2)
+
+    map_0 = store.get(0, "snapshot0.mat", "grid.mat")
+    assert store.get(0, "snapshot0.mat", "grid.mat") is map_0
+    assert mock_factory.create_interpolator.call_count == 1
+
+    store.get(1, "snapshot1.mat", "grid.mat")
+    store.get(2, "snapshot2.mat", "grid.mat")
+    assert 0 not in store.cache  # Oldest map evicted
+
+
+def test_flow_maps_are_shared_through_disk(mock_factory, tmp_path):
+    store = FlowMapStore(mock_factory, "euler", "linear", 0.1, cache_dir=tmp_path)
+    store.get(0, "snapshot0.mat", "grid.mat")
+    assert (tmp_path / "flow_map0000.npz").exists()
+
+    other_store = FlowMapStore(mock_factory, "euler", "linear", 0.1, cache_dir=tmp_path)
+    other_store.get(0, "snapshot0.mat", "grid.mat")
+
+    # The second store loads the map instead of integrating the grid again
+    assert mock_factory.create_interpolator.call_count == 1
+
+
+def test_flow_maps_of_other_inputs_are_computed_again(mock_factory, tmp_path):
+    store = FlowMapStore(mock_factory, "euler", "linear", 0.1, cache_dir=tmp_path)
+    store.get(0, "snapshot0.mat", "grid.mat")
+
+    # Another snapshot at the same index (e.g. after appending snapshots to a
+    # backward-time job), both in memory and on disk
+    store.get(0, "snapshot1.mat", "grid.mat")
+    other_store = FlowMapStore(mock_factory, "euler", "linear", 0.1, cache_dir=tmp_path)
+    other_store.get(0, "snapshot1.mat", "grid.mat")
+    assert mock_factory.create_interpolator.call_count == 2
+
+    # A modified snapshot
+    (tmp_path / "snapshot1.mat").write_text("modified snapshot")
+    other_store.get(0, "snapshot1.mat", "grid.mat")
+    assert mock_factory.create_interpolator.call_count == 3
+
+
+def test_nodes_leaving_the_domain_fall_back_to_euler(mock_factory):
+    h = 0.5  # Large enough for boundary nodes to leave the convex hull
+    store = FlowMapStore(mock_factory, "rk4", "linear", h)
+
+    displacement = store._compute(generate_grid(), "snapshot0.mat", "grid.mat")
+
+    assert np.isfinite(displacement).all()
+    np.testing.assert_allclose(
+        displacement, np.tile(h * UNIFORM_VELOCITY, (displacement.shape[0], 1))
+    )
+
+
+if __name__ == "__main__":
+    pytest.main()
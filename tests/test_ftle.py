@@ -1,7 +1,9 @@
 import numpy as np
 import pytest
 
-from src.ftle import compute_ftle
+from src.cauchy_green import compute_flow_map_jacobian
+from src.ftle import compute_ftle, compute_ftle_from_particles
+from src.particles import NeighboringParticles
 
 
 def test_compute_ftle():
@@ -26,5 +28,70 @@ def test_compute_ftle():
     np.testing.assert_allclose(computed_ftle, expected_ftle, rtol=1e-6)
 
 
+def deformed_particles(num_particles, seed=0):
+    """Seeds neighboring particles and applies a random affine map to each group."""
+    rng = np.random.default_rng(seed)
+    centers = rng.uniform(0, 1, size=(num_particles, 2))
+    offsets = 0.01 * np.array([[-1, 0], [1, 0], [0, 1], [0, -1]])  # L, R, T, B
+    seeds = (centers[None] + offsets[:, None]).reshape(-1, 2)
+    particles = NeighboringParticles(positions=seeds)
+
+    jacobians = rng.normal(size=(num_particles, 2, 2)) * 3
+    relative = (seeds - np.tile(centers, (4, 1))).reshape(4, num_particles, 2)
+    particles.positions = (
+        np.einsum("nij,knj->kni", jacobians, relative) + centers
+    ).reshape(-1, 2)
+    return particles
+
+
+def reference_ftle(particles, map_period):
+    jacobian = compute_flow_map_jacobian(particles)
+    cauchy_green_tensor = np.einsum("...ji,...jk->...ik", jacobian, jacobian)
+    max_eigvals = np.linalg.eigvalsh(cauchy_green_tensor)[:, -1]
+    return 1 / map_period * np.log(np.sqrt(max_eigvals))
+
+
+@pytest.mark.parametrize("block_size", [7, 65536])
+def test_compute_ftle_from_particles(block_size):
+    particles = deformed_particles(100)
+    map_period = 2.0
+
+    computed_ftle = compute_ftle_from_particles(
+        particles, map_period, block_size=block_size
+    )
+
+    np.testing.assert_allclose(
+        computed_ftle, reference_ftle(particles, map_period), rtol=1e-10
+    )
+
+
+def test_compute_ftle_from_particles_writes_into_out():
+    particles = deformed_particles(10)
+    out = np.full((2, 10), np.nan, dtype=np.float32)
+
+    result = compute_ftle_from_particles(particles, 1.0, out=out[1])
+
+    assert result is not None and np.shares_memory(result, out)
+    assert np.isnan(out[0]).all()
+    np.testing.assert_allclose(out[1], reference_ftle(particles, 1.0), rtol=1e-5)
+
+
+@pytest.mark.parametrize("stretching", [1.0, 1.0 + 1e-9, 1e4])
+def test_compute_ftle_near_degenerate_stretching(stretching):
+    # Rotation composed with (nearly) isotropic stretching: both eigenvalues of the
+    # Cauchy-Green tensor are (nearly) equal to stretching**2
+    angle = 0.3
+    rotation = np.array(
+        [[np.cos(angle), -np.sin(angle)], [np.sin(angle), np.cos(angle)]]
+    )
+    flow_map_jacobian = np.tile(stretching * rotation, (3, 1, 1))
+    flow_map_jacobian[1, :, 0] *= 1 + 1e-12
+
+    computed_ftle = compute_ftle(flow_map_jacobian, map_period=1.0)
+
+    assert np.isfinite(computed_ftle).all()
+    np.testing.assert_allclose(computed_ftle, np.log(stretching), atol=1e-11)
+
+
 if __name__ == "__main__":
     pytest.main()
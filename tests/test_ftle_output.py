@@ -0,0 +1,111 @@
+import json
+import os
+
+import numpy as np
+import pytest
+from scipy.io import loadmat
+
+from src.ftle_output import AsyncFTLEWriter, MatFTLEWriter, StackedFTLEWriter
+from src.refinement import QuadtreeFTLE
+
+
+@pytest.fixture
+def stacked_dir(tmp_path):
+    output_dir = str(tmp_path / "ftle")
+    StackedFTLEWriter.create(
+        output_dir,
+        num_particles=5,
+        window_files=["a.mat", "b.mat", "c.mat"],
+        map_period=2.0,
+        dtype=np.float16,
+    )
+    return output_dir
+
+
+def test_stacked_writer(stacked_dir):
+    writer = StackedFTLEWriter(stacked_dir)
+    writer.write(1, np.arange(5.0))
+    writer.close()
+
+    ftle = np.load(os.path.join(stacked_dir, "ftle.npy"))
+    completed = np.load(os.path.join(stacked_dir, "ftle_completed.npy"))
+    with open(os.path.join(stacked_dir, "ftle_index.json")) as f:
+        index = json.load(f)
+
+    assert ftle.shape == (3, 5)
+    assert ftle.dtype == np.float16
+    np.testing.assert_array_equal(ftle[1], np.arange(5.0))
+    np.testing.assert_array_equal(completed, [False, True, False])
+    assert index["window_files"] == ["a.mat", "b.mat", "c.mat"]
+
+
+def test_async_writer_writes_every_field(stacked_dir):
+    with AsyncFTLEWriter(StackedFTLEWriter(stacked_dir), max_pending=1) as writer:
+        for index in range(3):
+            writer.write(index, np.full(5, index))
+
+    ftle = np.load(os.path.join(stacked_dir, "ftle.npy"))
+    np.testing.assert_array_equal(ftle, np.repeat([[0], [1], [2]], 5, axis=1))
+
+
+def test_async_writer_raises_writer_errors(stacked_dir):
+    writer = AsyncFTLEWriter(StackedFTLEWriter(stacked_dir))
+    writer.write(0, np.zeros(4))  # Wrong number of particles
+
+    with pytest.raises(ValueError):
+        writer.close()
+
+
+def test_mat_writer_precision(tmp_path):
+    with AsyncFTLEWriter(MatFTLEWriter(str(tmp_path), np.float32)) as writer:
+        writer.write(7, np.arange(3.0))
+
+    ftle = loadmat(tmp_path / "ftle0007.mat")["ftle"]
+    assert ftle.dtype == np.float32
+    np.testing.assert_array_equal(ftle.ravel(), np.arange(3.0))
+
+
+def test_mat_writer_rejects_float16(tmp_path):
+    with pytest.raises(ValueError, match="float16"):
+        MatFTLEWriter(str(tmp_path), np.float16)
+
+
+def test_mat_writer_saves_the_quadtree_of_refined_fields(tmp_path):
+    # One coarse cell split into 4 children
+    tree = QuadtreeFTLE(
+        center=np.array(
+            [[0.5, 0.5], [0.25, 0.25], [0.75, 0.25], [0.25, 0.75], [0.75, 0.75]]
+        ),
+        size=np.array([[1.0, 1.0]] + [[0.5, 0.5]] * 4),
+        level=np.array([0, 1, 1, 1, 1]),
+        parent=np.array([-1, 0, 0, 0, 0]),
+        first_child=np.array([1, -1, -1, -1, -1]),
+        ftle=np.arange(5.0),
+    )
+    MatFTLEWriter(str(tmp_path), np.float32).write(3, tree)
+
+    data = loadmat(tmp_path / "ftle0003.mat")
+    assert data["ftle"].dtype == np.float32
+    for name, values in tree.to_dict().items():
+        np.testing.assert_array_equal(data[name].reshape(values.shape), values)
+
+
+def test_stacked_store_grows_keeping_written_windows(stacked_dir):
+    writer = StackedFTLEWriter(stacked_dir)
+    writer.write(2, np.ones(5))
+    writer.close()
+
+    StackedFTLEWriter.create(
+        stacked_dir,
+        num_particles=5,
+        window_files=["a.mat", "b.mat", "c.mat", "d.mat"],
+        map_period=2.0,
+        dtype=np.float16,
+        keep_existing=True,
+    )
+
+    ftle = np.load(os.path.join(stacked_dir, "ftle.npy"))
+    completed = np.load(os.path.join(stacked_dir, "ftle_completed.npy"))
+    assert ftle.shape == (4, 5)
+    np.testing.assert_array_equal(ftle[2], np.ones(5))
+    np.testing.assert_array_equal(completed, [False, False, True, False])
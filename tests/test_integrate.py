@@ -9,14 +9,14 @@ from src.integrate import (
     RungeKutta4Integrator,
     get_integrator,
 )
-from src.interpolate import InterpolationStrategy
+from src.interpolate import AnalyticVelocityField, InterpolationStrategy
 from src.particles import NeighboringParticles
 
 
 @pytest.fixture
 def mock_interpolator():
     mock = MagicMock(spec=InterpolationStrategy)
-    mock.interpolate.side_effect = lambda x: x * 0.1  # Fake velocity field
+    mock.interpolate.side_effect = lambda x, *_: x * 0.1  # Fake velocity field
     return mock
 
 
@@ -85,5 +85,49 @@ def test_get_integrator():
         get_integrator("")
 
 
+class LinearInTimeField:
+    """Fake time-dependent field with uniform velocity (t, 0)."""
+
+    def interpolate_at(self, t, new_points, simplex_hint=None):  # noqa: ARG002
+        velocity = np.zeros_like(new_points)
+        velocity[:, 0] = t
+        return velocity
+
+
+@pytest.mark.parametrize("h", [0.1 / 3, 0.2])
+def test_runge_kutta4_integrates_time_dependent_field(h, initial_conditions):
+    integrator = RungeKutta4Integrator()
+    initial_positions = initial_conditions.positions.copy()
+    period = 0.6
+
+    num_steps = round(period / h)
+    for n in range(num_steps):
+        integrator.integrate(h, initial_conditions, LinearInTimeField(), t=n * h)
+
+    # Exact solution: x(T) = x(0) + T^2 / 2 (RK4 is exact for polynomials in t)
+    expected_positions = initial_positions + np.array([period**2 / 2, 0.0])
+    np.testing.assert_allclose(initial_conditions.positions, expected_positions)
+
+
+@pytest.mark.parametrize("integrator_name, order", [("euler", 1), ("rk4", 4)])
+def test_integrators_converge_on_analytic_field(integrator_name, order):
+    # Rotation whose angular velocity grows in time: theta(T) = T^2 / 2
+    field = AnalyticVelocityField(lambda x, y, t: (-t * y, t * x), time=0.0)
+    period = 1.0
+
+    errors = []
+    for num_steps in (20, 40):
+        h = period / num_steps
+        particles = NeighboringParticles(positions=np.array([[1.0, 0.0]] * 4))
+        integrator = get_integrator(integrator_name)
+        for n in range(num_steps):
+            integrator.integrate(h, particles, field, t=n * h)
+        angle = period**2 / 2
+        errors.append(np.abs(particles.positions[0] - [np.cos(angle), np.sin(angle)]))
+
+    observed_order = np.log2(np.max(errors[0]) / np.max(errors[1]))
+    assert observed_order == pytest.approx(order, abs=0.3)
+
+
 if __name__ == "__main__":
     pytest.main()
@@ -2,13 +2,24 @@ from unittest.mock import patch
 
 import numpy as np
 import pytest
+from scipy.interpolate import RegularGridInterpolator
+from scipy.spatial import Delaunay, cKDTree
 
 from src.file_readers import CoordinateDataReader, VelocityDataReader
 from src.interpolate import (
+    AnalyticInterpolatorFactory,
+    AnalyticVelocityField,
     CubicInterpolatorStrategy,
+    CurvilinearGrid,
+    GridInterpolatorStrategy,
     InterpolatorFactory,
     LinearInterpolatorStrategy,
     NearestNeighborInterpolatorStrategy,
+    SpaceTimeInterpolator,
+    TimeDependentInterpolationStrategy,
+    UniformGrid,
+    build_structured_grid,
+    locate_simplices,
 )
 
 
@@ -41,30 +52,202 @@ def test_interpolators(strategy_class):
     assert np.isfinite(interpolated_values).all()
 
 
-# def test_grid_interpolator():
-#     grid_x = np.array(
-#         [[0.0, 0.5, 1.0], [0.0, 0.5, 1.0], [0.0, 0.5, 1.0]], dtype=np.float32
-#     )
-#     grid_y = np.array(
-#         [[0.0, 0.0, 0.0], [0.5, 0.5, 0.5], [1.0, 1.0, 1.0]], dtype=np.float32
-#     )
+def test_grid_interpolator():
+    grid_x = np.array(
+        [[0.0, 0.5, 1.0], [0.0, 0.5, 1.0], [0.0, 0.5, 1.0]], dtype=np.float32
+    )
+    grid_y = np.array(
+        [[0.0, 0.0, 0.0], [0.5, 0.5, 0.5], [1.0, 1.0, 1.0]], dtype=np.float32
+    )
+
+    velocities_u = np.array(
+        [[0.0, 0.5, 1.0], [0.0, 0.5, 1.0], [0.0, 0.5, 1.0]], dtype=np.float32
+    )
+    velocities_v = np.array(
+        [[0.0, 0.0, 0.0], [0.5, 0.5, 0.5], [1.0, 1.0, 1.0]], dtype=np.float32
+    )
+
+    interpolator = GridInterpolatorStrategy(
+        (grid_x, grid_y), velocities_u, velocities_v
+    )
+
+    new_points = np.array([[0.5, 0.5], [0.25, 0.75]], dtype=np.float32)
+    interpolated_values = interpolator.interpolate(new_points)
+
+    assert interpolated_values.shape == (new_points.shape[0], 2)
+    np.testing.assert_allclose(interpolated_values, new_points)
+
+
+def generate_uniform_grid_data(indexing):
+    axis_x, axis_y = np.linspace(-1.0, 2.0, 31), np.linspace(0.5, 1.5, 21)
+    x, y = np.meshgrid(axis_x, axis_y, indexing=indexing)
+    return x, y, np.sin(x) * np.cos(2 * y), x**2 - y
+
+
+@pytest.mark.parametrize("indexing", ["ij", "xy"])
+def test_grid_interpolator_matches_regular_grid_interpolator(indexing):
+    x, y, velocities_u, velocities_v = generate_uniform_grid_data(indexing)
+    interpolator = GridInterpolatorStrategy((x, y), velocities_u, velocities_v)
+
+    rng = np.random.default_rng(3)
+    new_points = rng.uniform([-1.2, 0.4], [2.2, 1.6], size=(1000, 2))
+    interpolated_values = interpolator.interpolate(new_points)
+
+    if indexing == "xy":
+        x, y, velocities_u, velocities_v = (
+            array.T for array in (x, y, velocities_u, velocities_v)
+        )
+    expected = np.column_stack(
+        [
+            RegularGridInterpolator(
+                (x[:, 0], y[0, :]), values, bounds_error=False, fill_value=None
+            )(new_points)
+            for values in (velocities_u, velocities_v)
+        ]
+    )
+
+    # Including points outside the grid, linearly extrapolated by both
+    np.testing.assert_allclose(interpolated_values, expected, atol=1e-12)
+
+
+@pytest.mark.parametrize("indexing", ["ij", "xy"])
+def test_grid_cubic_interpolator_is_exact_for_quadratics(indexing):
+    x, y, _, _ = generate_uniform_grid_data(indexing)
+    interpolator = GridInterpolatorStrategy(
+        (x, y), x**2 - x * y, 3 * y**2 + x, method="cubic"
+    )
+
+    # Away from the boundary, where the stencil is not clamped
+    rng = np.random.default_rng(4)
+    new_points = rng.uniform([-0.8, 0.6], [1.8, 1.4], size=(200, 2))
+    px, py = new_points[:, 0], new_points[:, 1]
+
+    np.testing.assert_allclose(
+        interpolator.interpolate(new_points),
+        np.column_stack((px**2 - px * py, 3 * py**2 + px)),
+        atol=1e-12,
+    )
+
+
+@pytest.mark.parametrize("method", ["linear", "cubic"])
+def test_grid_interpolator_evaluates_in_single_precision(method):
+    x, y, velocities_u, velocities_v = generate_uniform_grid_data("xy")
+    interpolator = GridInterpolatorStrategy((x, y), velocities_u, velocities_v, method)
+    single_interpolator = GridInterpolatorStrategy(
+        (x, y),
+        velocities_u.astype(np.float32),
+        velocities_v.astype(np.float32),
+        method,
+    )
+
+    rng = np.random.default_rng(8)
+    new_points = rng.uniform([-1.0, 0.5], [2.0, 1.5], size=(100, 2))
+    interpolated_values = single_interpolator.interpolate(new_points)
 
-#     velocities_u = np.array(
-#         [[0.0, 0.5, 1.0], [0.0, 0.5, 1.0], [0.0, 0.5, 1.0]], dtype=np.float32
-#     )
-#     velocities_v = np.array(
-#         [[0.0, 0.0, 0.0], [0.5, 0.5, 0.5], [1.0, 1.0, 1.0]], dtype=np.float32
-#     )
+    assert interpolated_values.dtype == np.float32
+    np.testing.assert_allclose(
+        interpolated_values, interpolator.interpolate(new_points), atol=1e-5
+    )
+
+
+def test_non_uniform_grids_are_curvilinear():
+    x, y = np.meshgrid(np.array([0.0, 0.1, 0.3, 0.6]), np.linspace(0, 1, 3))
+    with pytest.raises(ValueError, match="uniform Cartesian grid"):
+        UniformGrid.from_coordinates(x, y)
+
+    assert isinstance(build_structured_grid(x, y), CurvilinearGrid)
+
+
+def test_curvilinear_interpolator_matches_regular_grid_interpolator():
+    axis_x = np.linspace(0, 1, 25) ** 2  # Stretched towards x = 0
+    axis_y = np.sin(np.linspace(0, np.pi / 2, 15))
+    x, y = np.meshgrid(axis_x, axis_y, indexing="ij")
+    velocities_u, velocities_v = np.sin(3 * x) * y, x * np.cos(2 * y)
+    interpolator = GridInterpolatorStrategy((x, y), velocities_u, velocities_v)
+
+    rng = np.random.default_rng(5)
+    new_points = rng.uniform(0, 1, size=(1000, 2))
+    expected = np.column_stack(
+        [
+            RegularGridInterpolator((axis_x, axis_y), values)(new_points)
+            for values in (velocities_u, velocities_v)
+        ]
+    )
+
+    assert isinstance(interpolator.grid, CurvilinearGrid)
+    np.testing.assert_allclose(interpolator.interpolate(new_points), expected)
+
+
+def generate_annulus_grid():
+    """O-grid around a cylinder, with the cut at theta = 0."""
+    radius = np.geomspace(1, 3, 20)
+    theta = np.linspace(0, 2 * np.pi, 73)
+    r, th = np.meshgrid(radius, theta, indexing="ij")
+    return r * np.cos(th), r * np.sin(th)
+
+
+def test_curvilinear_grid_locates_points_across_the_cut():
+    x, y = generate_annulus_grid()
+    grid = CurvilinearGrid(x, y)
+
+    rng = np.random.default_rng(6)
+    radius, theta = rng.uniform(1.1, 2.9, 500), rng.uniform(0, 2 * np.pi, 500)
+    points = np.column_stack((radius * np.cos(theta), radius * np.sin(theta)))
+
+    # Wrong hints, as if every point had just crossed the cut
+    cell_hint = np.full(points.shape[0], x.shape[1] - 2)
+    i, j, s, t = grid.locate(points, cell_hint)
+
+    assert np.all((s >= -1e-9) & (s <= 1 + 1e-9) & (t >= -1e-9) & (t <= 1 + 1e-9))
+    np.testing.assert_array_equal(cell_hint, i * (x.shape[1] - 1) + j)
 
-#     interpolator = GridInterpolatorStrategy(
-#         (grid_x, grid_y), velocities_u, velocities_v
-#     )
+    # The bilinear map of the cells found recovers the points
+    nodes = grid.node_coordinates
+    s, t = s[:, None], t[:, None]
+    mapped = (1 - s) * ((1 - t) * nodes[i, j] + t * nodes[i, j + 1]) + s * (
+        (1 - t) * nodes[i + 1, j] + t * nodes[i + 1, j + 1]
+    )
+    np.testing.assert_allclose(mapped, points, atol=1e-12)
+
+
+def test_curvilinear_grid_locates_points_on_a_changing_grid():
+    x, y = generate_annulus_grid()
+    rng = np.random.default_rng(8)
+    radius, theta = rng.uniform(1.1, 2.9, 500), rng.uniform(0, 2 * np.pi, 500)
+    points = np.column_stack((radius * np.cos(theta), radius * np.sin(theta)))
+
+    # The hints of a fine grid are beyond the cells of a coarser (rotated) one
+    grids = [CurvilinearGrid(x, y), CurvilinearGrid(y[::2, ::3], -x[::2, ::3])]
+    cell_hint = np.full(points.shape[0], -1)
+    for grid in grids + grids:
+        i, j, _, _ = grid.locate(points, cell_hint)
+        expected_i, expected_j, _, _ = grid.locate(points)
+        np.testing.assert_array_equal(i, expected_i)
+        np.testing.assert_array_equal(j, expected_j)
 
-#     new_points = np.array([[0.5, 0.5], [0.25, 0.75]], dtype=np.float32)
-#     interpolated_values = interpolator.interpolate(new_points)
+    # Hints of unknown origin are checked against the number of cells
+    cell_hint = np.full(points.shape[0], x.size)
+    i, j, _, _ = grids[1].locate(points, cell_hint)
+    np.testing.assert_array_equal(i, expected_i)
+    np.testing.assert_array_equal(j, expected_j)
 
-#     assert interpolated_values.shape == (new_points.shape[0], 2)
-#     assert np.isfinite(interpolated_values).all()
+
+@pytest.mark.parametrize("method", ["linear", "cubic"])
+def test_warm_started_curvilinear_interpolation(method):
+    x, y = generate_annulus_grid()
+    interpolator = GridInterpolatorStrategy((x, y), -y, x, method)
+
+    rng = np.random.default_rng(7)
+    radius, theta = rng.uniform(1.1, 2.9, 500), rng.uniform(0, 2 * np.pi, 500)
+    new_points = np.column_stack((radius * np.cos(theta), radius * np.sin(theta)))
+
+    simplex_hint = np.full(new_points.shape[0], -1)
+    for _ in range(2):  # Cold, then warm start
+        interpolated_values = interpolator.interpolate(new_points, simplex_hint)
+        # Linear fields are reproduced exactly (isoparametric interpolation)
+        np.testing.assert_allclose(
+            interpolated_values, new_points @ [[0, 1], [-1, 0]], atol=1e-12
+        )
 
 
 @patch("src.file_readers.CoordinateDataReader.read_flatten")
@@ -114,5 +297,203 @@ def test_caching():
         assert interpolator_1 is not interpolator_3  # Should create a new instance
 
 
+@pytest.fixture
+def empty_geometry_cache():
+    InterpolatorFactory.geometry_cache.clear()
+    yield
+    InterpolatorFactory.geometry_cache.clear()
+
+
+@pytest.mark.parametrize(
+    "strategy_class, geometry",
+    [
+        (CubicInterpolatorStrategy, Delaunay),
+        (LinearInterpolatorStrategy, Delaunay),
+        (NearestNeighborInterpolatorStrategy, cKDTree),
+    ],
+)
+def test_interpolators_accept_prebuilt_geometry(strategy_class, geometry):
+    points, velocities = generate_mock_data()
+    new_points = np.array([[0.5, 0.5], [0.25, 0.75]], dtype=np.float32)
+
+    from_points = strategy_class(points, velocities[:, 0], velocities[:, 1])
+    from_geometry = strategy_class(geometry(points), velocities[:, 0], velocities[:, 1])
+
+    np.testing.assert_allclose(
+        from_geometry.interpolate(new_points), from_points.interpolate(new_points)
+    )
+
+
+@pytest.mark.usefixtures("empty_geometry_cache")
+@pytest.mark.parametrize(
+    "strategy, geometry", [("cubic", Delaunay), ("nearest", cKDTree)]
+)
+def test_geometry_is_built_once_per_grid(strategy, geometry):
+    with (
+        patch(
+            "src.file_readers.CoordinateDataReader.read_flatten"
+        ) as mock_read_coordinates,
+        patch("src.file_readers.VelocityDataReader.read_flatten") as mock_read_velocity,
+    ):
+        points, velocities = generate_mock_data()
+        mock_read_coordinates.return_value = points
+        mock_read_velocity.return_value = velocities
+
+        factory = InterpolatorFactory(CoordinateDataReader(), VelocityDataReader())
+        for i in range(3):
+            factory.create_interpolator(f"snapshot{i}.mat", "fixed_grid.mat", strategy)
+
+        assert mock_read_coordinates.call_count == 1
+        assert isinstance(factory.get_geometry("fixed_grid.mat", strategy), geometry)
+
+        # Another factory (e.g. of the next window) reuses the same geometry
+        other_factory = InterpolatorFactory(
+            CoordinateDataReader(), VelocityDataReader()
+        )
+        assert other_factory.get_geometry(
+            "fixed_grid.mat", strategy
+        ) is factory.get_geometry("fixed_grid.mat", strategy)
+
+
+@pytest.mark.usefixtures("empty_geometry_cache")
+def test_geometry_is_reused_for_identical_coordinates():
+    with patch(
+        "src.file_readers.CoordinateDataReader.read_flatten"
+    ) as mock_read_coordinates:
+        points, _ = generate_mock_data()
+        mock_read_coordinates.return_value = points
+
+        factory = InterpolatorFactory(CoordinateDataReader(), VelocityDataReader())
+        geometry_1 = factory.get_geometry("grid_copy1.mat")
+        geometry_2 = factory.get_geometry("grid_copy2.mat")
+        assert geometry_1 is geometry_2
+
+        mock_read_coordinates.return_value = points + 1.0  # Moving grid
+        geometry_3 = factory.get_geometry("grid_moved.mat")
+        assert geometry_3 is not geometry_1
+
+
+def generate_scattered_data(num_points=300, seed=0):
+    rng = np.random.default_rng(seed)
+    points = rng.uniform(0, 1, size=(num_points, 2))
+    velocities_u = np.sin(3 * points[:, 0]) * points[:, 1]
+    velocities_v = np.cos(2 * points[:, 1]) - points[:, 0] ** 2
+    return points, velocities_u, velocities_v
+
+
+def test_locate_simplices_matches_global_search():
+    points, _, _ = generate_scattered_data()
+    triangulation = Delaunay(points)
+    rng = np.random.default_rng(1)
+    new_points = rng.uniform(-0.1, 1.1, size=(500, 2))  # Some outside the hull
+
+    # Cold start, arbitrary (bad) hints and exact hints
+    hints = [
+        np.full(new_points.shape[0], -1),
+        rng.integers(0, triangulation.nsimplex, new_points.shape[0]),
+        triangulation.find_simplex(new_points),
+    ]
+    expected = triangulation.find_simplex(new_points)
+    for simplex_hint in hints:
+        simplices = locate_simplices(triangulation, new_points, simplex_hint)
+        np.testing.assert_array_equal(simplices, expected)
+        np.testing.assert_array_equal(simplex_hint, expected)  # Updated in place
+
+
+def test_locate_simplices_on_a_changing_mesh():
+    points, _, _ = generate_scattered_data()
+    rng = np.random.default_rng(3)
+    new_points = rng.uniform(0, 1, size=(500, 2))
+
+    # The hints of a fine mesh are beyond the simplices of a coarser (moved) one
+    meshes = [Delaunay(points), Delaunay(points[:50] + 0.01), Delaunay(points)]
+    simplex_hint = np.full(new_points.shape[0], -1)
+    for triangulation in meshes:
+        simplices = locate_simplices(triangulation, new_points, simplex_hint)
+        np.testing.assert_array_equal(simplices, triangulation.find_simplex(new_points))
+
+    # Hints of unknown origin are checked against the number of simplices
+    simplex_hint = np.full(new_points.shape[0], meshes[0].nsimplex)
+    simplices = locate_simplices(meshes[1], new_points, simplex_hint)
+    np.testing.assert_array_equal(simplices, meshes[1].find_simplex(new_points))
+
+
+@pytest.mark.parametrize(
+    "strategy_class", [CubicInterpolatorStrategy, LinearInterpolatorStrategy]
+)
+def test_warm_started_interpolation_matches_scipy(strategy_class):
+    points, velocities_u, velocities_v = generate_scattered_data()
+    interpolator = strategy_class(points, velocities_u, velocities_v)
+
+    rng = np.random.default_rng(2)
+    new_points = rng.uniform(-0.1, 1.1, size=(500, 2))
+    expected = interpolator.interpolate(new_points)
+
+    simplex_hint = np.full(new_points.shape[0], -1)
+    for _ in range(2):  # Cold, then warm start
+        interpolated_values = interpolator.interpolate(new_points, simplex_hint)
+        np.testing.assert_allclose(interpolated_values, expected, atol=1e-12)
+
+
+class ConstantInterpolator:
+    """Fake snapshot interpolator of a uniform field of value `k`."""
+
+    def __init__(self, k):
+        self.k = k
+
+    def interpolate(self, new_points, simplex_hint=None):  # noqa: ARG002
+        return np.full_like(new_points, self.k, dtype=np.float64)
+
+
+def test_space_time_interpolation_is_linear_in_time():
+    num_snapshots, snapshot_timestep = 5, -0.5
+    built = []
+
+    def get_snapshot_interpolator(k):
+        built.append(k)
+        return ConstantInterpolator(k)
+
+    interpolator = SpaceTimeInterpolator(
+        get_snapshot_interpolator, snapshot_timestep, num_snapshots
+    )
+    new_points = np.zeros((3, 2))
+
+    for t, expected in [(0.0, 0.0), (-0.25, 0.5), (-0.6, 1.2), (-2.0, 4.0)]:
+        np.testing.assert_allclose(
+            interpolator.interpolate_at(t, new_points), expected, atol=1e-12
+        )
+
+    # Extrapolated from the last pair of snapshots
+    np.testing.assert_allclose(interpolator.interpolate_at(-2.5, new_points), 5.0)
+
+    # Snapshots are built lazily and only the pair in use is kept
+    assert built == [0, 1, 2, 3, 4]
+    assert sorted(interpolator.snapshot_interpolators) == [3, 4]
+
+
+def test_analytic_velocity_field_is_evaluated_at_its_time():
+    def velocity(x, y, t):
+        return x + t, y * t
+
+    field = AnalyticVelocityField(velocity, time=2.0)
+    assert isinstance(field, TimeDependentInterpolationStrategy)
+
+    points = np.array([[1.0, 3.0], [0.5, -1.0]], dtype=np.float32)
+    velocities = field.interpolate_at(0.5, points)
+    np.testing.assert_allclose(velocities, [[3.5, 7.5], [3.0, -2.5]])
+    assert velocities.dtype == np.float32
+    np.testing.assert_allclose(field.interpolate(points), [[3.0, 6.0], [2.5, -2.0]])
+
+
+def test_analytic_interpolator_factory_maps_labels_to_times():
+    factory = AnalyticInterpolatorFactory(
+        lambda x, y, t: (np.full_like(x, t), np.zeros_like(y)),
+        {"field(t=0)": 0.0, "field(t=0.5)": 0.5},
+    )
+    interpolator = factory.create_interpolator("field(t=0.5)", "field", "cubic")
+    assert interpolator.time == 0.5
+    np.testing.assert_allclose(interpolator.interpolate(np.zeros((2, 2)))[:, 0], 0.5)
+
+
 if __name__ == "__main__":
     pytest.main()
@@ -0,0 +1,89 @@
+import numpy as np
+import pytest
+from scipy.io import savemat
+
+from src.file_readers import CoordinateDataReader, VelocityDataReader
+from src.memmap_store import (
+    MemmapCoordinateDataReader,
+    MemmapVelocityDataReader,
+    convert_to_memmap_store,
+)
+
+
+@pytest.fixture
+def dataset(tmp_path):
+    rng = np.random.default_rng(0)
+    velocity_files = []
+    for k in range(3):
+        file_path = str(tmp_path / f"velocity{k}.mat")
+        savemat(
+            file_path,
+            {
+                "velocity_x": rng.random((4, 5)),
+                "velocity_y": rng.random((4, 5)),
+                "pressure": rng.random((4, 5)),
+            },
+        )
+        velocity_files.append(file_path)
+
+    grid_file = str(tmp_path / "grid.mat")
+    x, y = np.meshgrid(np.arange(5.0), np.arange(4.0))
+    savemat(grid_file, {"coordinate_x": x, "coordinate_y": y})
+
+    store_dir = str(tmp_path / "store")
+    convert_to_memmap_store(velocity_files, [grid_file], store_dir)
+    return velocity_files, grid_file, store_dir
+
+
+def test_velocity_reader_matches_mat_reader(dataset):
+    velocity_files, _, store_dir = dataset
+    reader = MemmapVelocityDataReader(store_dir)
+
+    for file_path in velocity_files:
+        expected_x, expected_y = VelocityDataReader().read_raw(file_path)
+        raw_x, raw_y = reader.read_raw(file_path)
+        np.testing.assert_array_equal(raw_x, expected_x)
+        np.testing.assert_array_equal(raw_y, expected_y)
+        np.testing.assert_array_equal(
+            reader.read_flatten(file_path), VelocityDataReader().read_flatten(file_path)
+        )
+
+
+def test_coordinate_reader_returns_zero_copy_views(dataset):
+    _, grid_file, store_dir = dataset
+    reader = MemmapCoordinateDataReader(store_dir)
+
+    coordinates = reader.read_flatten(grid_file)
+
+    np.testing.assert_array_equal(
+        coordinates, CoordinateDataReader().read_flatten(grid_file)
+    )
+    assert np.shares_memory(coordinates, reader.stacked)
+    assert not coordinates.flags.writeable
+
+
+def test_reader_precision(dataset):
+    velocity_files, _, store_dir = dataset
+    reader = MemmapVelocityDataReader(store_dir, np.float32)
+
+    assert reader.read_flatten(velocity_files[0]).dtype == np.float32
+
+
+def test_unknown_file_raises(dataset):
+    _, _, store_dir = dataset
+
+    with pytest.raises(KeyError, match="not in the snapshot store"):
+        MemmapVelocityDataReader(store_dir).read_raw("unknown.mat")
+
+
+def test_files_with_different_shapes_raise(tmp_path):
+    file_paths = []
+    for k, shape in enumerate([(4, 5), (3, 5)]):
+        file_path = str(tmp_path / f"velocity{k}.mat")
+        savemat(
+            file_path, {"velocity_x": np.zeros(shape), "velocity_y": np.zeros(shape)}
+        )
+        file_paths.append(file_path)
+
+    with pytest.raises(ValueError, match="same shape"):
+        convert_to_memmap_store(file_paths, [], str(tmp_path / "store"))
@@ -0,0 +1,61 @@
+from collections import deque
+from dataclasses import dataclass
+
+import numpy as np
+from scipy.spatial import Delaunay, cKDTree
+
+from src.memory import current_rss, deep_nbytes, peak_rss
+
+
+@dataclass
+class Holder:
+    values: np.ndarray
+    geometry: object = None
+
+
+def test_rss_is_reported():
+    assert current_rss() > 0
+    assert peak_rss() > 0
+
+
+def test_deep_nbytes_counts_shared_arrays_once():
+    shared = np.zeros(1000)
+    cache = {
+        "a": Holder(np.zeros(10), shared),
+        "b": Holder(np.zeros(10), shared),
+        "c": [shared[:10], shared.reshape(10, 100)],  # Views of the shared array
+    }
+    assert deep_nbytes(cache) == shared.nbytes + 2 * 80
+    assert deep_nbytes(cache["a"], cache["b"]) == shared.nbytes + 2 * 80
+
+
+def test_deep_nbytes_walks_nested_attributes():
+    class Interpolator:
+        def __init__(self):
+            self.values = np.zeros(10)
+            self.inner = Inner()
+
+    class Inner:
+        def __init__(self):
+            self.grad = np.zeros((10, 2))
+
+    assert deep_nbytes(Interpolator()) == 8 * 30
+
+
+def test_deep_nbytes_walks_containers_and_geometries():
+    rng = np.random.default_rng(0)
+    points = rng.random((100, 2))
+
+    triangulation = Delaunay(points)
+    assert deep_nbytes(triangulation) >= (
+        points.nbytes + triangulation.simplices.nbytes + triangulation.neighbors.nbytes
+    )
+    assert deep_nbytes(cKDTree(points)) > points.nbytes
+    assert deep_nbytes(deque([points, (points,)])) == points.nbytes
+
+
+def test_deep_nbytes_skips_mapped_arrays(tmp_path):
+    path = tmp_path / "array.npy"
+    np.save(path, np.zeros(100))
+    mapped = np.load(path, mmap_mode="r")
+    assert deep_nbytes([mapped, mapped[:10]]) == 0
@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from src.prefetch import Prefetcher
+
+
+def test_items_are_returned_in_order():
+    with Prefetcher(lambda k: k * k, num_items=5, depth=2) as prefetcher:
+        assert [prefetcher.get(k) for k in range(5)] == [0, 1, 4, 9, 16]
+
+
+def test_items_are_not_built_beyond_depth():
+    built = []
+
+    def build(k):
+        built.append(k)
+        return k
+
+    with Prefetcher(build, num_items=10, depth=3) as prefetcher:
+        prefetcher.thread.join(timeout=0.2)  # Blocked once 3 items are ready
+        assert built == [0, 1, 2]
+        assert prefetcher.get(0) == 0
+        assert prefetcher.get(5) == 5  # Skips the items in between
+        assert prefetcher.get(1) == 1  # Built again, in the calling thread
+
+
+def test_memory_cap_limits_prefetched_items():
+    built = []
+
+    def build(k):
+        built.append(k)
+        return np.zeros(100)
+
+    with Prefetcher(build, num_items=10, depth=5, max_bytes=100) as prefetcher:
+        prefetcher.thread.join(timeout=0.2)
+        assert built == [0]  # A single (oversized) item is always allowed
+        prefetcher.get(0)
+        prefetcher.thread.join(timeout=0.2)
+        assert built == [0, 1]
+
+
+def test_errors_are_raised_by_get():
+    def build(k):
+        if k == 1:
+            raise RuntimeError("Corrupted snapshot")
+        return k
+
+    with Prefetcher(build, num_items=3) as prefetcher:
+        assert prefetcher.get(0) == 0
+        with pytest.raises(RuntimeError, match="Corrupted snapshot"):
+            prefetcher.get(1)
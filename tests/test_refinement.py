@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from src.ftle import compute_ftle_from_particles
+from src.particles import NeighboringParticles
+from src.refinement import refine_ftle, seed_cells, seed_particles_at
+from src.synthetic import neighboring_seed_particles
+
+RIDGE_Y = 0.52
+RIDGE_WIDTH = 0.02
+
+
+def lattice_seed_particles(num_particles=200, spacing=1e-4):
+    neighbors = neighboring_seed_particles(num_particles, spacing)
+    return NeighboringParticles(
+        positions=np.concatenate(
+            [neighbors[key] for key in ("left", "right", "top", "bottom")]
+        )
+    )
+
+
+def shear_layer(particles):
+    """
+    Flow map of a thin shear layer in a weak background shear, whose FTLE ridge is
+    the line y = RIDGE_Y.
+    """
+    x, y = particles.positions.T
+    particles.positions[:, 0] = x + np.tanh((y - RIDGE_Y) / RIDGE_WIDTH) + 0.1 * y**2
+
+
+def test_seed_cells_of_a_lattice():
+    seed_particles = lattice_seed_particles()
+    centers, sizes = seed_cells(seed_particles)
+    np.testing.assert_allclose(
+        centers, neighboring_seed_particles(200, 1e-4)["top"] - [0, 1e-4]
+    )
+    assert np.allclose(sizes, sizes[0])  # Uniform lattice
+
+    # Missing nodes (e.g. inside a body) are fine, but not scattered seeds
+    kept = np.arange(len(seed_particles)) % 3 != 0
+    positions = seed_particles.positions.reshape(4, -1, 2)[:, kept].reshape(-1, 2)
+    _, subset_sizes = seed_cells(NeighboringParticles(positions=positions))
+    np.testing.assert_allclose(subset_sizes, sizes[kept])
+
+    scattered = seed_particles_at(
+        np.random.default_rng(0).random((10, 2)), np.full((10, 2), 1e-4)
+    )
+    with pytest.raises(ValueError, match="lattice"):
+        seed_cells(scattered)
+
+
+def test_refinement_concentrates_near_ridges():
+    seed_particles = lattice_seed_particles()
+    particles = NeighboringParticles(positions=seed_particles.positions.copy())
+    shear_layer(particles)
+    ftle = compute_ftle_from_particles(particles, 1.0)
+
+    tree = refine_ftle(seed_particles, ftle, shear_layer, 1.0, num_levels=3)
+
+    # The coarse field is kept as is, followed by the refined cells
+    np.testing.assert_array_equal(tree.ftle[: len(ftle)], ftle)
+    assert tree.level.max() == 3
+
+    # Children tile their parent
+    refined = np.flatnonzero(~tree.is_leaf)
+    children = tree.first_child[refined, None] + np.arange(4)
+    assert np.all(tree.parent[children] == refined[:, None])
+    np.testing.assert_allclose(tree.center[children].mean(axis=1), tree.center[refined])
+    assert np.allclose(tree.size[children], tree.size[refined, None] / 2)
+
+    # The finest cells follow the ridge, and are much fewer than a dense seeding
+    finest = tree.level == 3
+    coarse_size = tree.size[0, 1]
+    assert np.all(np.abs(tree.center[finest, 1] - RIDGE_Y) < coarse_size)
+    assert len(tree) < len(ftle) * 4**3 / 4
+
+    # Refined values are those of seeds placed at the centers of the cells
+    particles = seed_particles_at(tree.center[finest], np.full((finest.sum(), 2), 1e-4))
+    shear_layer(particles)
+    np.testing.assert_allclose(
+        tree.ftle[finest], compute_ftle_from_particles(particles, 1.0)
+    )
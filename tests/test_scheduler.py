@@ -0,0 +1,94 @@
+import pickle
+import queue
+
+from src.scheduler import WorkerContext, contiguous_blocks
+
+
+def test_window_files_cycles_grid_and_particle_files():
+    snapshot_files = [f"velocity{k}.mat" for k in range(6)]
+    context = WorkerContext(snapshot_files, ["grid.mat"], ["particles.mat"], 3)
+
+    snapshots, grids, particle_file = context.window_files(2)
+    assert snapshots == ["velocity2.mat", "velocity3.mat", "velocity4.mat"]
+    assert grids == ["grid.mat"] * 3
+    assert particle_file == "particles.mat"
+
+    moving = WorkerContext(
+        snapshot_files,
+        [f"grid{k}.mat" for k in range(6)],
+        [f"particles{k}.mat" for k in range(6)],
+        3,
+    )
+    snapshots, grids, particle_file = moving.window_files(3)
+    assert grids == ["grid3.mat", "grid4.mat", "grid5.mat"]
+    assert particle_file == "particles3.mat"
+
+
+def test_backward_windows_integrate_their_snapshots_in_reverse():
+    snapshot_files = [f"velocity{k}.mat" for k in range(6)]
+    backward = WorkerContext(
+        snapshot_files,
+        [f"grid{k}.mat" for k in range(6)],
+        [f"particles{k}.mat" for k in range(6)],
+        3,
+        backward=True,
+    )
+    assert backward.window_snapshots(0) == range(2, -1, -1)
+
+    # Same snapshots as the forward window of the same index
+    snapshots, grids, particle_file = backward.window_files(2)
+    assert snapshots == ["velocity4.mat", "velocity3.mat", "velocity2.mat"]
+    assert grids == ["grid4.mat", "grid3.mat", "grid2.mat"]
+    assert particle_file == "particles4.mat"
+
+
+def test_input_files_of_analytic_fields_are_only_particle_files():
+    files = WorkerContext(["v0.mat", "v1.mat"], ["grid.mat"], ["particles.mat"], 2)
+    assert files.input_files(0) == [
+        "v0.mat",
+        "v1.mat",
+        "grid.mat",
+        "grid.mat",
+        "particles.mat",
+    ]
+
+    analytic = WorkerContext(
+        ["field(t=0)", "field(t=1)"],
+        ["field"],
+        ["particles.mat"],
+        2,
+        snapshot_times=[0.0, 1.0],
+    )
+    assert analytic.input_files(0) == ["particles.mat"]
+
+
+def test_notifications_put_events():
+    context = WorkerContext([], [], [], 1)
+    context.notify_completed(0)  # No queue, no-op
+
+    context.events = queue.Queue()
+    context.notify_completed(4)
+    event, index, stages = context.events.get_nowait()
+    assert (event, index) == ("completed", 4)
+    assert isinstance(stages, dict)
+
+    context.notify_finished(range(4, 6))
+    assert context.events.get_nowait()[:2] == ("finished", 4)
+
+
+def test_worker_context_is_picklable():
+    context = WorkerContext(["velocity0.mat"], ["grid.mat"], ["particles.mat"], 1)
+    assert pickle.loads(pickle.dumps(context)) == context
+
+
+def test_contiguous_blocks_split_runs_and_limit_size():
+    blocks = contiguous_blocks([0, 1, 2, 3, 4, 7, 8, 10], max_block_size=2)
+    assert blocks == [range(0, 2), range(2, 4), range(4, 5), range(7, 9), range(10, 11)]
+
+
+def test_contiguous_blocks_cover_all_indices():
+    indices = list(range(100))
+    blocks = contiguous_blocks(indices, max_block_size=7)
+    assert [i for block in blocks for i in block] == indices
+    assert all(len(block) <= 7 for block in blocks)
+    assert contiguous_blocks([], max_block_size=3) == []
@@ -0,0 +1,102 @@
+import gc
+import multiprocessing
+import threading
+
+import numpy as np
+import pytest
+from scipy.io import savemat
+
+from src.file_readers import VelocityDataReader
+from src.shared_store import SharedSnapshotStore
+
+
+@pytest.fixture
+def store():
+    # A plain dict and lock behave as the Manager proxies within a single process
+    store = SharedSnapshotStore({}, threading.Lock(), max_cached_bytes=0)
+    yield store
+    store.clear()
+
+
+def test_array_is_loaded_only_once(store):
+    calls = []
+
+    def load():
+        calls.append(1)
+        return np.arange(6.0).reshape(2, 3)
+
+    first = store.get("key", load)
+    second = store.get("key", load)
+
+    assert len(calls) == 1
+    np.testing.assert_array_equal(first, np.arange(6.0).reshape(2, 3))
+    np.testing.assert_array_equal(second, first)
+    assert not first.flags.writeable
+    assert store.registry["key"][3] == 2  # Reference count
+
+
+def test_unused_arrays_are_evicted_beyond_budget(store):
+    store.max_cached_bytes = 8 * 4  # Room for a single unused array
+    a = store.get("a", lambda: np.zeros(4))
+    b = store.get("b", lambda: np.ones(4))
+
+    del a
+    gc.collect()
+    assert set(store.registry) == {"a", "b"}  # Cached, since within budget
+
+    del b
+    gc.collect()
+    assert set(store.registry) == {"b"}  # Least recently used one is released
+
+
+def use_array_when_set(store, key, event):
+    event.wait()
+    store.get(key, lambda: np.ones(4))
+    gc.collect()
+
+
+def test_least_recently_used_array_of_any_worker_is_evicted():
+    context = multiprocessing.get_context("fork")
+    with context.Manager() as manager:
+        store = SharedSnapshotStore(manager.dict(), manager.Lock(), 8 * 4)
+        event = context.Event()
+        worker = context.Process(target=use_array_when_set, args=(store, "b", event))
+        worker.start()  # Forked before this process uses any array
+
+        for _ in range(3):
+            store.get("a", lambda: np.zeros(4))
+        gc.collect()
+
+        event.set()  # The worker uses its array last
+        worker.join()
+        assert set(store.registry) == {"b"}
+        store.clear()
+
+
+def test_arrays_in_use_are_never_evicted(store):
+    a = store.get("a", lambda: np.zeros(4))
+    view = a[1:]
+    del a
+    gc.collect()
+
+    assert "a" in store.registry
+    np.testing.assert_array_equal(view, np.zeros(3))
+
+
+def test_velocity_reader_with_store(tmp_path, store):
+    file_path = str(tmp_path / "velocity_data.mat")
+    velocity_x = np.array([[1.0, 2.0], [3.0, 4.0]])
+    velocity_y = np.array([[5.0, 6.0], [7.0, 8.0]])
+    savemat(file_path, {"velocity_x": velocity_x, "velocity_y": velocity_y})
+
+    reader = VelocityDataReader(np.float32, store=store)
+    raw_x, raw_y = reader.read_raw(file_path)
+    flatten = reader.read_flatten(file_path)
+
+    np.testing.assert_array_equal(raw_x, velocity_x)
+    np.testing.assert_array_equal(raw_y, velocity_y)
+    np.testing.assert_array_equal(
+        flatten, np.stack((velocity_x, velocity_y), axis=-1).reshape(-1, 2)
+    )
+    assert flatten.dtype == np.float32
+    assert len(store.registry) == 2
@@ -0,0 +1,136 @@
+import itertools
+
+import numpy as np
+import pytest
+from scipy.io import loadmat
+
+from src.file_readers import (
+    CoordinateDataReader,
+    VelocityDataReader,
+    read_seed_particles_coordinates,
+)
+from src.file_utils import get_files_list
+from src.hyperparameters import MyProgramArgs
+from src.interpolate import build_geometry
+from src.main import run
+from src.particles import NeighboringParticles
+from src.streaming import stream_ftle
+from src.synthetic import write_double_gyre_dataset
+
+STRAIN_RATE = 0.5
+
+
+def seed_particles(spacing=0.01):
+    centers = np.array([[0.0, 0.0], [0.1, -0.05], [-0.1, 0.05]])
+    return NeighboringParticles(
+        positions=np.concatenate(
+            [
+                centers - [spacing, 0],  # Left
+                centers + [spacing, 0],  # Right
+                centers + [0, spacing],  # Top
+                centers - [0, spacing],  # Bottom
+            ]
+        )
+    )
+
+
+def strain_snapshots(times, interpolator="linear"):
+    """Uniform strain (u, v) = (a x, -a y), interpolated exactly by linear methods."""
+    x, y = np.meshgrid(np.linspace(-1, 1, 21), np.linspace(-1, 1, 21))
+    u, v = STRAIN_RATE * x, -STRAIN_RATE * y
+    for t in times:
+        if interpolator.startswith("grid"):
+            yield (x, y), (u, v), t
+        else:
+            coordinates = np.column_stack((x.ravel(), y.ravel()))
+            yield coordinates, np.column_stack((u.ravel(), v.ravel())), t
+
+
+@pytest.mark.parametrize("interpolator", ["linear", "grid"])
+@pytest.mark.parametrize("timestep", [0.1, -0.1])
+def test_stream_ftle_of_uniform_strain(interpolator, timestep):
+    times = np.arange(8) * timestep
+    windows = list(
+        stream_ftle(
+            strain_snapshots(times, interpolator),
+            seed_particles(),
+            flow_map_period=0.5,
+            interpolator=interpolator,
+        )
+    )
+
+    # Windows of 6 snapshots (6 steps), so only those of the first 2 complete
+    assert [window.index for window in windows] == [0, 1]
+    np.testing.assert_allclose([window.time for window in windows], times[:2])
+
+    # Each Euler step stretches the separations by (1 + a |h|)
+    expected = 6 * np.log(1 + STRAIN_RATE * abs(timestep)) / 0.5
+    for window in windows:
+        np.testing.assert_allclose(window.ftle, expected, rtol=1e-10)
+
+
+def test_stream_ftle_yields_windows_as_they_complete():
+    times = itertools.count(step=0.1)  # Endless stream
+    stream = stream_ftle(strain_snapshots(times), seed_particles(), 0.3)
+    first, second = itertools.islice(stream, 2)
+    assert (first.index, second.index) == (0, 1)
+
+
+def test_stream_ftle_reuses_the_geometry_of_a_fixed_grid(mocker):
+    mocked_build_geometry = mocker.patch(
+        "src.streaming.build_geometry", wraps=build_geometry
+    )
+    snapshots = list(strain_snapshots(np.arange(6) * 0.1))
+    # A grid with new coordinates needs a new geometry
+    coordinates, velocities, _ = snapshots[-1]
+    snapshots.append((coordinates * 1.01, velocities, 0.6))
+
+    windows = list(stream_ftle(snapshots, seed_particles(), 0.2, precision="float32"))
+    assert len(windows) == 4
+    assert windows[0].ftle.dtype == np.float32
+    assert mocked_build_geometry.call_count == 2
+
+
+# Windows of int(flow_map_period / dt) + 1 snapshots, so 6 and 7 snapshots
+@pytest.mark.parametrize("flow_map_period, num_windows", [(0.05, 4), (0.06, 3)])
+def test_stream_ftle_matches_the_command_line(
+    tmp_path, monkeypatch, flow_map_period, num_windows
+):
+    monkeypatch.chdir(tmp_path)
+    list_files = write_double_gyre_dataset(
+        "inputs", nx=20, ny=10, nt=10, num_particles=20
+    )
+    run(
+        MyProgramArgs(
+            experiment_name="files",
+            list_particle_files=list_files["particle"],
+            snapshot_timestep=0.01,
+            flow_map_period=flow_map_period,
+            list_velocity_files=list_files["velocity"],
+            list_grid_files=list_files["grid"],
+            interpolator="linear",
+        )
+    )
+
+    coordinates = CoordinateDataReader().read_flatten("inputs/grid.mat")
+    snapshots = (
+        (coordinates, VelocityDataReader().read_flatten(velocity_file), 0.01 * k)
+        for k, velocity_file in enumerate(get_files_list(list_files["velocity"]))
+    )
+    seeds = read_seed_particles_coordinates(get_files_list(list_files["particle"])[0])
+    windows = list(
+        stream_ftle(snapshots, seeds, flow_map_period, interpolator="linear")
+    )
+
+    # The last window of the files also needs the step driven by the last snapshot,
+    # which a stream only takes when the next snapshot arrives
+    assert len(windows) == num_windows
+    for window in windows:
+        expected = loadmat(f"outputs/files/ftle{window.index:04d}.mat")["ftle"]
+        np.testing.assert_allclose(window.ftle, expected.ravel(), rtol=1e-10)
+
+
+def test_stream_ftle_requires_equally_spaced_snapshots():
+    times = [0.0, 0.1, 0.2, 0.35]
+    with pytest.raises(ValueError, match="equally spaced"):
+        list(stream_ftle(strain_snapshots(times), seed_particles(), 0.5))
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from src.integrate import get_integrator
+from src.particles import NeighboringParticles
+from src.sweep import SweepEngine
+
+
+class SnapshotInterpolator:
+    """Fake snapshot interpolator of a nonlinear, snapshot-dependent field."""
+
+    def __init__(self, k):
+        self.k = k
+
+    def interpolate(self, new_points, simplex_hint=None):  # noqa: ARG002
+        x, y = new_points[:, 0], new_points[:, 1]
+        return np.column_stack((np.sin(y + 0.1 * self.k), -np.cos(x * (1 + self.k))))
+
+
+@pytest.fixture
+def seed_particles():
+    rng = np.random.default_rng(0)
+    return NeighboringParticles(positions=rng.uniform(0, 1, size=(4 * 5, 2)))
+
+
+def integrate_window(start, window_length, seed, integrator_name, h):
+    """Reference: integrate a single window from scratch."""
+    particles = NeighboringParticles(positions=seed.positions.copy())
+    integrator = get_integrator(integrator_name)
+    for k in range(start, start + window_length):
+        integrator.integrate(h, particles, SnapshotInterpolator(k))
+    return particles.positions
+
+
+@pytest.mark.parametrize("integrator_name", ["euler", "ab2", "rk4"])
+def test_sweep_matches_window_by_window_integration(seed_particles, integrator_name):
+    num_snapshots, window_length, h = 12, 4, 0.05
+    num_windows = num_snapshots - window_length + 1
+
+    engine = SweepEngine(window_length, integrator_name)
+    finished = {}
+    for k in range(num_snapshots):
+        if k < num_windows:
+            engine.start_window(k, seed_particles)
+        for window in engine.step(h, SnapshotInterpolator(k)):
+            finished[window.index] = window.particles.positions
+
+    assert sorted(finished) == list(range(num_windows))
+    assert len(engine) == 0
+
+    for index, positions in finished.items():
+        expected = integrate_window(
+            index, window_length, seed_particles, integrator_name, h
+        )
+        np.testing.assert_allclose(positions, expected, rtol=1e-12)
+
+
+def test_sweep_does_not_mutate_seed(seed_particles):
+    original = seed_particles.positions.copy()
+
+    engine = SweepEngine(2, "euler")
+    engine.start_window(0, seed_particles)
+    engine.step(0.1, SnapshotInterpolator(0))
+
+    np.testing.assert_array_equal(seed_particles.positions, original)
+
+
+def test_sweep_emits_oldest_window_first(seed_particles):
+    engine = SweepEngine(2, "euler")
+
+    engine.start_window(0, seed_particles)
+    assert engine.step(0.1, SnapshotInterpolator(0)) == []
+
+    engine.start_window(1, seed_particles)
+    finished = engine.step(0.1, SnapshotInterpolator(1))
+
+    assert [window.index for window in finished] == [0]
+    assert len(engine) == 1
+
+
+if __name__ == "__main__":
+    pytest.main()
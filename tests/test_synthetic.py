@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from src.file_readers import (
+    CoordinateDataReader,
+    MatFileCache,
+    VelocityDataReader,
+    read_seed_particles_coordinates,
+)
+from src.file_utils import get_files_list
+from src.interpolate import InterpolatorFactory
+from src.synthetic import (
+    double_gyre_velocity,
+    get_velocity_field,
+    neighboring_seed_particles,
+    write_double_gyre_dataset,
+)
+
+
+def reference_double_gyre(x, y, t, A=0.1, epsilon=0.25, omega=2 * np.pi / 10):  # noqa: N803
+    f = epsilon * np.sin(omega * t) * x**2 + (1 - 2 * epsilon * np.sin(omega * t)) * x
+    df_dx = 2 * epsilon * np.sin(omega * t) * x + (1 - 2 * epsilon * np.sin(omega * t))
+    u = -np.pi * A * np.sin(np.pi * f) * np.cos(np.pi * y)
+    v = np.pi * A * np.cos(np.pi * f) * np.sin(np.pi * y) * df_dx
+    return u, v
+
+
+def test_double_gyre_velocity_broadcasts_over_time():
+    x, y = np.meshgrid(np.linspace(0, 2, 7), np.linspace(0, 1, 5))
+    times = np.array([0.0, 0.3, 2.5])
+
+    u, v = double_gyre_velocity(x, y, times[:, None, None])
+    assert u.shape == v.shape == (3, 5, 7)
+    for k, t in enumerate(times):
+        expected_u, expected_v = reference_double_gyre(x, y, t)
+        np.testing.assert_allclose(u[k], expected_u, atol=1e-15)
+        np.testing.assert_allclose(v[k], expected_v, atol=1e-15)
+
+
+@pytest.mark.parametrize("num_particles", [1, 50, 1000])
+def test_neighboring_seed_particles(num_particles):
+    seeds = neighboring_seed_particles(num_particles, spacing=0.01)
+    centers = (seeds["left"] + seeds["right"]) / 2
+
+    assert len(centers) == pytest.approx(num_particles, rel=0.2)
+    np.testing.assert_allclose((seeds["top"] + seeds["bottom"]) / 2, centers)
+    np.testing.assert_allclose(
+        seeds["right"] - seeds["left"], [[0.02, 0]] * len(centers)
+    )
+    assert np.all((centers > 0) & (centers < [2, 1]))
+
+
+def test_write_double_gyre_dataset(tmp_path):
+    list_files = write_double_gyre_dataset(
+        str(tmp_path), nx=9, ny=5, nt=5, timestep=0.1, num_particles=8, batch_size=2
+    )
+    velocity_files = get_files_list(list_files["velocity"])
+    (grid_file,) = get_files_list(list_files["grid"])
+    (particle_file,) = get_files_list(list_files["particle"])
+    assert len(velocity_files) == 5
+
+    mat_cache = MatFileCache()
+    x, y = CoordinateDataReader(mat_cache=mat_cache).read_raw(grid_file)
+    u, v = VelocityDataReader(mat_cache=mat_cache).read_raw(velocity_files[3])
+    assert x.shape == (5, 9)
+    expected_u, expected_v = reference_double_gyre(x, y, 0.3)
+    np.testing.assert_allclose(u, expected_u, atol=1e-15)
+    np.testing.assert_allclose(v, expected_v, atol=1e-15)
+
+    assert len(read_seed_particles_coordinates(particle_file)) == 8
+
+    # Usable by both the structured and the scattered interpolators
+    factory = InterpolatorFactory(
+        CoordinateDataReader(mat_cache=mat_cache),
+        VelocityDataReader(mat_cache=mat_cache),
+    )
+    point = np.array([[0.3, 0.4]])
+    for strategy in ["grid", "linear"]:
+        interpolator = factory.create_interpolator(
+            velocity_files[0], grid_file, strategy
+        )
+        assert interpolator.interpolate(point).shape == (1, 2)
+
+
+def test_get_velocity_field_fixes_parameters():
+    x, y = np.array([0.3, 1.2]), np.array([0.4, 0.7])
+    velocity = get_velocity_field("double_gyre", {"epsilon": 0.1})
+    np.testing.assert_array_equal(
+        velocity(x, y, 1.5), double_gyre_velocity(x, y, 1.5, epsilon=0.1)
+    )
+
+    with pytest.raises(ValueError, match="Invalid velocity field"):
+        get_velocity_field("vortex")
+    with pytest.raises(ValueError, match="Unknown parameters"):
+        get_velocity_field("double_gyre", {"eps": 0.1})
@@ -0,0 +1,181 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from src.telemetry import Telemetry
+
+
+def test_measure_counts_calls_and_items():
+    telemetry = Telemetry()
+    for _ in range(3):
+        with telemetry.measure("interpolate", 10):
+            pass
+
+    calls, seconds, items = telemetry.stages["interpolate"]
+    assert calls == 3
+    assert seconds >= 0
+    assert items == 30
+    assert telemetry.items("interpolate") == 30
+    assert telemetry.items("integrate") == 0
+
+
+def test_nested_stages_are_exclusive():
+    telemetry = Telemetry()
+    with telemetry.measure("integrate"):
+        time.sleep(0.02)
+        with telemetry.measure("interpolate"):
+            time.sleep(0.05)
+
+    integrate_seconds = telemetry.stages["integrate"][1]
+    interpolate_seconds = telemetry.stages["interpolate"][1]
+    assert interpolate_seconds >= 0.05
+    assert 0.02 <= integrate_seconds < 0.05
+
+
+def test_measure_records_on_error():
+    telemetry = Telemetry()
+    with pytest.raises(ValueError), telemetry.measure("read"):
+        raise ValueError
+    assert telemetry.stages["read"][0] == 1
+
+
+def test_threads_have_separate_stacks():
+    telemetry = Telemetry()
+
+    def write():
+        with telemetry.measure("write", 1):
+            time.sleep(0.05)
+
+    with telemetry.measure("integrate"):
+        thread = threading.Thread(target=write)
+        thread.start()
+        thread.join()
+
+    # Time spent by the other thread is not subtracted from `integrate`
+    assert telemetry.stages["integrate"][1] >= 0.05
+    assert telemetry.stages["write"][1] >= 0.05
+
+
+def test_collect_resets_and_merge_aggregates():
+    worker = Telemetry()
+    with worker.measure("build"):
+        pass
+    worker.record("integrate", 2.0, items=100)
+
+    manager = Telemetry()
+    manager.merge(worker.collect())
+    assert worker.stages == {}
+    assert manager.events == []  # Not traced
+
+    worker.record("integrate", 1.0, items=50)
+    manager.merge(worker.collect())
+    assert manager.stages["integrate"] == [2, 3.0, 150]
+    assert manager.stages["build"][0] == 1
+
+
+def test_summary():
+    telemetry = Telemetry()
+    telemetry.record("write", 1.0, items=2)
+    telemetry.record("integrate", 3.0, items=600)
+
+    summary = telemetry.summary(wall_time=2.0)
+    assert list(summary["stages"]) == ["integrate", "write"]  # Pipeline order
+    assert summary["particle_steps"] == 600
+    assert summary["particle_steps_per_second"] == 300
+    assert summary["stages"]["integrate"]["items_per_second"] == 200
+    assert summary["stages"]["integrate"]["time_fraction"] == 0.75
+    assert summary["stages"]["write"]["time_fraction"] == 0.25
+
+
+def test_trace_events(tmp_path):
+    worker = Telemetry(trace=True)
+    worker.name_process("worker 1")
+    with worker.span("window", index=3), worker.measure("integrate", 8):
+        with worker.measure("interpolate", 8):
+            pass
+
+    manager = Telemetry(trace=True)
+    manager.merge(worker.collect())
+    assert worker.events == []
+
+    metadata, interpolate, integrate, window = manager.events
+    assert metadata["ph"] == "M"
+    assert metadata["args"] == {"name": "worker 1"}
+    assert [e["name"] for e in (interpolate, integrate, window)] == [
+        "interpolate",
+        "integrate",
+        "window",
+    ]
+    assert window["args"] == {"index": 3}
+    assert integrate["args"] == {"items": 8}
+    assert all(e["pid"] == os.getpid() for e in manager.events)
+    # Nested events lie within their parents
+    assert window["ts"] <= integrate["ts"] <= interpolate["ts"]
+    assert interpolate["ts"] + interpolate["dur"] <= window["ts"] + window["dur"]
+
+    path = tmp_path / "trace.json"
+    manager.save_trace(str(path))
+    with open(path) as f:
+        assert len(json.load(f)["traceEvents"]) == 4
+
+
+def test_span_is_noop_without_trace():
+    telemetry = Telemetry()
+    telemetry.name_process("worker 1")
+    with telemetry.span("window", index=0):
+        pass
+    assert telemetry.events == []
+    assert telemetry.stages == {}
+
+
+def test_memory_peaks_of_nested_stages():
+    tracemalloc.start()
+    try:
+        telemetry = Telemetry(track_memory=True)
+        with telemetry.measure("integrate"):
+            with telemetry.measure("interpolate"):
+                temporary = np.ones(2**20)  # 8 MB
+                del temporary
+            small = np.ones(2**10)
+            del small
+        telemetry.sample_memory("worker 1", {"interpolators": 100})
+    finally:
+        tracemalloc.stop()
+
+    rss, traced = telemetry.memory["interpolate"]
+    assert rss > 0
+    assert traced >= 8 * 2**20
+    # The peak of the nested stage is also a peak of the enclosing one
+    assert telemetry.memory["integrate"][1] >= 8 * 2**20
+
+    usage = telemetry.processes["worker 1"]
+    assert usage["peak_traced_bytes"] >= 8 * 2**20
+    assert usage["peak_rss_bytes"] >= usage["rss_bytes"] > 0
+
+
+def test_memory_samples_keep_largest_values():
+    worker = Telemetry(track_memory=True)
+    worker.sample_memory("worker 1", {"interpolators": 100, "particles": 10})
+    worker.sample_memory("worker 1", {"interpolators": 50, "particles": 20})
+    worker.record("build", 1.0)
+    worker._record_memory("build", 1000, 10)
+
+    manager = Telemetry(track_memory=True)
+    manager.merge(worker.collect())
+    assert manager.processes["worker 1"]["cached_bytes"] == {
+        "interpolators": 100,
+        "particles": 20,
+    }
+
+    summary = manager.summary(wall_time=1.0)
+    assert summary["stages"]["build"]["peak_rss_bytes"] == 1000
+    assert summary["stages"]["build"]["peak_traced_bytes"] == 10
+    assert (
+        summary["total_peak_rss_bytes"]
+        == (manager.processes["worker 1"]["peak_rss_bytes"])
+    )
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+from scipy.io import loadmat
+
+from src.file_utils import get_files_list, write_list_to_txt
+from src.hyperparameters import MyProgramArgs
+from src.main import run
+from src.synthetic import write_double_gyre_dataset
+from src.watch import SnapshotWatcher
+
+
+def write_file(path, content="data"):
+    path.write_text(content)
+    return str(path)
+
+
+def test_files_are_returned_once_completely_written(tmp_path):
+    list_file = tmp_path / "velocities.txt"
+    watcher = SnapshotWatcher(list_file=str(list_file))
+    assert watcher.poll() == []  # The list is not created yet
+
+    first = write_file(tmp_path / "snapshot0.mat")
+    list_file.write_text(f"{first}\n{tmp_path / 'snapshot1.mat'}\n")
+    assert watcher.poll() == []  # New files wait for one more poll
+    assert watcher.poll() == [first]  # The second is listed but not written
+
+    second = write_file(tmp_path / "snapshot1.mat")
+    assert watcher.poll() == []
+    write_file(tmp_path / "snapshot1.mat", "more data")  # Still being written
+    assert watcher.poll() == []
+    assert watcher.poll() == [second]
+    assert watcher.poll() == []
+
+
+def test_files_of_a_directory_are_returned_in_name_order(tmp_path):
+    files = [write_file(tmp_path / f"velocity{k}.mat") for k in (1, 0)]
+    write_file(tmp_path / "grid.txt")
+    watcher = SnapshotWatcher(directory=str(tmp_path), pattern="velocity")
+    watcher.poll()
+    assert watcher.poll() == sorted(files)
+
+
+def test_iteration_stops_after_the_timeout(tmp_path):
+    files = [write_file(tmp_path / f"velocity{k}.mat") for k in range(2)]
+    watcher = SnapshotWatcher(directory=str(tmp_path), poll_interval=0.01, timeout=0.1)
+    assert list(watcher) == files
+
+
+def test_a_single_source_is_watched(tmp_path):
+    with pytest.raises(ValueError):
+        SnapshotWatcher()
+    with pytest.raises(ValueError):
+        SnapshotWatcher(list_file=str(tmp_path / "list.txt"), directory=str(tmp_path))
+
+
+def test_restarted_live_mode_recomputes_the_maps_of_a_changed_stream(
+    tmp_path, monkeypatch
+):
+    monkeypatch.chdir(tmp_path)
+    list_files = write_double_gyre_dataset(
+        "inputs", nx=20, ny=10, nt=10, num_particles=20
+    )
+    velocity_files = get_files_list(list_files["velocity"])
+
+    def watch(experiment_name, snapshot_files):
+        write_list_to_txt(snapshot_files, f"{experiment_name}.txt")
+        run(
+            MyProgramArgs(
+                experiment_name=experiment_name,
+                list_particle_files=list_files["particle"],
+                snapshot_timestep=-0.01,
+                flow_map_period=0.05,
+                list_velocity_files=f"{experiment_name}.txt",
+                list_grid_files=list_files["grid"],
+                interpolator="linear",
+                watch=True,
+                poll_interval=0.01,
+                watch_timeout=0.05,
+            )
+        )
+
+    # The stream of the restarted run starts one snapshot later, so each of its
+    # positions holds another snapshot
+    watch("restarted", velocity_files[:-1])
+    watch("restarted", velocity_files[1:])
+    watch("fresh", velocity_files[1:])
+
+    for index in range(5, 9):
+        restarted = loadmat(f"outputs/restarted/ftle{index:04d}.mat")["ftle"]
+        fresh = loadmat(f"outputs/fresh/ftle{index:04d}.mat")["ftle"]
+        np.testing.assert_array_equal(restarted, fresh)